@@ -0,0 +1,89 @@
+"""Run the benchmark suite, save its results as a baseline and compare later runs against one.
+
+Everything runs locally on synthetic env files of 10 to 10,000 keys and templates and secrets
+bundles of 1 KB to 10 MB, in a temporary directory. Comparing exits with 1 when any result is
+slower than the baseline by more than the threshold.
+
+Run with: python -m benchmarks [--quick] [--case NAME ...] [--save FILE] [--compare FILE]
+"""
+
+from __future__ import annotations
+
+import json
+import tempfile
+from pathlib import Path
+from typing import Any
+
+import click
+
+from .suite import CASES, environment, run
+
+
+def _ms(seconds: float | None) -> str:
+    return "n/a" if seconds is None else f"{seconds * 1000:.2f} ms"
+
+
+def compare(baseline: dict[str, Any], results: dict[str, float | None], threshold: float) -> list[str]:
+    """Print each result beside its baseline, and return the names more than threshold slower."""
+    slower = []
+    click.echo(f"\n{'benchmark':<44} {'baseline':>12} {'current':>12} {'change':>8}")
+    for name, seconds in results.items():
+        before = baseline["results"].get(name)
+        if before is None or seconds is None:
+            click.echo(f"{name:<44} {_ms(before):>12} {_ms(seconds):>12}")
+            continue
+        change = seconds / before - 1
+        colour = None
+        if change > threshold:
+            slower.append(name)
+            colour = "red"
+        elif change < -threshold:
+            colour = "green"
+        click.secho(f"{name:<44} {_ms(before):>12} {_ms(seconds):>12} {change:>+8.0%}", fg=colour)
+    return slower
+
+
+@click.command()
+@click.option("--quick", is_flag=True, help="Leave out the largest inputs, 10,000 keys and 10 MB.")
+@click.option(
+    "--case",
+    "cases",
+    type=click.Choice(list(CASES)),
+    multiple=True,
+    help="Run only this case. May be given more than once. Runs every case by default.",
+)
+@click.option("--save", type=click.Path(dir_okay=False, path_type=Path), help="Write the results to this JSON file.")
+@click.option(
+    "--compare",
+    "baseline_file",
+    type=click.Path(exists=True, dir_okay=False, path_type=Path),
+    help="Compare the results with a JSON file written by --save.",
+)
+@click.option(
+    "--threshold",
+    type=click.FloatRange(min=0),
+    default=0.2,
+    show_default=True,
+    help="The relative change a comparison reports as slower or faster.",
+)
+def main(quick: bool, cases: tuple[str, ...], save: Path | None, baseline_file: Path | None, threshold: float) -> None:
+    baseline = json.loads(baseline_file.read_text()) if baseline_file else None
+    meta = environment()
+    click.echo(f"Python {meta['python']} on {meta['platform']}, {meta['yaml']}")
+    results: dict[str, float | None] = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for name, seconds in run(Path(directory), list(cases or CASES), quick):
+            results[name] = seconds
+            click.echo(f"{name:<44} {_ms(seconds):>12}")
+    if save:
+        _ = save.write_text(json.dumps({**meta, "results": results}, indent=2) + "\n")
+        click.secho(f"Results saved to {save}", fg="green")
+    if baseline is not None:
+        click.echo(f"Baseline from {baseline.get('created', 'an unknown date')}, Python {baseline.get('python', '?')}")
+        if slower := compare(baseline, results, threshold):
+            click.secho(f"{len(slower)} benchmarks slower than the baseline by more than {threshold:.0%}", fg="red")
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
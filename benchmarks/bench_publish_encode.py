@@ -0,0 +1,87 @@
+"""Benchmark the peak memory of encoding a large multi-document secrets bundle.
+
+Each variant runs in a fresh interpreter and reports its peak RSS.
+
+Run with: python -m benchmarks.bench_publish_encode [size in MB, default 50]
+"""
+
+from __future__ import annotations
+
+import base64
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+DOCUMENT = """apiVersion: v1
+data:
+  TLS_CERTIFICATE: {payload}
+  TLS_KEY: {payload}
+kind: Secret
+metadata:
+  name: certificate-{index}
+---
+"""
+
+# Encode the bundle in a child process and print its peak RSS in KB.
+STREAMING = """
+import resource, sys
+from pathlib import Path
+from pymake.publish_encode import encode
+encode(Path(sys.argv[1]))
+print(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+"""
+
+WHOLE_FILE = """
+import base64, resource, sys
+from pymake import yaml_io
+with open(sys.argv[1], "rb") as fp:
+    documents = [document for document in yaml_io.load_all(fp) if document is not None]
+for document in documents:
+    for key, value in document["data"].items():
+        document["data"][key] = base64.b64encode(value.encode()).decode()
+with open(sys.argv[1].replace("-secrets-template.yaml", "-secrets.yaml"), "w") as fp:
+    yaml_io.dump_all(documents, fp)
+print(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+"""
+
+BASELINE = """
+import resource
+import pymake.publish_encode
+print(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+"""
+
+
+def write_bundle(path: Path, size: int, payload_size: int = 256 * 1024) -> int:
+    """Write about size bytes of Secret documents, each with two base64 certificate-like payloads."""
+    payload = base64.b64encode(os.urandom(payload_size * 3 // 4)).decode()
+    written = index = 0
+    with open(path, "w") as fp:
+        while written < size:
+            written += fp.write(DOCUMENT.format(payload=payload, index=index))
+            index += 1
+    return index
+
+
+def peak_rss(script: str, *args: str, cwd: str | None = None) -> tuple[int, float]:
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, "-c", script, *args], cwd=cwd, capture_output=True, text=True, check=True)
+    return int(result.stdout.split()[-1]), time.perf_counter() - start
+
+
+def main() -> None:
+    size_mb = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    with tempfile.TemporaryDirectory() as tmpdir:
+        bundle = Path(tmpdir) / "bundle-secrets-template.yaml"
+        documents = write_bundle(bundle, size_mb * 1024 * 1024)
+        print(f"bundle: {bundle.stat().st_size / 1024 / 1024:.0f} MB, {documents} documents")
+        print(f"{'variant':<24} {'peak RSS':>12} {'time':>10}")
+        for name, script in (("import only", BASELINE), ("streaming", STREAMING), ("whole file", WHOLE_FILE)):
+            rss, elapsed = peak_rss(script, str(bundle))
+            print(f"{name:<24} {rss / 1024:>10.0f}MB {elapsed:>9.2f}s")
+
+
+if __name__ == "__main__":
+    main()
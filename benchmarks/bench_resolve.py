@@ -0,0 +1,67 @@
+"""Benchmark the dependency-graph resolver against the legacy recursive recurse().
+
+Run with: python -m benchmarks.bench_resolve
+"""
+
+from __future__ import annotations
+
+import re
+import sys
+import time
+from typing import Any
+
+from pymake.resolve import resolve
+
+SIMPLE_REGEX = re.compile(r"\${(.*?)\}")
+SIZES = (100, 1_000, 10_000)
+# From this size on recurse() takes seconds, so it is timed once instead of best of five.
+SLOW_SIZE = 10_000
+
+
+def recurse(d: dict[str, Any]) -> dict[str, Any]:
+    """The original recursive resolver, kept verbatim for comparison."""
+    for key, value in d.items():
+        if items := SIMPLE_REGEX.findall(value):
+            for i in items:
+                if not SIMPLE_REGEX.findall(i):
+                    d[key] = value.replace(f"${{{i}}}", d[i])
+                    recurse(d)
+    return d
+
+
+def synthetic_env(size: int) -> dict[str, str]:
+    """Every fourth key is a literal, the others reference one or two earlier keys."""
+    env: dict[str, str] = {}
+    for i in range(size):
+        if i % 4 == 0:
+            env[f"VAR_{i}"] = f"value-{i}"
+        elif i % 4 == 1:
+            env[f"VAR_{i}"] = f"${{VAR_{i - 1}}}-suffix"
+        else:
+            env[f"VAR_{i}"] = f"${{VAR_{i - 1}}}_${{VAR_{i // 2}}}"
+    return env
+
+
+def _time(func: Any, size: int, repeat: int) -> str:
+    best = float("inf")
+    for _ in range(repeat):
+        env = synthetic_env(size)
+        start = time.perf_counter()
+        try:
+            func(env)
+        except RecursionError:
+            return "RecursionError"
+        best = min(best, time.perf_counter() - start)
+    return f"{best * 1000:.2f} ms"
+
+
+def main() -> None:
+    print(f"{'keys':>8} {'recurse()':>16} {'resolve()':>16}")
+    for size in SIZES:
+        repeat = 5 if size < SLOW_SIZE else 1
+        print(f"{size:>8} {_time(recurse, size, repeat):>16} {_time(resolve, size, repeat):>16}")
+    sys.stdout.flush()
+
+
+if __name__ == "__main__":
+    main()
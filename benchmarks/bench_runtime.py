@@ -0,0 +1,65 @@
+"""Benchmark many small podman operations through the REST API against forking the podman binary.
+
+Both runtimes run the same sequence of image_exists, secret_create and kube_play calls. Without
+arguments the API runs against the stand-in socket server of the tests and the binary is the
+recording podman stub, so only the transport differs. With --real, the installed podman and its
+socket are used.
+
+Run with: python -m benchmarks.bench_runtime [--real] [calls, default 50]
+"""
+
+from __future__ import annotations
+
+import contextlib
+import sys
+import tempfile
+import time
+from typing import TYPE_CHECKING
+
+from pymake.podman_api import PodmanAPI
+from pymake.runtime import PodmanCLI
+
+if TYPE_CHECKING:
+    from pymake.runtime import Runtime
+
+MANIFEST = "apiVersion: v1\nkind: Secret\nmetadata:\n  name: pymake-benchmark\ndata:\n  KEY: dmFsdWU=\n"
+
+
+def workload(runtime: Runtime, calls: int) -> float:
+    """Seconds taken by calls operations, cycling through the three kinds."""
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(None):
+        for i in range(calls):
+            if i % 3 == 0:
+                _ = runtime.image_exists("localhost/pymake-benchmark")
+            elif i % 3 == 1:
+                _ = runtime.secret_create("pymake-benchmark", b"value")
+            else:
+                _ = runtime.kube_play(MANIFEST, prefix="")
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    real = "--real" in sys.argv
+    args = [arg for arg in sys.argv[1:] if arg != "--real"]
+    calls = int(args[0]) if args else 50
+    with tempfile.TemporaryDirectory() as directory, contextlib.ExitStack() as stack:
+        if real:
+            api = PodmanAPI()
+        else:
+            from tests.podman_api_stub import PodmanAPIStub
+            from tests.podman_stub import PodmanStub
+
+            _ = stack.enter_context(PodmanStub(directory, stdout=""))
+            api = PodmanAPI(stack.enter_context(PodmanAPIStub(directory)).socket)
+        results = {"fork per call": workload(PodmanCLI(), calls), "REST, pooled": workload(api, calls)}
+        opened = api.pool.opened
+    print(f"{calls} operations against {'podman' if real else 'the stand-ins'}")
+    print(f"{'runtime':<16} {'total':>10} {'per call':>10}")
+    for name, seconds in results.items():
+        print(f"{name:<16} {seconds * 1000:>8.0f}ms {seconds / calls * 1000:>8.2f}ms")
+    print(f"connections opened by the REST runtime: {opened}")
+
+
+if __name__ == "__main__":
+    main()
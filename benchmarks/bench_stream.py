@@ -0,0 +1,57 @@
+"""Benchmark the peak memory of rendering a large template whole and chunk by chunk.
+
+Each variant runs in a fresh interpreter and reports its peak RSS.
+
+Run with: python -m benchmarks.bench_stream [size in MB, default 50]
+"""
+
+from __future__ import annotations
+
+import sys
+import tempfile
+from pathlib import Path
+
+from .bench_publish_encode import peak_rss
+from .suite import synthetic_template
+
+VARIABLES = 1_000
+
+RENDER = """
+import resource, sys
+from pymake.interpolate_templates import template_writer
+variables = {{f"VAR_{{i}}": f"value-{{i}}" for i in range({variables})}}
+template_writer(sys.argv[1], sys.argv[2], variables, stream={stream})
+print(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+"""
+
+BASELINE = """
+import resource
+import pymake.interpolate_templates
+print(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+"""
+
+
+def main() -> None:
+    size_mb = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    with tempfile.TemporaryDirectory() as tmpdir:
+        template, output = Path(tmpdir) / "template.yaml", Path(tmpdir) / "output.yaml"
+        # Written a megabyte at a time, since the peak RSS of this process is inherited by the variants.
+        chunk = synthetic_template(1024 * 1024, VARIABLES)
+        with open(template, "w") as fp:
+            for _ in range(size_mb):
+                _ = fp.write(chunk)
+        print(f"template: {template.stat().st_size / 1024 / 1024:.0f} MB, {VARIABLES} variables")
+        print(f"{'variant':<24} {'peak RSS':>12} {'time':>10}")
+        variants = {
+            "import only": BASELINE,
+            "streaming": RENDER.format(variables=VARIABLES, stream=True),
+            "whole file": RENDER.format(variables=VARIABLES, stream=False),
+        }
+        for name, script in variants.items():
+            # Run in tmpdir, so the whole file variant caches its compiled template there.
+            rss, elapsed = peak_rss(script, str(template), str(output), cwd=tmpdir)
+            print(f"{name:<24} {rss / 1024:>10.0f}MB {elapsed:>9.2f}s")
+
+
+if __name__ == "__main__":
+    main()
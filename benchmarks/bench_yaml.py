@@ -0,0 +1,60 @@
+"""Benchmark YAML loading and dumping with the libyaml and pure-Python backends.
+
+Run with: python -m benchmarks.bench_yaml
+"""
+
+from __future__ import annotations
+
+import base64
+import io
+import os
+import time
+from typing import Any
+
+import yaml
+
+from pymake import yaml_io
+
+BACKENDS: dict[str, tuple[Any, Any]] = {"pure-python": (yaml.SafeLoader, yaml.SafeDumper)}
+if yaml.__with_libyaml__:
+    BACKENDS["libyaml"] = (yaml.CSafeLoader, yaml.CSafeDumper)
+
+
+def configmap(keys: int) -> dict[str, Any]:
+    """A ConfigMap shaped like configmaps/django-env-map.yaml, with keys entries."""
+    data = {f"SETTING_{i}": f"https://service-{i}.example.org/api/v2.0/companies({i})/" for i in range(keys)}
+    return {"apiVersion": "v1", "data": data, "kind": "ConfigMap", "metadata": {"name": "django-env"}}
+
+
+def secret(keys: int, payload: int) -> dict[str, Any]:
+    """A Secret with keys base64 encoded values of payload random bytes, like embedded certificates."""
+    data = {f"CERTIFICATE_{i}": base64.b64encode(os.urandom(payload)).decode() for i in range(keys)}
+    return {"apiVersion": "v1", "data": data, "kind": "Secret", "metadata": {"name": "django-credentials"}}
+
+
+def _best(func: Any, repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    documents = {
+        "configmap 5k keys": configmap(5_000),
+        "secret 50 x 64 KB": secret(50, 64 * 1024),
+    }
+    print(f"active backend: {yaml_io.BACKEND}")
+    print(f"{'document':<20} {'backend':<12} {'size':>10} {'load':>12} {'dump':>12}")
+    for name, document in documents.items():
+        for backend, (loader, dumper) in BACKENDS.items():
+            text = yaml.dump(document, Dumper=dumper)
+            load = _best(lambda text=text, loader=loader: yaml.load(io.StringIO(text), Loader=loader))
+            dump = _best(lambda dumper=dumper, document=document: yaml.dump(document, Dumper=dumper))
+            print(f"{name:<20} {backend:<12} {len(text) / 1024:>8.0f}KB {load * 1000:>10.1f}ms {dump * 1000:>10.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
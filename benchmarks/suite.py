@@ -0,0 +1,217 @@
+"""The benchmark cases run by python -m benchmarks, over synthetic env files and templates.
+
+Every case yields (name, seconds) pairs, where seconds is the best of a few runs, or None when the
+variant cannot handle the input at all, like recurse() hitting the recursion limit. Names are
+"case/variant/size" so results of different runs can be matched up.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from functools import partial
+from pathlib import Path
+from string import Template
+from typing import TYPE_CHECKING, Any
+
+import yaml
+
+from pymake import interpolate_templates, yaml_io
+from pymake.compiled import TemplateCache
+from pymake.context import read_yaml
+from pymake.interpolate_templates import template_writer
+from pymake.publish_encode import encode
+from pymake.resolve import resolve
+
+from .bench_publish_encode import write_bundle
+from .bench_resolve import recurse, synthetic_env
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterator, Mapping
+
+    Result = tuple[str, float | None]
+
+KEYS = (10, 100, 1_000, 10_000)
+TEMPLATE_SIZES = (1024, 100 * 1024, 1024 * 1024, 10 * 1024 * 1024)
+QUICK_KEYS = KEYS[:3]
+QUICK_TEMPLATE_SIZES = TEMPLATE_SIZES[:3]
+ENTRY_POINT = "from pymake.main import cli; cli()"
+# Each case is run MIN_REPEAT times, then again until it has taken MIN_SECONDS in total or run MAX_REPEAT times.
+MIN_REPEAT = 3
+MIN_SECONDS = 0.2
+MAX_REPEAT = 10
+
+LOADERS: dict[str, Any] = {"pure-python": yaml.SafeLoader}
+if yaml.__with_libyaml__:
+    LOADERS["libyaml"] = yaml.CSafeLoader
+
+__all__ = ["CASES", "KEYS", "TEMPLATE_SIZES", "environment", "measure", "run"]
+
+
+def measure(func: Callable[..., Any], setup: Callable[[], tuple[Any, ...]] = tuple) -> float:
+    """The best time of func(*setup()), where setup is not timed."""
+    best = float("inf")
+    total = 0.0
+    for repeat in range(1, MAX_REPEAT + 1):
+        args = setup()
+        start = time.perf_counter()
+        func(*args)
+        elapsed = time.perf_counter() - start
+        best, total = min(best, elapsed), total + elapsed
+        if repeat >= MIN_REPEAT and total >= MIN_SECONDS:
+            break
+    return best
+
+
+def _env(size: int) -> tuple[dict[str, str]]:
+    """A fresh synthetic env as the arguments of recurse() or resolve(), since recurse() changes it."""
+    return (synthetic_env(size),)
+
+
+def _size(size: int) -> str:
+    return f"{size // (1024 * 1024)}MB" if size >= 1024 * 1024 else f"{size // 1024}KB"
+
+
+def synthetic_template(size: int, keys: int) -> str:
+    """About size bytes of YAML-like text with a placeholder for one of keys variables on every line."""
+    lines = []
+    written = index = 0
+    while written < size:
+        line = f"  setting_{index}: ${{VAR_{index % keys}}}/path/to/resource-{index}\n"
+        lines.append(line)
+        written += len(line)
+        index += 1
+    return "".join(lines)
+
+
+def _safe_substitute(template_file: Path, output: Path, variables: Mapping[str, Any]) -> None:
+    """How template_writer rendered before templates were compiled."""
+    _ = output.write_text(Template(template_file.read_text()).safe_substitute(variables))
+
+
+def _cold(output: Path) -> tuple[()]:
+    """Remove output and start from an empty compiled-template cache, so every run compiles and writes it again."""
+    output.unlink(missing_ok=True)
+    interpolate_templates.template_cache = TemplateCache(None)
+    return ()
+
+
+@contextlib.contextmanager
+def _restore_template_cache() -> Iterator[None]:
+    previous = interpolate_templates.template_cache
+    try:
+        yield
+    finally:
+        interpolate_templates.template_cache = previous
+
+
+@contextlib.contextmanager
+def _loader(loader: Any) -> Iterator[None]:
+    """Make yaml_io load with loader, so read_yaml can be timed with each backend."""
+    previous, yaml_io.SafeLoader = yaml_io.SafeLoader, loader
+    try:
+        yield
+    finally:
+        yaml_io.SafeLoader = previous
+
+
+def bench_resolve(directory: Path, quick: bool) -> Iterator[Result]:
+    """The legacy recursive recurse() against the dependency-graph resolve()."""
+    for size in QUICK_KEYS if quick else KEYS:
+        try:
+            seconds: float | None = measure(recurse, partial(_env, size))
+        except RecursionError:
+            seconds = None
+        yield f"resolve/recurse/{size}", seconds
+        yield f"resolve/resolve/{size}", measure(resolve, partial(_env, size))
+
+
+def bench_read_yaml(directory: Path, quick: bool) -> Iterator[Result]:
+    """read_yaml on env files of growing size, with each YAML loader."""
+    for size in QUICK_KEYS if quick else KEYS:
+        env_file = directory / f"env-{size}.yaml"
+        env = synthetic_env(size)
+        sections: dict[str, dict[str, str]] = {}
+        for i, (key, value) in enumerate(env.items()):
+            sections.setdefault(f"section_{i // 100}", {})[key] = value
+        _ = env_file.write_text(yaml_io.dump(sections))
+        for name, loader in LOADERS.items():
+            with _loader(loader):
+                yield f"read_yaml/{name}/{size}", measure(partial(read_yaml, env_file))
+
+
+def bench_template_writer(directory: Path, quick: bool) -> Iterator[Result]:
+    """template_writer, whole and streamed, against string.Template.safe_substitute of the same template.
+
+    Every run starts without the output and with nothing compiled, as the first render of a template does.
+    """
+    variables = resolve(synthetic_env(1_000))
+    for size in QUICK_TEMPLATE_SIZES if quick else TEMPLATE_SIZES:
+        template_file, output = directory / f"template-{size}.yaml", directory / f"output-{size}.yaml"
+        _ = template_file.write_text(synthetic_template(size, len(variables)))
+        cold = partial(_cold, output)
+        with _restore_template_cache():
+            yield (
+                f"template_writer/safe_substitute/{_size(size)}",
+                measure(partial(_safe_substitute, template_file, output, variables), cold),
+            )
+            yield (
+                f"template_writer/template_writer/{_size(size)}",
+                measure(partial(template_writer, template_file, output, variables), cold),
+            )
+            yield (
+                f"template_writer/stream/{_size(size)}",
+                measure(partial(template_writer, template_file, output, variables, stream=True), cold),
+            )
+
+
+def bench_encode(directory: Path, quick: bool) -> Iterator[Result]:
+    """publish_encode's encode() on secrets bundles of growing size."""
+    for size in QUICK_TEMPLATE_SIZES if quick else TEMPLATE_SIZES:
+        bundle = directory / f"bundle-{size}-secrets-template.yaml"
+        _ = write_bundle(bundle, size, payload_size=min(256 * 1024, max(size // 4, 64)))
+        yield f"publish_encode/encode/{_size(size)}", measure(partial(encode, bundle))
+
+
+def bench_cold_start(directory: Path, quick: bool) -> Iterator[Result]:
+    """Wall clock time of a fresh interpreter running pymake, with and without loading a command."""
+    for args in (("--help",), ("podman", "list-templates")):
+        run_pymake = partial(
+            subprocess.run, [sys.executable, "-c", ENTRY_POINT, *args], cwd=directory, capture_output=True, check=True
+        )
+        yield f"cold_start/{'_'.join(args)}", measure(run_pymake)
+
+
+CASES: dict[str, Callable[[Path, bool], Iterator[Result]]] = {
+    "resolve": bench_resolve,
+    "read_yaml": bench_read_yaml,
+    "template_writer": bench_template_writer,
+    "publish_encode": bench_encode,
+    "cold_start": bench_cold_start,
+}
+
+
+def environment() -> dict[str, str]:
+    """What the results were measured on, saved with them."""
+    return {
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "yaml": yaml_io.backend_info(),
+    }
+
+
+def run(directory: Path, cases: list[str], quick: bool = False) -> Iterator[Result]:
+    """Run cases with directory as the working directory, yielding each result as it is measured."""
+    cwd, directory = Path.cwd(), directory.resolve()
+    os.chdir(directory)
+    try:
+        for case in cases:
+            yield from CASES[case](directory, quick)
+    finally:
+        os.chdir(cwd)
@@ -0,0 +1,137 @@
+"""The asyncio core that commands run their processes and concurrent steps on."""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import shlex
+import subprocess
+from typing import TYPE_CHECKING, TypeVar
+
+import click
+
+from .timings import timings
+
+if TYPE_CHECKING:
+    import threading
+    from collections.abc import Awaitable, Coroutine, Iterable, Sequence
+    from typing import Any
+
+# The exit codes of timeout(1) and of a shell whose child was stopped with Ctrl-C.
+TIMEOUT_EXIT = 124
+INTERRUPT_EXIT = 130
+# How long a process gets to exit after SIGTERM before it is killed.
+TERMINATE_GRACE = 5.0
+# Output is read in chunks of this size, and split into lines here, so a line may be any length.
+READ_SIZE = 64 * 1024
+
+T = TypeVar("T")
+
+__all__ = ["INTERRUPT_EXIT", "TIMEOUT_EXIT", "bounded", "run", "stream"]
+
+
+async def _stop(process: asyncio.subprocess.Process) -> None:
+    if process.returncode is not None:
+        return
+    with contextlib.suppress(ProcessLookupError):
+        process.terminate()
+    try:
+        _ = await asyncio.wait_for(process.wait(), TERMINATE_GRACE)
+    except asyncio.TimeoutError:
+        with contextlib.suppress(ProcessLookupError):
+            process.kill()
+        _ = await process.wait()
+
+
+async def _feed(process: asyncio.subprocess.Process, data: bytes) -> None:
+    assert process.stdin is not None
+    with contextlib.suppress(BrokenPipeError, ConnectionResetError):
+        process.stdin.write(data)
+        await process.stdin.drain()
+        process.stdin.close()
+
+
+async def _echo(process: asyncio.subprocess.Process, prefix: str, lock: threading.Lock | None) -> None:
+    assert process.stdout is not None
+
+    def echo(lines: list[bytes]) -> None:
+        with lock or contextlib.nullcontext():
+            for line in lines:
+                click.secho(f"{prefix}{line.decode(errors='replace').rstrip()}", fg="green")
+
+    pending = b""
+    while chunk := await process.stdout.read(READ_SIZE):
+        *lines, pending = (pending + chunk).split(b"\n")
+        echo(lines)
+    if pending:
+        echo([pending])
+
+
+async def stream(
+    args: Sequence[str],
+    stdin: str | None = None,
+    prefix: str = "",
+    lock: threading.Lock | None = None,
+    timeout: float | None = None,
+) -> int:
+    """Run args, echoing each line of its output as it arrives, and return its exit code.
+
+    Output of processes running at the same time is interleaved line by line. A process still
+    running after timeout seconds is stopped and TIMEOUT_EXIT returned; a cancelled one is
+    stopped before the cancellation propagates.
+    """
+    with timings.phase("subprocess", command=shlex.join(args)) as details:
+        details["exit_code"] = returncode = await _stream(args, stdin, prefix, lock, timeout)
+    return returncode
+
+
+async def _stream(
+    args: Sequence[str], stdin: str | None, prefix: str, lock: threading.Lock | None, timeout: float | None
+) -> int:
+    process = await asyncio.create_subprocess_exec(
+        *args,
+        stdin=subprocess.PIPE if stdin is not None else None,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+    )
+    steps: list[Awaitable[Any]] = [_echo(process, prefix, lock), process.wait()]
+    if stdin is not None:
+        steps.append(_feed(process, stdin.encode()))
+    try:
+        _ = await asyncio.wait_for(asyncio.gather(*steps), timeout)
+    except asyncio.TimeoutError:
+        await _stop(process)
+        with lock or contextlib.nullcontext():
+            click.secho(f"{prefix}{args[0]} timed out after {timeout:g} s", fg="red", err=True)
+        return TIMEOUT_EXIT
+    finally:
+        # Never leave the process running, whatever stopped the steps, cancellation included.
+        await _stop(process)
+    assert process.returncode is not None
+    return process.returncode
+
+
+async def bounded(jobs: int, awaitables: Iterable[Awaitable[T]]) -> list[T]:
+    """Await at most jobs of awaitables at a time, and return their results in order.
+
+    Awaitables should be coroutines, which start only once they are awaited.
+    """
+    semaphore = asyncio.Semaphore(jobs)
+
+    async def limited(awaitable: Awaitable[T]) -> T:
+        async with semaphore:
+            return await awaitable
+
+    return list(await asyncio.gather(*(limited(awaitable) for awaitable in awaitables)))
+
+
+def run(coroutine: Coroutine[Any, Any, T]) -> T:
+    """Run coroutine to completion as the body of a command.
+
+    Ctrl-C cancels it, which stops every process it started, and exits with INTERRUPT_EXIT.
+    """
+    try:
+        return asyncio.run(coroutine)
+    except KeyboardInterrupt:
+        click.secho("Interrupted", fg="red", err=True)
+        raise SystemExit(INTERRUPT_EXIT) from None
@@ -0,0 +1,82 @@
+"""A content address for image builds, so unchanged images are not rebuilt."""
+
+from __future__ import annotations
+
+import glob
+import hashlib
+import json
+import os
+import re
+from pathlib import Path
+
+LABEL = "pymake.digest"
+CHUNK_SIZE = 1024 * 1024
+
+# An instruction, with its backslash-continued lines joined.
+INSTRUCTION_REGEX = re.compile(r"^\s*(COPY|ADD)\s+((?:[^\n]*\\\n)*[^\n]*)", re.IGNORECASE | re.MULTILINE)
+
+__all__ = ["LABEL", "build_digest", "copy_sources", "hash_file"]
+
+
+def copy_sources(containerfile: str) -> list[str]:
+    """The build context sources of every COPY and ADD instruction.
+
+    Sources copied from another stage or image with --from, and remote ADD sources, are left out.
+    """
+    sources: list[str] = []
+    for match in INSTRUCTION_REGEX.finditer(containerfile):
+        arguments = match.group(2).replace("\\\n", " ").strip()
+        if arguments.startswith("["):
+            try:
+                words = json.loads(arguments)
+            except ValueError:
+                continue
+        else:
+            words = arguments.split()
+        if any(word.startswith("--from") for word in words):
+            continue
+        words = [word for word in words if not word.startswith("--")]
+        sources.extend(word for word in words[:-1] if "://" not in word)
+    return sources
+
+
+def hash_file(path: Path | str, hasher: hashlib._Hash | None = None) -> hashlib._Hash:
+    """Feed the file at path to hasher in fixed size chunks, so large files are never read whole."""
+    hasher = hasher or hashlib.sha256()
+    buffer = bytearray(CHUNK_SIZE)
+    view = memoryview(buffer)
+    with open(path, "rb", buffering=0) as fp:
+        while size := fp.readinto(buffer):
+            hasher.update(view[:size])
+    return hasher
+
+
+def _context_files(source: str, context: Path) -> list[Path]:
+    # An absolute source is relative to the build context as well.
+    source = source.lstrip("/")
+    matches = sorted(glob.glob(str(context / source))) if glob.has_magic(source) else [str(context / source)]
+    files: list[Path] = []
+    for match in matches:
+        if os.path.isdir(match):
+            for root, dirs, names in os.walk(match):
+                dirs.sort()
+                files.extend(Path(root) / name for name in sorted(names))
+        else:
+            files.append(Path(match))
+    return files
+
+
+def build_digest(containerfile: Path | str, context: Path | str = ".") -> str:
+    """A SHA-256 over the Containerfile and every build context file its COPY and ADD instructions use."""
+    context = Path(context)
+    digest = hashlib.sha256()
+    text = Path(containerfile).read_text()
+    digest.update(text.encode())
+    for source in copy_sources(text):
+        for path in _context_files(source, context):
+            digest.update(f"\0{path.relative_to(context)}\0".encode())
+            if path.is_file():
+                digest.update(hash_file(path).digest())
+            else:
+                digest.update(b"missing")
+    return digest.hexdigest()
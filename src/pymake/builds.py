@@ -0,0 +1,191 @@
+"""Build several images concurrently, in the order their depends_on edges allow."""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any
+
+import click
+
+from . import aio
+from .build_cache import LABEL, build_digest
+from .graph import CycleError, topological_order
+from .runtime import get_runtime
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Mapping
+
+__all__ = [
+    "BuildError",
+    "BuildResult",
+    "BuildTarget",
+    "critical_path",
+    "load_targets",
+    "report",
+    "run_builds",
+    "run_builds_async",
+    "select",
+]
+
+PENDING = "pending"
+BUILT = "built"
+CACHED = "cached"
+FAILED = "failed"
+SKIPPED = "skipped"
+
+
+class BuildError(ValueError):
+    """The builds list in PyMakeFile.yaml is invalid."""
+
+
+@dataclass(frozen=True)
+class BuildTarget:
+    tag: str
+    containerfile: str
+    context: str = "."
+    depends_on: tuple[str, ...] = ()
+
+
+@dataclass
+class BuildResult:
+    target: BuildTarget
+    status: str = PENDING
+    seconds: float = 0.0
+    dependencies: list[str] = field(default_factory=list)
+
+
+def load_targets(builds: Iterable[Mapping[str, Any]]) -> dict[str, BuildTarget]:
+    """Validate the builds list of PyMakeFile.yaml and return its targets by tag, in dependency order."""
+    targets: dict[str, BuildTarget] = {}
+    for entry in builds:
+        if not isinstance(entry, dict) or "tag" not in entry or "containerfile" not in entry:
+            raise BuildError(f"Every build needs a tag and a containerfile: {entry!r}")
+        depends_on = entry.get("depends_on", ())
+        if isinstance(depends_on, str):
+            depends_on = (depends_on,)
+        target = BuildTarget(
+            str(entry["tag"]), str(entry["containerfile"]), str(entry.get("context", ".")), tuple(depends_on)
+        )
+        if target.tag in targets:
+            raise BuildError(f"Duplicate build tag {target.tag}")
+        targets[target.tag] = target
+    for target in targets.values():
+        if undefined := [tag for tag in target.depends_on if tag not in targets]:
+            raise BuildError(f"{target.tag} depends on undefined {', '.join(undefined)}")
+    graph = {tag: list(target.depends_on) for tag, target in targets.items()}
+    try:
+        return {tag: targets[tag] for tag in topological_order(graph)}
+    except CycleError as e:
+        raise BuildError(f"Circular build dependency: {' -> '.join(e.cycle)}") from e
+
+
+def select(targets: Mapping[str, BuildTarget], tags: Iterable[str]) -> dict[str, BuildTarget]:
+    """The targets named by tags and everything they depend on, in dependency order."""
+    wanted: set[str] = set()
+    stack = list(tags)
+    while stack:
+        tag = stack.pop()
+        if tag not in targets:
+            raise BuildError(f"No build with tag {tag}")
+        if tag not in wanted:
+            wanted.add(tag)
+            stack.extend(targets[tag].depends_on)
+    return {tag: target for tag, target in targets.items() if tag in wanted}
+
+
+async def _build(target: BuildTarget, force: bool, lock: threading.Lock, timeout: float | None) -> str:
+    prefix = f"[{target.tag}] "
+    try:
+        digest = await asyncio.to_thread(build_digest, target.containerfile, target.context)
+    except (OSError, ValueError) as e:
+        with lock:
+            click.secho(f"{prefix}{e}", fg="red", err=True)
+        return FAILED
+    runtime = get_runtime()
+    if not force and await asyncio.to_thread(runtime.image_exists, target.tag, {LABEL: digest}):
+        with lock:
+            click.secho(f"{prefix}up to date ({LABEL}={digest[:12]})", fg="green")
+        return CACHED
+    try:
+        returncode = await asyncio.wait_for(
+            runtime.build_async(
+                target.tag, target.containerfile, target.context, {LABEL: digest}, prefix=prefix, lock=lock
+            ),
+            timeout,
+        )
+    except asyncio.TimeoutError:
+        with lock:
+            click.secho(f"{prefix}podman build timed out after {timeout:g} s", fg="red", err=True)
+        return FAILED
+    if returncode:
+        with lock:
+            click.secho(f"{prefix}podman build exited with {returncode}", fg="red", err=True)
+        return FAILED
+    return BUILT
+
+
+async def run_builds_async(
+    targets: Mapping[str, BuildTarget], jobs: int = 1, force: bool = False, timeout: float | None = None
+) -> dict[str, BuildResult]:
+    """Run every target once all its dependencies have been built, at most jobs at a time.
+
+    Everything depending on a failed build is not run, and is reported as skipped. A build
+    running longer than timeout seconds is stopped and fails.
+    """
+    lock = threading.Lock()
+    semaphore = asyncio.Semaphore(jobs)
+    results = {tag: BuildResult(target, dependencies=list(target.depends_on)) for tag, target in targets.items()}
+    tasks: dict[str, asyncio.Task[None]] = {}
+
+    async def run(result: BuildResult) -> None:
+        _ = await asyncio.gather(*(tasks[dep] for dep in result.dependencies))
+        if any(results[dep].status in (FAILED, SKIPPED) for dep in result.dependencies):
+            result.status = SKIPPED
+            return
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                result.status = await _build(result.target, force, lock, timeout)
+            except OSError as e:
+                with lock:
+                    click.secho(f"[{result.target.tag}] {e}", fg="red", err=True)
+                result.status = FAILED
+            result.seconds = time.perf_counter() - start
+
+    # targets are in dependency order, so every dependency has its task before its dependents.
+    for tag, result in results.items():
+        tasks[tag] = asyncio.create_task(run(result))
+    _ = await asyncio.gather(*tasks.values())
+    return results
+
+
+def run_builds(
+    targets: Mapping[str, BuildTarget], jobs: int = 1, force: bool = False, timeout: float | None = None
+) -> dict[str, BuildResult]:
+    """run_builds_async as the body of a command: Ctrl-C stops every running build."""
+    return aio.run(run_builds_async(targets, jobs, force, timeout))
+
+
+def critical_path(results: Mapping[str, BuildResult]) -> tuple[list[str], float]:
+    """The chain of dependent builds with the longest total time, which bounds the wall clock time.
+
+    Results must be in dependency order, as run_builds returns them.
+    """
+    longest: dict[str, tuple[float, list[str]]] = {}
+    for tag, result in results.items():
+        before = max((longest[dep] for dep in result.dependencies), default=(0.0, []), key=lambda item: item[0])
+        longest[tag] = (before[0] + result.seconds, [*before[1], tag])
+    seconds, path = max(longest.values(), default=(0.0, []), key=lambda item: item[0])
+    return path, seconds
+
+
+def report(results: Mapping[str, BuildResult], wall_clock: float) -> None:
+    width = max((len(tag) for tag in results), default=0)
+    click.secho(f"\n{'Image':<{width}} {'Status':<8} Time", fg="blue")
+    for tag, result in results.items():
+        click.secho(f"{tag:<{width}} {result.status:<8} {result.seconds:>6.1f} s", fg="blue")
+    path, seconds = critical_path(results)
+    click.secho(f"wall clock {wall_clock:.1f} s, critical path {seconds:.1f} s: {' -> '.join(path)}", fg="blue")
@@ -1,22 +1,23 @@
 """A collection of commands."""
 
-import contextlib
+from __future__ import annotations
+
 import json
 import pathlib
-import subprocess
+import sys
+import tempfile
+from typing import IO
 
 import click
-import yaml
-
-LENGTH = 2
+from click.core import ParameterSource
 
-data: dict[str, str] = {}
-with contextlib.suppress(FileNotFoundError), open("PyMakeFile.yaml", "r") as fp:
-    data = yaml.safe_load(fp)
+from .config import config
+from .runtime import get_runtime
 
 
 @click.command(help="Dump the defaults of PyMakeFile.yaml to the terminal.")
 def dump_defaults() -> None:
+    data = config.data
     if data == {}:
         click.secho(
             "No defaults found. Try to run scaffold to create PyMakeFile.yaml with dummy defaults.", fg="red", err=True
@@ -29,14 +30,17 @@ def scaffold() -> None:
     if pathlib.Path("PyMakeFile.yaml").exists():
         click.secho("PyMakeFile.yaml already exists.", fg="red", err=True)
         return
-    with open("PyMakeFile.yaml", "w") as fp:
-        _ = yaml.safe_dump(
+    from . import yaml_io
+    from .output import atomic_open
+
+    with atomic_open("PyMakeFile.yaml") as fp:
+        _ = yaml_io.dump(
             {
                 "tag": "your-app",
                 "containerfile": "ContainerFile",
                 "manage": "your-app-root/manage.py",
                 "container": "your-pod-your-app",
-                "configmaps": ["configmaps/django-env-map-template.yaml", "configmaps/postgres-env-map-template.yaml"],
+                "configmaps": ["configmaps/django-env-map.yaml", "configmaps/postgres-env-map.yaml"],
                 "kube": "play-kube.yaml",
                 "paths": {
                     "config": "./config",
@@ -53,30 +57,116 @@ def scaffold() -> None:
         )
 
 
-@click.command(help="Build the application image.")
+@click.command(help="Build the application image, or the images listed under builds in PyMakeFile.yaml.")
+@click.argument("targets", nargs=-1)
 @click.option(
     "--tag",
     type=str,
-    default=data.get("tag", None),
+    default=config.default("tag"),
     help="Give the app container a tag. This is the same name as given in your play-kube.yaml",
 )
 @click.option(
     "--file",
     type=click.Path(),
-    default=data.get("containerfile", None),
+    default=config.default("containerfile"),
     help="The path to the Containerfile",
 )
-def build(tag: str, file: pathlib.Path) -> None:
-    _ = subprocess.run(
-        [
-            "podman",
-            "build",
-            "--tag",
-            f"{tag}",
-            "-f",
-            f"{file}",
-        ]
-    )
+@click.option(
+    "--force",
+    is_flag=True,
+    default=False,
+    help="Build even if an image with the same content digest already exists.",
+)
+@click.option(
+    "-j",
+    "--jobs",
+    type=click.IntRange(min=1),
+    default=config.default("jobs", 1),
+    show_default=True,
+    help="The number of images to build concurrently.",
+)
+@click.option(
+    "--timeout",
+    type=click.FloatRange(min=0, min_open=True),
+    default=config.default("timeout"),
+    help="Stop a build that runs longer than this many seconds.",
+)
+def build(  # noqa: PLR0913, PLR0917
+    targets: tuple[str, ...], tag: str, file: pathlib.Path, force: bool, jobs: int, timeout: float | None
+) -> None:
+    """Build the application image, unless an image built from the same content already exists.
+
+    The content digest covers the Containerfile and every file its COPY and ADD instructions
+    take from the build context, and is stored on the image as the pymake.digest label.
+
+    When PyMakeFile.yaml lists builds, and neither --tag nor --file is given, every build
+    (or the TARGETS given, with their dependencies) is run in depends_on order instead.
+    """
+    context = click.get_current_context()
+    explicit = any(context.get_parameter_source(name) is ParameterSource.COMMANDLINE for name in ("tag", "file"))
+    if targets or (config.get("builds") and not explicit):
+        _build_all(targets, force, jobs, timeout)
+        return
+
+    if not tag or not file:
+        raise click.UsageError("Give --tag and --file, or set tag and containerfile in PyMakeFile.yaml")
+    from .build_cache import LABEL, build_digest
+
+    try:
+        digest = build_digest(file)
+    except (OSError, ValueError) as e:
+        click.secho(f"{e}", fg="red", err=True)
+        raise SystemExit(1) from e
+    runtime = get_runtime()
+    if not force and runtime.image_exists(tag, {LABEL: digest}):
+        click.secho(f"{tag} is up to date ({LABEL}={digest[:12]})", fg="green")
+        return
+    if timeout is None:
+        returncode = runtime.build(tag, str(file), labels={LABEL: digest})
+    else:
+        import asyncio
+
+        from . import aio
+
+        try:
+            returncode = aio.run(
+                asyncio.wait_for(runtime.build_async(tag, str(file), labels={LABEL: digest}), timeout)
+            )
+        except asyncio.TimeoutError:
+            click.secho(f"podman build timed out after {timeout:g} s", fg="red", err=True)
+            raise SystemExit(aio.TIMEOUT_EXIT) from None
+    if returncode:
+        raise SystemExit(returncode)
+
+
+def _build_all(tags: tuple[str, ...], force: bool, jobs: int, timeout: float | None) -> None:
+    import time
+
+    from .builds import FAILED, SKIPPED, BuildError, load_targets, report, run_builds, select
+
+    try:
+        targets = load_targets(config.get("builds") or [])
+        if tags:
+            targets = select(targets, tags)
+    except BuildError as e:
+        click.secho(f"{e}", fg="red", err=True)
+        raise SystemExit(1) from e
+    if not targets:
+        click.secho("No builds found in PyMakeFile.yaml.", fg="red", err=True)
+        raise SystemExit(1)
+    start = time.perf_counter()
+    results = run_builds(targets, jobs, force, timeout)
+    report(results, time.perf_counter() - start)
+    if any(result.status in (FAILED, SKIPPED) for result in results.values()):
+        raise SystemExit(1)
+
+
+def _read_all(paths: list[pathlib.Path]) -> list[str]:
+    try:
+        return [path.read_text() for path in paths]
+    except OSError as e:
+        click.secho(f"{e}", fg="red", err=True)
+        raise SystemExit(1) from e
 
 
 @click.command(help="Play the Kubernetes configuration.")
@@ -84,29 +174,46 @@ def build(tag: str, file: pathlib.Path) -> None:
     "-k",
     "--kube",
     type=click.Path(),
-    default=data.get("kube", None),
+    default=config.default("kube"),
     help="The path to the Kubernetes configuration file",
 )
 @click.option(
     "--configmap",
-    type=click.Path(),
+    type=str,
     multiple=True,
-    default=tuple(data.get("configmaps", [])),
-    help="""The path to the configmap files.
+    default=config.default("configmaps", ()),
+    help="""A configmap file, a directory of them or a glob pattern. May be given any number of times.
     Example:
-    pymake podman play --configmap configmaps/django-env-map-template.yaml --configmap configmaps/postgres-env-map-template.yaml""",
+    pymake podman play --configmap configmaps/ --configmap 'extra/*-map.yaml'""",
 )
-def play_kube(kube: str, configmap: tuple[str]) -> None:
+@click.option(
+    "--merge",
+    is_flag=True,
+    default=False,
+    help="Merge the configmaps into one multi-document file, so podman reads a single configmap input.",
+)
+@click.option(
+    "--stdin",
+    "use_stdin",
+    is_flag=True,
+    default=False,
+    help="Pipe the Kubernetes configuration and the configmaps to podman as one stream over stdin. "
+    "With --kube -, the Kubernetes configuration is read from stdin.",
+)
+def play_kube(kube: str, configmap: tuple[str, ...], merge: bool, use_stdin: bool) -> None:
     """Play the Kubernetes configuration.
 
     KeyWordArguments:
-    configmap (list[pathlib.Path]): The paths to the configmap files.
+    configmap (list[str]): The configmap files, directories or glob patterns.
 
     Example:
     pymake podman play --kube play-kube.yaml --configmap configmaps/django-env-map-template.yaml --configmap configmaps/postgres-env-map-template.yaml
 
     """
-    if configmap == () or len(configmap) > LENGTH:
+    from .paths import expand
+
+    configmaps = expand(configmap)
+    if not configmaps:
         click.secho(
             """
 Missing one or more configmaps:""",
@@ -120,16 +227,22 @@ Missing one or more configmaps:""",
     """,
             fg="green",
         )
+    elif use_stdin:
+        from .pipeline import join_manifests
+
+        manifests = [sys.stdin.read() if kube == "-" else pathlib.Path(kube).read_text()]
+        manifests.extend(_read_all(configmaps))
+        if returncode := get_runtime().kube_play(join_manifests(manifests)):
+            raise SystemExit(returncode)
+    elif merge:
+        from .pipeline import join_manifests
+
+        with tempfile.NamedTemporaryFile("w", prefix="pymake-configmaps-", suffix=".yaml") as merged:
+            merged.write(join_manifests(_read_all(configmaps)))
+            merged.flush()
+            _ = get_runtime().kube_play_file(kube, [merged.name])
     else:
-        cmd = [
-            "podman",
-            "kube",
-            "play",
-            "--replace",
-            f"{kube}",
-            *[item for x in configmap for item in ("--configmap", x)],
-        ]
-        _ = subprocess.run(cmd)
+        _ = get_runtime().kube_play_file(kube, configmaps)
 
 
 @click.command(
@@ -140,31 +253,30 @@ Missing one or more configmaps:""",
 @click.option(
     "-c",
     "--container",
-    default=data.get("container", None),
+    default=config.default("container"),
     type=str,
     help="The name of the container to run manage.py in.",
 )
 @click.option(
     "-m",
     "--manage-script",
-    default=data.get("manage", None),
+    default=config.default("manage"),
     type=click.Path(),
     help="The relative path to the manage script in the context of the container.",
 )
+@click.option(
+    "--batch",
+    type=click.File("r"),
+    default=None,
+    help="Run the manage.py commands in this file, one per line, in one Django process. Use - for stdin.",
+)
 @click.argument("command", nargs=-1)
-def manage(container: str, manage_script: str, command: tuple[str]) -> None:
+def manage(container: str, manage_script: str, batch: IO[str] | None, command: tuple[str]) -> None:
+    if batch is not None:
+        _manage_batch(container, manage_script, batch)
+        return
     try:
-        _ = subprocess.run(
-            [
-                "podman",
-                "exec",
-                "-it",
-                f"{container}",
-                "python",
-                f"{manage_script}",
-                *command,
-            ],
-        )
+        _ = get_runtime().exec(container, ["python", f"{manage_script}", *command], interactive=True)
     except AttributeError:
         click.secho(
             """Please provide a command to execute in the container.
@@ -173,17 +285,37 @@ def manage(container: str, manage_script: str, command: tuple[str]) -> None:
         )
 
 
+def _manage_batch(container: str, manage_script: str, batch: IO[str]) -> None:
+    """Run every command line of batch in one ManageSession, and exit 1 if any of them failed."""
+    import shlex
+
+    from .manage_session import ManageSession, SessionError
+
+    failed = 0
+    try:
+        with ManageSession(container, manage_script) as session:
+            for line in batch:
+                command = shlex.split(line, comments=True)
+                if not command:
+                    continue
+                click.secho(f"$ manage.py {shlex.join(command)}", fg="blue")
+                result = session.run(command)
+                click.echo(result.output, nl=False)
+                if result.exit_code:
+                    failed += 1
+                    click.secho(f"exited with {result.exit_code}", fg="red", err=True)
+    except SessionError as e:
+        click.secho(f"{e}", fg="red", err=True)
+        raise SystemExit(1) from e
+    if failed:
+        raise SystemExit(1)
+
+
 @click.command(help="Enter bash shell in the context of the container.")
-@click.option("-c", "--container", default=data.get("container"), type=str, help="The name of the container to enter.")
+@click.option(
+    "-c", "--container", default=config.default("container"), type=str, help="The name of the container to enter."
+)
 def bash(container: str | None) -> None:
     if container is None:
         click.secho("You must provide a container.", fg="red", err=True)
-    _ = subprocess.run(
-        [
-            "podman",
-            "exec",
-            "-it",
-            f"{container}",
-            "/bin/bash",
-        ]
-    )
+    _ = get_runtime().exec(f"{container}", ["/bin/bash"], interactive=True)
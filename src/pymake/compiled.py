@@ -0,0 +1,123 @@
+"""Templates compiled once into literal and placeholder segments."""
+
+from __future__ import annotations
+
+import contextlib
+import hashlib
+import json
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from string import Template
+from typing import TYPE_CHECKING, Any
+
+from .output import write_text
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Mapping
+    from os import PathLike
+
+COMPILED_DIR = Path(".pymake/compiled")
+
+__all__ = ["COMPILED_DIR", "CompiledTemplate", "TemplateCache", "compile_template", "template_cache", "unused"]
+
+
+@dataclass(frozen=True)
+class CompiledTemplate:
+    """A template split into literal text and placeholders, with string.Template.safe_substitute semantics.
+
+    parts holds the literal text with an empty slot for every placeholder, and slots holds the
+    (index, name, raw) of each placeholder, where raw is the text left in place when name is missing.
+    """
+
+    digest: str
+    parts: tuple[str, ...]
+    slots: tuple[tuple[int, str, str], ...]
+
+    @property
+    def placeholders(self) -> frozenset[str]:
+        return frozenset(name for _, name, _ in self.slots)
+
+    def render(self, mapping: Mapping[str, Any]) -> str:
+        parts = list(self.parts)
+        for index, name, raw in self.slots:
+            parts[index] = f"{mapping[name]}" if name in mapping else raw
+        return "".join(parts)
+
+    def missing(self, mapping: Mapping[str, Any]) -> set[str]:
+        """The placeholders that mapping has no value for."""
+        return {name for name in self.placeholders if name not in mapping}
+
+    def to_json(self) -> str:
+        return json.dumps({"digest": self.digest, "parts": self.parts, "slots": self.slots})
+
+    @classmethod
+    def from_json(cls, data: str) -> CompiledTemplate:
+        obj = json.loads(data)
+        return cls(obj["digest"], tuple(obj["parts"]), tuple((i, n, r) for i, n, r in obj["slots"]))
+
+
+def compile_template(text: str, digest: str | None = None) -> CompiledTemplate:
+    parts: list[str] = []
+    slots: list[tuple[int, str, str]] = []
+    literal: list[str] = []
+    position = 0
+    for match in Template.pattern.finditer(text):
+        literal.append(text[position : match.start()])
+        position = match.end()
+        name = match.group("named") or match.group("braced")
+        if name is None:  # $$ is an escaped $, and a lone $ is left as it is.
+            literal.append("$")
+            continue
+        parts.append("".join(literal))
+        literal = []
+        slots.append((len(parts), name, match.group()))
+        parts.append("")
+    literal.append(text[position:])
+    parts.append("".join(literal))
+    return CompiledTemplate(digest or hashlib.sha256(text.encode()).hexdigest(), tuple(parts), tuple(slots))
+
+
+def unused(templates: Iterable[CompiledTemplate], mapping: Mapping[str, Any]) -> set[str]:
+    """The variables in mapping that none of templates reference."""
+    referenced = frozenset[str]().union(*(template.placeholders for template in templates))
+    return set(mapping) - referenced
+
+
+class TemplateCache:
+    """Compiled templates cached in memory and in directory, keyed by the hash of the template file."""
+
+    def __init__(self, directory: Path | None = COMPILED_DIR) -> None:
+        self.directory = directory
+        self._compiled: dict[str, CompiledTemplate] = {}
+        self._lock = threading.Lock()
+
+    def load(self, path: PathLike[str] | str) -> CompiledTemplate:
+        data = Path(path).read_bytes()
+        digest = hashlib.sha256(data).hexdigest()
+        with self._lock:
+            compiled = self._compiled.get(digest)
+        if compiled is None:
+            compiled = self._read(digest) or self._write(compile_template(data.decode("utf-8"), digest))
+            with self._lock:
+                self._compiled[digest] = compiled
+        return compiled
+
+    def _read(self, digest: str) -> CompiledTemplate | None:
+        if self.directory is None:
+            return None
+        with contextlib.suppress(OSError, ValueError, KeyError, TypeError):
+            compiled = CompiledTemplate.from_json((self.directory / f"{digest}.json").read_text())
+            if compiled.digest == digest:
+                return compiled
+        return None
+
+    def _write(self, compiled: CompiledTemplate) -> CompiledTemplate:
+        if self.directory is not None:
+            with contextlib.suppress(OSError):
+                self.directory.mkdir(parents=True, exist_ok=True)
+                _ = write_text(self.directory / f"{compiled.digest}.json", compiled.to_json(), fsync=False)
+        return compiled
+
+
+template_cache = TemplateCache()
@@ -0,0 +1,99 @@
+"""The PyMakeFile.yaml configuration, loaded on first access."""
+
+from __future__ import annotations
+
+import contextlib
+import marshal
+import os
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from .timings import timings
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+CONFIG_FILE = Path("PyMakeFile.yaml")
+CACHE_FILE = Path(".pymake/pymakefile.cache")
+NO_CACHE_ENV = "PYMAKE_NO_CONFIG_CACHE"
+
+__all__ = ["CONFIG_FILE", "Config", "config"]
+
+
+class Config:
+    """PyMakeFile.yaml, parsed the first time a value is needed.
+
+    The parsed file is kept in a marshalled cache keyed by the file's path, mtime and size,
+    so unchanged files are not parsed again. Set PYMAKE_NO_CONFIG_CACHE=1 to disable the cache.
+    """
+
+    def __init__(self, path: Path = CONFIG_FILE, cache_file: Path | None = CACHE_FILE) -> None:
+        self.path = path
+        self.cache_file = cache_file
+        self._data: dict[str, Any] | None = None
+        self._loaded_from = ""
+
+    @property
+    def data(self) -> dict[str, Any]:
+        """The parsed file. A relative path is looked up again if the working directory changes."""
+        path = os.path.abspath(self.path)
+        if self._data is None or path != self._loaded_from:
+            with timings.phase("config load", file=str(self.path)):
+                self._data, self._loaded_from = self._load(), path
+        return self._data
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self.data.get(key, default)
+
+    def default(self, key: str, fallback: Any = None) -> Callable[[], Any]:
+        """A click option default that looks up key only when the option needs it.
+
+        Example:
+        @click.option("--tag", default=config.default("tag"))
+
+        """
+
+        def _default() -> Any:
+            value = self.get(key, fallback)
+            return tuple(value) if isinstance(value, list) else value
+
+        return _default
+
+    def reset(self) -> None:
+        self._data = None
+
+    def _load(self) -> dict[str, Any]:
+        try:
+            st = self.path.stat()
+        except OSError:
+            return {}
+        key = (str(self.path.resolve()), st.st_mtime_ns, st.st_size)
+        cache_file = None if os.environ.get(NO_CACHE_ENV) else self.cache_file
+        if cache_file is not None and (cached := _read_cache(cache_file, key)) is not None:
+            return cached
+        from . import yaml_io
+
+        with open(self.path, "rb") as fp:
+            data = yaml_io.load(fp) or {}
+        if cache_file is not None:
+            _write_cache(cache_file, key, data)
+        return data
+
+
+def _read_cache(cache_file: Path, key: tuple[str, int, int]) -> dict[str, Any] | None:
+    with contextlib.suppress(OSError, EOFError, ValueError, TypeError):
+        cached_key, data = marshal.loads(cache_file.read_bytes())
+        if tuple(cached_key) == key and isinstance(data, dict):
+            return data
+    return None
+
+
+def _write_cache(cache_file: Path, key: tuple[str, int, int], data: dict[str, Any]) -> None:
+    from .output import write_bytes
+
+    with contextlib.suppress(OSError, ValueError):
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        _ = write_bytes(cache_file, marshal.dumps((key, data)), fsync=False)
+
+
+config = Config()
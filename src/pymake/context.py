@@ -0,0 +1,54 @@
+"""A resolved substitution context shared by every template render."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from .resolve import resolve
+from .timings import timings
+
+if TYPE_CHECKING:
+    from collections.abc import Mapping
+    from os import PathLike
+
+__all__ = ["EnvContext", "flatten", "read_yaml"]
+
+
+def read_yaml(yaml_file: PathLike[str] | str) -> dict[str, Any]:
+    from . import yaml_io
+
+    with open(yaml_file, "rb") as fp, timings.phase("yaml parse", file=str(yaml_file)):
+        data: dict[str, Any] = yaml_io.load(fp)
+    return data
+
+
+def flatten(yaml_dict: Mapping[str, Mapping[str, Any]]) -> dict[str, Any]:
+    """Merge the sections of an env file into one mapping of variables."""
+    return {key: value for section_dict in yaml_dict.values() for key, value in section_dict.items()}
+
+
+@dataclass(frozen=True)
+class EnvContext:
+    """The variables of an env file, read, flattened and resolved exactly once.
+
+    Example:
+    context = EnvContext.load("config/templates/template-envs.yaml")
+    context.variables["APPSERVICE_NAME"]
+
+    """
+
+    source: Path
+    variables: Mapping[str, Any]
+
+    @classmethod
+    def load(cls, yaml_file: PathLike[str] | str) -> EnvContext:
+        """Raises pymake.resolve.ResolveError on undefined or circular references."""
+        return cls.from_dict(read_yaml(yaml_file), source=Path(yaml_file))
+
+    @classmethod
+    def from_dict(cls, yaml_dict: Mapping[str, Mapping[str, Any]], source: Path | None = None) -> EnvContext:
+        variables = flatten(yaml_dict)
+        with timings.phase("resolve", variables=len(variables)):
+            return cls(source=source or Path(), variables=resolve(variables))
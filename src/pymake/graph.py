@@ -0,0 +1,47 @@
+"""Order the nodes of a dependency graph, where every node lists the nodes it depends on."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator, Mapping, Sequence
+
+_VISITING = 1
+_DONE = 2
+
+__all__ = ["CycleError", "topological_order"]
+
+
+class CycleError(ValueError):
+    def __init__(self, cycle: list[str]) -> None:
+        self.cycle = cycle
+        super().__init__(f"Cycle: {' -> '.join(cycle)}")
+
+
+def topological_order(graph: Mapping[str, Sequence[str]]) -> Iterator[str]:
+    """Yield every node after the nodes it depends on, without recursing.
+
+    Every dependency must be a node of graph. Raises CycleError, holding the nodes of the cycle
+    with the first repeated at the end, when the dependencies go round in a circle.
+    """
+    state: dict[str, int] = {}
+    for root in graph:
+        if root in state:
+            continue
+        state[root] = _VISITING
+        stack = [(root, iter(graph[root]))]
+        while stack:
+            node, children = stack[-1]
+            for child in children:
+                if child not in state:
+                    state[child] = _VISITING
+                    stack.append((child, iter(graph[child])))
+                    break
+                if state[child] == _VISITING:
+                    path = [name for name, _ in stack]
+                    raise CycleError([*path[path.index(child) :], child])
+            else:
+                _ = stack.pop()
+                state[node] = _DONE
+                yield node
@@ -1,58 +1,141 @@
 """A template parser."""
 
+from __future__ import annotations
+
 import pprint
-import re
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from string import Template
-from typing import Any
+from typing import TYPE_CHECKING, Any
+
+import click
 
-from yaml import load
+from .compiled import CompiledTemplate, template_cache, unused
+from .context import EnvContext, read_yaml
+from .output import write_text
+from .pipeline import join_manifests
+from .render_cache import RenderCache
+from .resolve import ResolveError
+from .runtime import get_runtime
+from .streaming import stream_template
+from .templates import Registry, RegistryError, TemplateType, load_registry
+from .timings import timings
 
-from .templates import TEMPLATES
+if TYPE_CHECKING:
+    from collections.abc import Mapping, Sequence
 
-try:
-    from yaml import CLoader as Loader
-except ImportError:
-    from yaml import Loader
+__all__ = [
+    "check_templates",
+    "interpolate_templates",
+    "list_templates",
+    "load_context",
+    "load_templates",
+    "read_yaml",
+    "yamlparser",
+]
 
-import click
 
-SIMPLE_REGEX = re.compile(r"\${(.*?)\}")
+def _write_output(template_outfile: Path, text: str, remove: bool = False) -> None:
+    _ = write_text(template_outfile, text)
+    if remove:
+        (Path(template_outfile).parent / "remove").touch()
 
-__all__ = ["yamlparser", "interpolate_templates", "list_templates"]
 
+def template_writer(
+    template_innfile: Path, template_outfile: Path, data: Mapping[str, Any], remove: bool = False, stream: bool = False
+) -> None:
+    """Render template_innfile to template_outfile. With stream, it is rendered chunk by chunk."""
+    with timings.phase("render", template=str(template_innfile)) as details:
+        if stream:
+            details["stream"] = True
+            stream_template(template_innfile, template_outfile, data, remove)
+            return
+        _write_output(template_outfile, template_cache.load(template_innfile).render(data), remove)
 
-def read_yaml(yaml_file: Path) -> dict[str, Any]:
-    with open(yaml_file, "rb") as fp:
-        return load(fp, Loader)
 
+def load_context(yaml_file: Path) -> EnvContext:
+    try:
+        return EnvContext.load(yaml_file)
+    except ResolveError as e:
+        click.secho(f"{yaml_file}: {e}", fg="red", err=True)
+        raise SystemExit(1) from e
 
-def template_writer(
-    template_innfile: Path, template_outfile: Path, data: dict[str, Any], remove: bool = False
+
+def load_templates() -> Registry:
+    try:
+        return load_registry()
+    except RegistryError as e:
+        click.secho(f"templates: {e}", fg="red", err=True)
+        raise SystemExit(1) from e
+
+
+def _yamlparser(
+    context: EnvContext, inn_bound: Path, out_bound: Path, remove: bool = False, stream: bool = False
 ) -> None:
-    with open(template_innfile, "r") as inn_fp:
-        template = Template(inn_fp.read())
-    with open(template_outfile, "w") as out_fp:
-        out_fp.write(template.safe_substitute(data))
-        if remove:
-            (Path(template_outfile).parent / "remove").touch()
+    template_writer(inn_bound, out_bound, context.variables, remove, stream)
+
+
+def render_template(
+    context: EnvContext,
+    template: TemplateType,
+    cache: RenderCache | None = None,
+    compiled: CompiledTemplate | None = None,
+    stream: bool = False,
+) -> bool:
+    """Render one template. Returns False when the cache shows the output is already up to date.
+
+    compiled, when given, is used instead of loading the template file through the template cache.
+    With stream, the template is rendered chunk by chunk and always written, since the cache
+    needs the whole template to fingerprint it.
+    """
+    inn_bound, out_bound = template["templatefile"], template["parsedfile"]
+    if stream:
+        template_writer(inn_bound, out_bound, context.variables, template["remove"], stream=True)
+        return True
+    with timings.phase("render", template=str(inn_bound)) as details:
+        compiled = compiled or template_cache.load(inn_bound)
+        if cache is None:
+            _write_output(out_bound, compiled.render(context.variables), template["remove"])
+            return True
+        fingerprint = cache.fingerprint(compiled, context.variables)
+        if cache.is_fresh(inn_bound, out_bound, fingerprint):
+            details["fresh"] = True
+            return False
+        output = compiled.render(context.variables)
+        _write_output(out_bound, output, template["remove"])
+        cache.record(inn_bound, out_bound, fingerprint, output)
+        return True
+
+
+def is_manifest(template: TemplateType) -> bool:
+    return Path(template["parsedfile"]).suffix in (".yaml", ".yml")
+
 
+def render_manifest(context: EnvContext, template: TemplateType) -> str:
+    """Render a manifest template in memory. Secrets templates are returned base64 encoded."""
+    from .publish_encode import TEMPLATE_SUFFIX, encode_text
 
-def recurse(d: dict[str, Any]) -> dict[str, Any]:
-    for key, value in d.items():
-        if items := SIMPLE_REGEX.findall(value):
-            for i in items:
-                if not SIMPLE_REGEX.findall(i):
-                    d[key] = value.replace(f"${{{i}}}", d[i])
-                    recurse(d)
-    return d
+    with timings.phase("render", template=str(template["templatefile"])):
+        rendered = template_cache.load(template["templatefile"]).render(context.variables)
+        if Path(template["templatefile"]).name.endswith(TEMPLATE_SUFFIX):
+            return encode_text(rendered)
+        return rendered
 
 
-def _yamlparser(yaml_file: Path, inn_bound: Path, out_bound: Path, remove: bool = False) -> None:
-    yaml_dict = read_yaml(yaml_file)
-    substituted_dict = {key: value for section_dict in yaml_dict.values() for key, value in section_dict.items()}
-    substituted_dict = recurse(substituted_dict)
-    template_writer(inn_bound, out_bound, substituted_dict, remove)
+def render_templates(
+    context: EnvContext,
+    templates: Sequence[TemplateType],
+    jobs: int = 1,
+    cache: RenderCache | None = None,
+    stream: bool = False,
+) -> list[tuple[TemplateType, bool | BaseException]]:
+    """Render templates with up to jobs worker threads.
+
+    Returns every template paired with the result of render_template, or the error it raised,
+    in the order given.
+    """
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        futures = [pool.submit(render_template, context, template, cache, None, stream) for template in templates]
+    return [(template, future.exception() or future.result()) for template, future in zip(templates, futures)]
 
 
 @click.command("yamlparser", help="Interpolate the yaml configuration template files and write production files.")
@@ -77,25 +160,105 @@ def _yamlparser(yaml_file: Path, inn_bound: Path, out_bound: Path, remove: bool
     required=True,
     help="The path to where to store the interpolated template.",
 )
-def yamlparser(yaml_file: Path, inn_bound: Path, out_bound: Path) -> None:
-    _yamlparser(yaml_file, inn_bound, out_bound)
+@click.option(
+    "--stream",
+    is_flag=True,
+    default=False,
+    help="Render the template chunk by chunk, so memory use stays small however large it is.",
+)
+def yamlparser(yaml_file: Path, inn_bound: Path, out_bound: Path, stream: bool) -> None:
+    _yamlparser(load_context(yaml_file), inn_bound, out_bound, stream=stream)
 
 
 @click.command(help="List all the defined templates.")
 def list_templates() -> None:
     click.secho("Available templates:", fg="green")
-    for template in TEMPLATES:
+    for template in load_templates().all:
         click.secho(template["templatefile"], fg="blue")
 
 
+@click.command(help="Report template placeholders without a variable, and variables no template uses.")
+def check_templates() -> None:
+    registry = load_templates()
+    context = load_context(registry.env["templatefile"])
+    compiled = []
+    for template in registry.templates:
+        try:
+            compiled.append(template_cache.load(template["templatefile"]))
+        except OSError as e:
+            click.secho(f"{template['templatefile']}: {e}", fg="red", err=True)
+            continue
+        if missing := compiled[-1].missing(context.variables):
+            click.secho(f"{template['templatefile']}: no variable for {', '.join(sorted(missing))}", fg="yellow")
+    if not_used := unused(compiled, context.variables):
+        click.secho(f"{context.source}: not used by any template: {', '.join(sorted(not_used))}", fg="yellow")
+
+
 @click.command(help="Interpolate and write out production yaml files for all the defined templates.")
-def interpolate_templates() -> None:
-    t = iter(TEMPLATES)
-    config = next(t)
-    for template in t:
-        _yamlparser(
-            yaml_file=config["templatefile"],
-            inn_bound=template["templatefile"],
-            out_bound=template["parsedfile"],
-            remove=template["remove"],
-        )
+@click.option(
+    "-j",
+    "--jobs",
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+    help="The number of templates to render concurrently.",
+)
+@click.option(
+    "--force",
+    is_flag=True,
+    default=False,
+    help="Render every template, even those the render cache reports as unchanged.",
+)
+@click.option(
+    "--stdin",
+    "use_stdin",
+    is_flag=True,
+    default=False,
+    help="Render the Kubernetes manifests in memory, encode the secrets, and pipe them all to "
+    "podman kube play over stdin instead of writing them to disk.",
+)
+@click.option(
+    "--stream",
+    is_flag=True,
+    default=False,
+    help="Render the templates written to disk chunk by chunk, so memory use stays small however "
+    "large they are. Every template is rendered, as with --force.",
+)
+def interpolate_templates(jobs: int, force: bool, use_stdin: bool, stream: bool) -> None:
+    registry = load_templates()
+    context = load_context(registry.env["templatefile"])
+    templates = registry.templates
+    manifests = [template for template in templates if use_stdin and is_manifest(template)]
+    cache = RenderCache() if force else RenderCache.load()
+    failed = False
+    files = [t for t in templates if t not in manifests]
+    for template, result in render_templates(context, files, jobs, cache, stream):
+        if isinstance(result, BaseException):
+            failed = True
+            click.secho(f"{template['templatefile']}: {result}", fg="red", err=True)
+        elif result:
+            click.secho(f"{template['parsedfile']} created", fg="green")
+        else:
+            click.secho(f"{template['parsedfile']} unchanged", fg="blue")
+    cache.save()
+    if manifests and not failed:
+        failed = not _play_manifests(context, manifests)
+    if failed:
+        raise SystemExit(1)
+
+
+def _play_manifests(context: EnvContext, manifests: Sequence[TemplateType]) -> bool:
+    from .publish_encode import ENCODE_ERRORS
+
+    rendered = []
+    for template in manifests:
+        try:
+            rendered.append(render_manifest(context, template))
+        except ENCODE_ERRORS as e:
+            click.secho(f"{template['templatefile']}: {e}", fg="red", err=True)
+            return False
+    click.secho(f"Playing {len(rendered)} manifests over stdin", fg="blue")
+    if returncode := get_runtime().kube_play(join_manifests(rendered)):
+        click.secho(f"podman kube play exited with {returncode}", fg="red", err=True)
+        return False
+    return True
@@ -0,0 +1,63 @@
+"""A click group that imports its subcommands only when they are needed."""
+
+from __future__ import annotations
+
+import importlib
+from typing import Any
+
+import click
+
+from .timings import timings
+
+__all__ = ["LazyGroup"]
+
+
+class LazyGroup(click.Group):
+    """A click.Group whose lazy_subcommands map a command name to "module:attribute" and its short help.
+
+    The module is imported the first time the command is looked up, so invoking one command
+    does not import the others. --help lists the commands with the short help given here, and
+    imports none of them.
+
+    Example:
+    @click.group(cls=LazyGroup, lazy_subcommands={"build": ("pymake.cmds:build", "Build the image.")})
+    def cli() -> None:
+        pass
+
+    """
+
+    def __init__(self, *args: Any, lazy_subcommands: dict[str, tuple[str, str]] | None = None, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.lazy_subcommands = lazy_subcommands or {}
+
+    def list_commands(self, ctx: click.Context) -> list[str]:
+        return sorted({*super().list_commands(ctx), *self.lazy_subcommands})
+
+    def get_command(self, ctx: click.Context, cmd_name: str) -> click.Command | None:
+        if cmd_name in self.lazy_subcommands:
+            return self._load(cmd_name)
+        return super().get_command(ctx, cmd_name)
+
+    def format_commands(self, ctx: click.Context, formatter: click.HelpFormatter) -> None:
+        commands: list[tuple[str, click.Command]] = []
+        for name in self.list_commands(ctx):
+            if name in self.lazy_subcommands:
+                # A stand-in holding only the help, which get_short_help_str shortens like the real command's.
+                command: click.Command | None = click.Command(name, help=self.lazy_subcommands[name][1])
+            else:
+                command = super().get_command(ctx, name)
+            if command is not None and not command.hidden:
+                commands.append((name, command))
+        if commands:
+            limit = formatter.width - 6 - max(len(name) for name, _ in commands)
+            with formatter.section("Commands"):
+                formatter.write_dl([(name, command.get_short_help_str(limit)) for name, command in commands])
+
+    def _load(self, cmd_name: str) -> click.Command:
+        import_path = self.lazy_subcommands[cmd_name][0]
+        module_name, attribute = import_path.split(":")
+        with timings.phase("import", module=module_name):
+            command = getattr(importlib.import_module(module_name), attribute)
+        if not isinstance(command, click.Command):
+            raise TypeError(f"{import_path} is not a click command")
+        return command
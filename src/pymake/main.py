@@ -1,31 +1,152 @@
+# SPDX-FileCopyrightText: 2024-present Rune Hansén Steinnes <rune.steinnes@westum.no>
+#
+# SPDX-License-Identifier: MIT
 """A make file replacement."""
 
+from __future__ import annotations
+
 import click
 
-from .cmds import bash, build, dump_defaults, manage, play_kube, scaffold
-from .interpolate_templates import interpolate_templates, yamlparser, list_templates
-from .publish_encode import publish_encode
-from .write_templates import podman_scaffold
+from .__about__ import __version__
+from .lazy_group import LazyGroup
+
+
+class CLI(LazyGroup):
+    def parse_args(self, ctx: click.Context, args: list[str]) -> list[str]:
+        # --timings takes an optional value, so a bare --timings would take the command name as its value.
+        commands = set(self.list_commands(ctx))
+        end = next((i for i, arg in enumerate(args) if arg in commands), len(args))
+        args = [
+            "--timings=text" if arg == "--timings" and args[i + 1 : i + 2] not in (["text"], ["json"]) else arg
+            for i, arg in enumerate(args[:end])
+        ] + args[end:]
+        return super().parse_args(ctx, args)
+
+
+def _enable_timings(ctx: click.Context, param: click.Parameter, value: str | None) -> None:
+    """Start recording before the subcommand is imported, so its import is timed too."""
+    if value is None or ctx.resilient_parsing:
+        return
+    from .timings import timings
+
+    def report() -> None:
+        timings.report(value)
+        timings.disable()
+
+    timings.enable()
+    ctx.call_on_close(report)
+
+
+def _enable_profile(ctx: click.Context, param: click.Parameter, value: str | None) -> None:
+    if value is None or ctx.resilient_parsing:
+        return
+    import cProfile
+
+    profile = cProfile.Profile()
+
+    def dump() -> None:
+        profile.disable()
+        profile.dump_stats(value)
+
+    ctx.call_on_close(dump)
+    profile.enable()
 
 
-@click.group(help="General commands")
-def cli() -> None:
-    pass
+@click.group(
+    cls=CLI,
+    help="General commands",
+    invoke_without_command=True,
+    no_args_is_help=True,
+    lazy_subcommands={
+        "scaffold": ("pymake.cmds:scaffold", "Scaffold a PyMakeFile.yaml with dummy defaults."),
+        "dump-defaults": ("pymake.cmds:dump_defaults", "Dump the defaults of PyMakeFile.yaml to the terminal."),
+        "watch": (
+            "pymake.watch:watch",
+            "Watch the env file and templates, and re-render the affected templates on every change.",
+        ),
+    },
+)
+@click.option(
+    "--timings",
+    type=click.Choice(["text", "json"]),
+    is_flag=False,
+    flag_value="text",
+    default=None,
+    expose_value=False,
+    is_eager=True,
+    callback=_enable_timings,
+    help="Print the time spent in each phase to stderr when the command ends, as a table or with --timings=json as JSON.",
+)
+@click.option(
+    "--profile",
+    type=click.Path(dir_okay=False, writable=True),
+    default=None,
+    expose_value=False,
+    is_eager=True,
+    callback=_enable_profile,
+    help="Run the command under cProfile and write the stats to this file, for pstats or snakeviz.",
+)
+@click.option("--version", is_flag=True, default=False, help="Show the version and exit.")
+@click.option("-v", "--verbose", is_flag=True, default=False, help="With --version, also show the YAML backend.")
+@click.pass_context
+def cli(ctx: click.Context, version: bool, verbose: bool) -> None:
+    if version:
+        click.echo(f"pymake {__version__}")
+        if verbose:
+            from .yaml_io import backend_info
 
+            click.echo(backend_info())
+        ctx.exit()
+    if ctx.invoked_subcommand is None:
+        click.echo(ctx.get_help())
 
-@cli.group(help="Podman particular commands")
-def podman() -> None:
-    pass
 
+@cli.group(
+    cls=LazyGroup,
+    help="Podman particular commands",
+    lazy_subcommands={
+        "manage": ("pymake.cmds:manage", "Run manage.py in the context of the container."),
+        "bash": ("pymake.cmds:bash", "Enter bash shell in the context of the container."),
+        "build": (
+            "pymake.cmds:build",
+            "Build the application image, or the images listed under builds in PyMakeFile.yaml.",
+        ),
+        "play": ("pymake.cmds:play_kube", "Play the Kubernetes configuration."),
+        "scaffold": (
+            "pymake.write_templates:podman_scaffold",
+            "Scaffold the yaml files for a typical django project with dummy values.",
+        ),
+        "yamlparser": (
+            "pymake.interpolate_templates:yamlparser",
+            "Interpolate the yaml configuration template files and write production files.",
+        ),
+        "publish-encode": ("pymake.publish_encode:publish_encode", "Encode and optionally publish secrets to podman."),
+        "interpolate-templates": (
+            "pymake.interpolate_templates:interpolate_templates",
+            "Interpolate and write out production yaml files for all the defined templates.",
+        ),
+        "list-templates": ("pymake.interpolate_templates:list_templates", "List all the defined templates."),
+        "check-templates": (
+            "pymake.interpolate_templates:check_templates",
+            "Report template placeholders without a variable, and variables no template uses.",
+        ),
+        "up": (
+            "pymake.up:up",
+            "Render the templates, encode the secrets and play the pod with all its configmaps, in one step.",
+        ),
+    },
+)
+@click.option(
+    "--runtime",
+    type=str,
+    default=None,
+    help="The container runtime: podman (default) or podman-api. Also read from $PYMAKE_RUNTIME.",
+)
+def podman(runtime: str | None) -> None:
+    if runtime is not None:
+        from .runtime import create_runtime, set_runtime
 
-cli.add_command(scaffold)
-cli.add_command(dump_defaults)
-podman.add_command(manage)
-podman.add_command(bash)
-podman.add_command(build)
-podman.add_command(play_kube, "play")
-podman.add_command(podman_scaffold, "scaffold")
-podman.add_command(yamlparser)
-podman.add_command(publish_encode)
-podman.add_command(interpolate_templates)
-podman.add_command(list_templates)
+        try:
+            _ = set_runtime(create_runtime(runtime))
+        except ValueError as e:
+            raise click.BadParameter(str(e), param_hint="--runtime") from e
@@ -0,0 +1,158 @@
+"""Run many manage.py commands in one long-lived Django process inside the container."""
+
+from __future__ import annotations
+
+import contextlib
+import json
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Protocol
+
+from .runtime import get_runtime
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+    from types import TracebackType
+    from typing import Self
+
+    from .runtime import Process
+
+__all__ = ["SERVER", "CommandResult", "ManageSession", "SessionError"]
+
+# Runs inside the container as python -c SERVER manage.py. manage.py is executed once with
+# execute_from_command_line disabled, so it only configures DJANGO_SETTINGS_MODULE, then
+# every JSON argv line on stdin is run and answered with one JSON line on stdout.
+SERVER = """
+import contextlib, io, json, os, runpy, sys, traceback
+
+script = sys.argv[1]
+sys.path.insert(0, os.path.dirname(os.path.abspath(script)))
+requests, reply = sys.stdin, sys.stdout
+
+
+def run(function, *args):
+    buffer = io.StringIO()
+    code = 0
+    # A command that prompts reads an empty stdin, instead of the requests that follow.
+    sys.stdin = io.StringIO()
+    with contextlib.redirect_stdout(buffer), contextlib.redirect_stderr(buffer):
+        try:
+            function(*args)
+        except SystemExit as e:
+            if isinstance(e.code, str):
+                print(e.code, file=sys.stderr)
+            code = e.code if isinstance(e.code, int) else int(e.code is not None)
+        except BaseException:
+            traceback.print_exc()
+            code = 1
+        finally:
+            sys.stdin = requests
+    reply.write(json.dumps({"exit_code": code, "output": buffer.getvalue()}) + "\\n")
+    reply.flush()
+    return code
+
+
+def setup():
+    from django.core import management
+
+    execute = management.execute_from_command_line
+    management.execute_from_command_line = lambda argv=None: None
+    try:
+        sys.argv = [script]
+        runpy.run_path(script, run_name="__main__")
+    finally:
+        management.execute_from_command_line = execute
+    import django
+
+    django.setup()
+
+
+if run(setup) == 0:
+    from django.core.management import execute_from_command_line
+
+    for line in requests:
+        run(execute_from_command_line, [script, *json.loads(line)])
+"""
+
+
+class SessionError(RuntimeError):
+    """The Django process failed to start, or exited while a command was running."""
+
+
+class Runner(Protocol):
+    def __call__(self, container: str, args: Sequence[str]) -> Process: ...
+
+
+@dataclass(frozen=True)
+class CommandResult:
+    command: tuple[str, ...]
+    exit_code: int
+    output: str
+
+
+class ManageSession:
+    """One Django process in container that runs manage.py commands sent to it, one at a time.
+
+    Example:
+    with ManageSession("my-pod-app", "app/manage.py") as session:
+        result = session.run(["migrate", "--noinput"])
+
+    """
+
+    def __init__(self, container: str, manage_script: str, runner: Runner | None = None) -> None:
+        self.container = container
+        self.manage_script = manage_script
+        self.runner = runner or get_runtime().spawn
+        self._process: Process | None = None
+
+    def start(self) -> None:
+        """Start the process and wait for Django to be set up. Raises SessionError if that fails."""
+        self._process = self.runner(self.container, ["python", "-u", "-c", SERVER, self.manage_script])
+        ready = self._reply(())
+        if ready.exit_code:
+            self.close()
+            raise SessionError(f"Django failed to start in {self.container}:\n{ready.output}")
+
+    def run(self, command: Sequence[str]) -> CommandResult:
+        """Run one manage.py command and return its exit code and combined stdout and stderr."""
+        if self._process is None:
+            self.start()
+        assert self._process is not None and self._process.stdin is not None
+        try:
+            self._process.stdin.write(json.dumps(list(command)) + "\n")
+            self._process.stdin.flush()
+        except BrokenPipeError as e:
+            raise SessionError(f"The Django process in {self.container} has exited") from e
+        return self._reply(tuple(command))
+
+    def _reply(self, command: tuple[str, ...]) -> CommandResult:
+        assert self._process is not None and self._process.stdout is not None
+        line = self._process.stdout.readline()
+        if not line:
+            raise SessionError(f"The Django process in {self.container} has exited")
+        try:
+            reply = json.loads(line)
+        except ValueError as e:
+            raise SessionError(f"Unexpected output from the Django process: {line.rstrip()}") from e
+        return CommandResult(command, reply["exit_code"], reply["output"])
+
+    def close(self) -> None:
+        if self._process is None:
+            return
+        if self._process.stdin is not None:
+            with contextlib.suppress(BrokenPipeError):
+                self._process.stdin.close()
+        _ = self._process.wait()
+        if self._process.stdout is not None:
+            self._process.stdout.close()
+        self._process = None
+
+    def __enter__(self) -> Self:
+        """Start the session."""
+        self.start()
+        return self
+
+    def __exit__(
+        self, exc_type: type[BaseException] | None, exc: BaseException | None, traceback: TracebackType | None
+    ) -> None:
+        """Close the session, whether or not the block raised."""
+        self.close()
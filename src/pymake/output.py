@@ -0,0 +1,137 @@
+"""Write output files atomically, and leave files that already hold the same content untouched.
+
+A file is written to a temporary file beside it and renamed into place, so a reader such as
+podman kube play sees either the old or the new content, never part of it. Set PYMAKE_FSYNC=1
+to also flush every write to disk before it is renamed.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import hashlib
+import os
+import tempfile
+from pathlib import Path
+from typing import IO, TYPE_CHECKING, Any
+
+from .build_cache import hash_file
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+    from os import PathLike
+
+FSYNC_ENV = "PYMAKE_FSYNC"
+
+__all__ = ["FSYNC_ENV", "atomic_open", "fsync_enabled", "is_identical", "write_bytes", "write_text"]
+
+
+def _read_umask() -> int:
+    umask = os.umask(0)
+    _ = os.umask(umask)
+    return umask
+
+
+# Reading the umask sets it, for every thread of the process, so it is read once, at import,
+# before any worker thread creates files or directories.
+_UMASK = _read_umask()
+
+
+def fsync_enabled() -> bool:
+    """True when $PYMAKE_FSYNC asks for writes to be flushed to disk."""
+    return os.environ.get(FSYNC_ENV, "").lower() not in ("", "0", "false", "no")
+
+
+def _size(path: PathLike[str] | str) -> int | None:
+    try:
+        return os.stat(path).st_size
+    except OSError:
+        return None
+
+
+def is_identical(path: PathLike[str] | str, data: bytes) -> bool:
+    """True when the file at path holds data. Sizes are compared first, so most changes are found without reading."""
+    if _size(path) != len(data):
+        return False
+    try:
+        return hash_file(Path(path)).digest() == hashlib.sha256(data).digest()
+    except OSError:
+        return False
+
+
+def _same_content(path: Path, other: Path) -> bool:
+    size = _size(path)
+    if size is None or size != _size(other):
+        return False
+    try:
+        return hash_file(path).digest() == hash_file(other).digest()
+    except OSError:
+        return False
+
+
+def _mode(path: Path) -> int:
+    """The permissions to give path: those of the file it replaces, or the default for a new file."""
+    try:
+        return os.stat(path).st_mode & 0o7777
+    except OSError:
+        return 0o666 & ~_UMASK
+
+
+def _sync_directory(directory: Path) -> None:
+    with contextlib.suppress(OSError):
+        fd = os.open(directory, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+
+@contextlib.contextmanager
+def atomic_open(
+    path: PathLike[str] | str, mode: str = "w", fsync: bool | None = None, compare: bool = True, **kwargs: Any
+) -> Iterator[IO[Any]]:
+    """Open a temporary file to be renamed to path when the with block succeeds.
+
+    The temporary file is discarded instead when the block raises, or, with compare, when path
+    already holds the same content. mode is "w" or "wb", and kwargs are passed on to open.
+    fsync defaults to fsync_enabled().
+
+    Example:
+    with atomic_open("bundle-secrets.yaml") as fp:
+        yaml_io.dump_all(documents, fp)
+
+    """
+    path = Path(path)
+    fsync = fsync_enabled() if fsync is None else fsync
+    fd, name = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=path.parent)
+    temporary = Path(name)
+    try:
+        with os.fdopen(fd, mode, **kwargs) as fp:
+            yield fp
+            if fsync:
+                fp.flush()
+                os.fsync(fp.fileno())
+        if compare and _same_content(path, temporary):
+            os.unlink(temporary)
+            return
+        os.chmod(temporary, _mode(path))
+        os.replace(temporary, path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.unlink(temporary)
+        raise
+    if fsync:
+        _sync_directory(path.parent)
+
+
+def write_bytes(path: PathLike[str] | str, data: bytes, fsync: bool | None = None) -> bool:
+    """Write data to path atomically. Returns False, without writing, when path already holds data."""
+    if is_identical(path, data):
+        return False
+    with atomic_open(path, "wb", fsync, compare=False) as fp:
+        _ = fp.write(data)
+    return True
+
+
+def write_text(path: PathLike[str] | str, text: str, fsync: bool | None = None, encoding: str = "utf-8") -> bool:
+    """Write text to path atomically. Returns False, without writing, when path already holds text."""
+    return write_bytes(path, text.encode(encoding), fsync)
@@ -0,0 +1,40 @@
+"""Expand files, directories and glob patterns into paths."""
+
+from __future__ import annotations
+
+import glob
+import os
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+YAML_SUFFIXES = (".yaml", ".yml")
+
+__all__ = ["YAML_SUFFIXES", "expand"]
+
+
+def expand(patterns: Iterable[str], suffixes: Iterable[str] = YAML_SUFFIXES) -> list[Path]:
+    """Expand patterns into unique paths, in the order given.
+
+    A glob pattern expands to its sorted matches, and a directory to its sorted files with one
+    of suffixes. Anything else is taken as a file path. Paths that resolve to the same file are
+    only returned once.
+    """
+    suffixes = tuple(suffixes)
+    seen: set[str] = set()
+    paths: list[Path] = []
+    for pattern in patterns:
+        if glob.has_magic(pattern):
+            matches = sorted(glob.glob(pattern))
+        elif os.path.isdir(pattern):
+            matches = sorted(entry.path for entry in os.scandir(pattern) if entry.name.endswith(suffixes))
+        else:
+            matches = [pattern]
+        for match in matches:
+            key = os.path.realpath(match)
+            if key not in seen:
+                seen.add(key)
+                paths.append(Path(match))
+    return paths
@@ -0,0 +1,45 @@
+"""Join manifests into one stream and run processes that echo their output as it arrives."""
+
+from __future__ import annotations
+
+import re
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import threading
+    from collections.abc import Iterable, Sequence
+
+KIND_REGEX = re.compile(r"^kind:\s*(\S+)", re.MULTILINE)
+KIND_ORDER = {"Secret": 0, "ConfigMap": 1}
+
+__all__ = ["join_manifests", "manifest_order", "run_streaming"]
+
+
+def manifest_order(manifest: str) -> int:
+    """Secrets sort first and ConfigMaps second, so they exist before the pods that use them."""
+    match = KIND_REGEX.search(manifest)
+    return KIND_ORDER.get(match.group(1), len(KIND_ORDER)) if match else len(KIND_ORDER)
+
+
+def join_manifests(manifests: Iterable[str]) -> str:
+    """Join manifests into one multi-document YAML stream."""
+    ordered = sorted((manifest.strip("\n") for manifest in manifests), key=manifest_order)
+    return "".join(f"---\n{manifest}\n" for manifest in ordered if manifest)
+
+
+def run_streaming(
+    args: Sequence[str],
+    stdin: str | None = None,
+    prefix: str = "",
+    lock: threading.Lock | None = None,
+    timeout: float | None = None,
+) -> int:
+    """Run args, echoing each line of its output as it arrives, and return its exit code.
+
+    A blocking wrapper around aio.stream, for callers outside an event loop.
+    """
+    import asyncio
+
+    from . import aio
+
+    return asyncio.run(aio.stream(args, stdin, prefix, lock, timeout))
@@ -0,0 +1,398 @@
+"""A runtime that talks to the Podman REST API over its unix socket, reusing connections between calls."""
+
+from __future__ import annotations
+
+import contextlib
+import http.client
+import json
+import os
+import socket
+import struct
+import tarfile
+import tempfile
+import threading
+from http import HTTPStatus
+from pathlib import Path
+from typing import IO, TYPE_CHECKING, Any
+from urllib.parse import quote, urlencode
+
+import click
+
+from .pipeline import join_manifests
+from .runtime import PodmanCLI, Runtime
+from .timings import timings
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterator, Mapping, Sequence
+
+    from .runtime import Process
+
+SOCKET_ENV = "PYMAKE_PODMAN_SOCKET"
+ROOTFUL_SOCKET = Path("/run/podman/podman.sock")
+API_VERSION = "v4.0.0"
+# The exit code podman itself uses when the error is in podman rather than in the container.
+ERROR_EXIT = 125
+SPOOL_SIZE = 64 * 1024 * 1024
+# Methods a server may receive twice without a different outcome, so a request can be resent.
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+# A socket that is missing or refuses connections, or a connection broken mid-request.
+CONNECTION_ERRORS = (OSError, http.client.HTTPException)
+
+__all__ = ["ConnectionPool", "PodmanAPI", "PodmanAPIError", "discover_socket"]
+
+
+class PodmanAPIError(OSError):
+    """No podman socket could be found, or the API answered with an error."""
+
+
+def _socket_candidates() -> list[Path]:
+    if path := os.environ.get(SOCKET_ENV):
+        return [Path(path)]
+    host = os.environ.get("CONTAINER_HOST", "")
+    if host.startswith("unix://"):
+        return [Path(host[len("unix://") :])]
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR") or f"/run/user/{os.getuid()}"
+    rootless = Path(runtime_dir) / "podman" / "podman.sock"
+    return [ROOTFUL_SOCKET, rootless] if os.getuid() == 0 else [rootless, ROOTFUL_SOCKET]
+
+
+def discover_socket() -> Path:
+    """The podman API socket.
+
+    That is $PYMAKE_PODMAN_SOCKET, a unix:// $CONTAINER_HOST, or the first of the rootless and
+    rootful sockets that exists, trying the one matching the current user first.
+    """
+    candidates = _socket_candidates()
+    for path in candidates:
+        if path.exists():
+            return path
+    raise PodmanAPIError(
+        f"No podman socket found at {', '.join(map(str, candidates))}. "
+        "Start one with: systemctl --user start podman.socket"
+    )
+
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    """An HTTP/1.1 connection over a unix socket."""
+
+    def __init__(self, socket_path: Path | str, timeout: float | None = None) -> None:
+        super().__init__("localhost", timeout=timeout)
+        self.socket_path = str(socket_path)
+
+    def connect(self) -> None:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        if self.timeout is not None:
+            sock.settimeout(self.timeout)
+        sock.connect(self.socket_path)
+        self.sock = sock
+
+
+class ConnectionPool:
+    """Keep up to size idle connections open, so consecutive requests skip the connect.
+
+    opened counts the connections made, which is what reuse saves.
+    """
+
+    def __init__(self, socket_path: Path | str, size: int = 4, timeout: float | None = None) -> None:
+        self.socket_path = socket_path
+        self.size = size
+        self.timeout = timeout
+        self.opened = 0
+        self._idle: list[UnixHTTPConnection] = []
+        self._lock = threading.Lock()
+
+    def acquire(self, fresh: bool = False) -> UnixHTTPConnection:
+        with self._lock:
+            if self._idle and not fresh:
+                return self._idle.pop()
+            self.opened += 1
+        return UnixHTTPConnection(self.socket_path, self.timeout)
+
+    def release(self, connection: UnixHTTPConnection, reusable: bool) -> None:
+        with self._lock:
+            if reusable and len(self._idle) < self.size:
+                self._idle.append(connection)
+                return
+        connection.close()
+
+    def close(self) -> None:
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for connection in idle:
+            connection.close()
+
+
+class PodmanAPI(Runtime):
+    """Run operations through the libpod REST API.
+
+    build sends the whole context directory, without applying .containerignore.
+
+    Interactive exec and spawn need a terminal or a bidirectional stream the API offers only by
+    hijacking the connection, so those run the podman binary instead.
+    """
+
+    def __init__(self, socket_path: Path | str | None = None, pool_size: int = 4) -> None:
+        self._socket_path = Path(socket_path) if socket_path is not None else None
+        self._pool_size = pool_size
+        self._pool: ConnectionPool | None = None
+        self._cli = PodmanCLI()
+
+    @property
+    def pool(self) -> ConnectionPool:
+        if self._pool is None:
+            self._pool = ConnectionPool(self._socket_path or discover_socket(), self._pool_size)
+        return self._pool
+
+    def request(  # noqa: PLR0913
+        self,
+        method: str,
+        path: str,
+        query: Mapping[str, Any] | None = None,
+        body: bytes | IO[bytes] | None = None,
+        headers: Mapping[str, str] | None = None,
+        *,
+        on_chunk: Callable[[bytes], None] | None = None,
+    ) -> tuple[int, bytes]:
+        """Send one request and return the status and body.
+
+        The body of a successful response is passed to on_chunk as it arrives instead, when
+        on_chunk is given. A request on an idle connection the server has since closed is retried
+        once on a new one, when it was not sent in full or its method is idempotent.
+        """
+        with timings.phase("api", request=f"{method} {path}") as details:
+            status, data = self._request(method, path, query, body, headers, on_chunk=on_chunk)
+            details["status"] = status
+        return status, data
+
+    def _request(  # noqa: PLR0913
+        self,
+        method: str,
+        path: str,
+        query: Mapping[str, Any] | None,
+        body: bytes | IO[bytes] | None,
+        headers: Mapping[str, str] | None,
+        *,
+        on_chunk: Callable[[bytes], None] | None,
+    ) -> tuple[int, bytes]:
+        url = f"/{API_VERSION}/libpod{path}" + (f"?{urlencode(query)}" if query else "")
+        headers = dict(headers or {})
+        if body is not None and "Content-Length" not in headers:
+            headers["Content-Length"] = str(len(body)) if isinstance(body, bytes) else str(_remaining(body))
+        start = body.tell() if body is not None and not isinstance(body, bytes) else 0
+        for attempt in range(2):
+            connection = self.pool.acquire(fresh=attempt > 0)
+            sent = False
+            try:
+                connection.request(method, url, body=body, headers=headers)
+                sent = True
+                response = connection.getresponse()
+            except (http.client.RemoteDisconnected, BrokenPipeError, ConnectionResetError):
+                connection.close()
+                # The server may have acted on a request it received in full, like a kube play.
+                if attempt or (sent and method not in IDEMPOTENT_METHODS):
+                    raise
+                if body is not None and not isinstance(body, bytes):
+                    _ = body.seek(start)
+                continue
+            except OSError:
+                connection.close()
+                raise
+            try:
+                if on_chunk is None or response.status >= HTTPStatus.MULTIPLE_CHOICES:
+                    data = response.read()
+                else:
+                    data = b""
+                    while chunk := response.read1(65536):
+                        on_chunk(chunk)
+            except BaseException:
+                connection.close()
+                raise
+            self.pool.release(connection, reusable=not response.will_close)
+            return response.status, data
+        raise AssertionError("unreachable")
+
+    def _json(self, method: str, path: str, payload: Any = None, **query: Any) -> tuple[int, Any]:
+        body = json.dumps(payload).encode() if payload is not None else None
+        status, data = self.request(method, path, query, body, {"Content-Type": "application/json"})
+        return status, json.loads(data) if data else None
+
+    @staticmethod
+    def _echo(text: str, prefix: str, lock: threading.Lock | None, error: bool = False) -> None:
+        with lock or contextlib.nullcontext():
+            for line in text.splitlines():
+                click.secho(f"{prefix}{line}", fg="red" if error else "green", err=error)
+
+    def _failed(self, status: int, answer: Any, prefix: str, lock: threading.Lock | None) -> int:
+        if isinstance(answer, str):
+            with contextlib.suppress(ValueError):
+                answer = json.loads(answer)
+        message = answer.get("cause") or answer.get("message") if isinstance(answer, dict) else answer
+        self._echo(f"podman API error {status}: {message}", prefix, lock, error=True)
+        return ERROR_EXIT
+
+    def _unreachable(self, error: Exception, prefix: str, lock: threading.Lock | None) -> int:
+        self._echo(f"podman API unreachable: {error}", prefix, lock, error=True)
+        return ERROR_EXIT
+
+    def build(  # noqa: PLR0913
+        self,
+        tag: str,
+        containerfile: str,
+        context: str | None = None,
+        labels: Mapping[str, str] | None = None,
+        *,
+        prefix: str | None = None,
+        lock: threading.Lock | None = None,
+    ) -> int:
+        context = context or "."
+        failed = False
+        pending = b""
+
+        def on_chunk(chunk: bytes) -> None:
+            nonlocal failed, pending
+            *lines, pending = (pending + chunk).split(b"\n")
+            for line in lines:
+                if not line.strip():
+                    continue
+                message = json.loads(line)
+                if "error" in message:
+                    failed = True
+                    self._echo(message["error"], prefix or "", lock, error=True)
+                elif "stream" in message:
+                    self._echo(message["stream"], prefix or "", lock)
+
+        query = {
+            "t": tag,
+            "dockerfile": os.path.relpath(containerfile, context),
+            "labels": json.dumps(dict(labels or {})),
+        }
+        try:
+            with tempfile.SpooledTemporaryFile(max_size=SPOOL_SIZE) as archive:
+                with tarfile.open(fileobj=archive, mode="w") as tar:
+                    tar.add(context, arcname=".")
+                _ = archive.seek(0)
+                status, data = self.request(
+                    "POST", "/build", query, archive, {"Content-Type": "application/x-tar"}, on_chunk=on_chunk
+                )
+        except CONNECTION_ERRORS as e:
+            return self._unreachable(e, prefix or "", lock)
+        on_chunk(b"\n")
+        if status != HTTPStatus.OK:
+            return self._failed(status, data.decode(), prefix or "", lock)
+        return ERROR_EXIT if failed else 0
+
+    def image_exists(self, tag: str, labels: Mapping[str, str] | None = None) -> bool:
+        filters = {"reference": [tag], "label": [f"{key}={value}" for key, value in (labels or {}).items()]}
+        try:
+            status, images = self._json("GET", "/images/json", filters=json.dumps(filters))
+        except CONNECTION_ERRORS as e:
+            _ = self._unreachable(e, "", None)
+            return False
+        return status == HTTPStatus.OK and bool(images)
+
+    def kube_play(self, manifest: str, prefix: str = "", lock: threading.Lock | None = None) -> int:
+        try:
+            status, data = self.request(
+                "POST", "/play/kube", {"replace": "true"}, manifest.encode(), {"Content-Type": "application/x-yaml"}
+            )
+        except CONNECTION_ERRORS as e:
+            return self._unreachable(e, prefix, lock)
+        report = json.loads(data) if data else {}
+        if status != HTTPStatus.OK:
+            return self._failed(status, report, prefix, lock)
+        for pod in report.get("Pods") or []:
+            self._echo(f"Pod:\n{pod['ID']}\nContainers:\n" + "\n".join(pod.get("Containers") or []), prefix, lock)
+        for secret in report.get("Secrets") or []:
+            self._echo(f"Secret:\n{secret.get('CreateReport', {}).get('ID', '')}", prefix, lock)
+        return 0
+
+    def kube_play_file(
+        self,
+        kube: Path | str,
+        configmaps: Sequence[Path | str] = (),
+        prefix: str | None = None,
+        lock: threading.Lock | None = None,
+    ) -> int:
+        """Configmaps are sent in the same request, as extra documents of the manifest."""
+        try:
+            manifests = [Path(path).read_text() for path in (kube, *configmaps)]
+        except OSError as e:
+            self._echo(str(e), prefix or "", lock, error=True)
+            return ERROR_EXIT
+        return self.kube_play(join_manifests(manifests), prefix or "", lock)
+
+    def exec(self, container: str, args: Sequence[str], interactive: bool = False) -> int:
+        if interactive:
+            return self._cli.exec(container, args, interactive)
+        try:
+            return self._exec(container, args)
+        except CONNECTION_ERRORS as e:
+            return self._unreachable(e, "", None)
+
+    def _exec(self, container: str, args: Sequence[str]) -> int:
+        payload = {"AttachStdout": True, "AttachStderr": True, "Cmd": list(args)}
+        status, answer = self._json("POST", f"/containers/{quote(container, safe='')}/exec", payload)
+        if status != HTTPStatus.CREATED:
+            return self._failed(status, answer, "", None)
+        session = answer["Id"]
+        frames = _Frames()
+        status, data = self.request(
+            "POST",
+            f"/exec/{session}/start",
+            body=json.dumps({"Detach": False, "Tty": False}).encode(),
+            headers={"Content-Type": "application/json"},
+            on_chunk=frames.feed,
+        )
+        if status != HTTPStatus.OK:
+            return self._failed(status, data.decode(), "", None)
+        status, inspect = self._json("GET", f"/exec/{session}/json")
+        if status != HTTPStatus.OK:
+            return self._failed(status, inspect, "", None)
+        return int(inspect["ExitCode"])
+
+    def spawn(self, container: str, args: Sequence[str]) -> Process:
+        return self._cli.spawn(container, args)
+
+    def secret_create(self, name: str, data: bytes, replace: bool = True) -> int:
+        query = {"name": name, **({"replace": "true"} if replace else {})}
+        try:
+            status, answer = self.request("POST", "/secrets/create", query, data)
+        except CONNECTION_ERRORS as e:
+            return self._unreachable(e, "", None)
+        if status != HTTPStatus.OK:
+            return self._failed(status, answer.decode(), "", None)
+        return 0
+
+
+class _Frames:
+    """Echo the multiplexed stdout and stderr frames of an exec session.
+
+    Every frame is an 8 byte header holding the stream and the payload size, then the payload.
+    """
+
+    HEADER = struct.Struct(">BxxxL")
+    STDERR = 2
+
+    def __init__(self) -> None:
+        self._buffer = b""
+
+    def feed(self, chunk: bytes) -> None:
+        self._buffer += chunk
+        for stream, payload in self._frames():
+            click.echo(payload.decode(errors="replace"), nl=False, err=stream == self.STDERR)
+
+    def _frames(self) -> Iterator[tuple[int, bytes]]:
+        header = self.HEADER.size
+        while len(self._buffer) >= header:
+            stream, size = self.HEADER.unpack(self._buffer[:header])
+            if len(self._buffer) < header + size:
+                return
+            payload, self._buffer = self._buffer[header : header + size], self._buffer[header + size :]
+            yield stream, payload
+
+
+def _remaining(stream: IO[bytes]) -> int:
+    start = stream.tell()
+    end = stream.seek(0, os.SEEK_END)
+    _ = stream.seek(start)
+    return end - start
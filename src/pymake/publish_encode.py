@@ -1,55 +1,134 @@
 """Publish and encode secrets."""
 
+from __future__ import annotations
+
 import base64
-import contextlib
-import subprocess
-from io import TextIOWrapper
+import io
+import threading
+from typing import TYPE_CHECKING, Any
 
 import click
-import yaml
 
-__all__ = ["publish_encode"]
+from . import aio, yaml_io
+from .output import atomic_open
+from .paths import expand
+from .runtime import get_runtime
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+    from pathlib import Path
+
+__all__ = ["encode", "encode_documents", "encode_text", "publish", "publish_encode"]
+
+TEMPLATE_SUFFIX = "-secrets-template.yaml"
+SECRETS_SUFFIX = "-secrets.yaml"
+ENCODE_ERRORS = (AttributeError, KeyError, TypeError, OSError, yaml_io.YAMLError)
+
+
+def encode_documents(documents: Iterable[Any]) -> Iterator[Any]:
+    """Base64 encode the data map of each document, one document at a time. Empty documents are dropped."""
+    for document in documents:
+        if document is None:
+            continue
+        for key, value in document["data"].items():
+            document["data"][key] = base64.b64encode(value.encode()).decode()
+        yield document
+
+
+def encode(template: Path) -> Path:
+    """Base64 encode a <somename>-secrets-template.yaml and write <somename>-secrets.yaml beside it.
+
+    The template may hold many documents separated by ---. They are read, encoded and written
+    one at a time, so memory use does not grow with the size of the bundle.
+    """
+    secrets_file = template.with_name(template.name.replace(TEMPLATE_SUFFIX, SECRETS_SUFFIX))
+    with open(template, "rb") as inn_fp, atomic_open(secrets_file, encoding="utf-8") as out_fp:
+        yaml_io.dump_all(encode_documents(yaml_io.load_all(inn_fp)), out_fp)
+    return secrets_file
+
+
+def encode_text(text: str | bytes) -> str:
+    """Base64 encode a secrets template held in memory and return the encoded manifest."""
+    stream = io.StringIO()
+    yaml_io.dump_all(encode_documents(yaml_io.load_all(text)), stream)
+    return stream.getvalue()
+
+
+async def publish(secrets_file: Path, lock: threading.Lock | None = None, manifest: str | None = None) -> int:
+    """Run podman kube play on secrets_file, echoing each line of its output prefixed by the file name.
+
+    When manifest is given it is piped to podman over stdin, and secrets_file only names the output.
+    """
+    prefix = f"[{secrets_file.name}] "
+    if manifest is not None:
+        return await get_runtime().kube_play_async(manifest, prefix, lock)
+    return await get_runtime().kube_play_file_async(secrets_file, prefix=prefix, lock=lock)
 
 
 @click.command(help="Encode and optionally publish secrets to podman.")
-@click.option("-f", "--file", type=click.File("rb"), required=True, help="the secrets template to encode")
+@click.option(
+    "-f",
+    "--file",
+    "files",
+    multiple=True,
+    help="A secrets template, or a glob of them, to encode. May be given more than once.",
+)
+@click.argument("patterns", nargs=-1)
 @click.option("--publish-secrets", is_flag=True, default=False, help="publish the secrets to the cluster")
-def publish_encode(file: TextIOWrapper, publish_secrets=False):
-    if file.name.endswith("-secrets-template.yaml"):
-        with file as fp:
-            data = yaml.safe_load(fp)
-
+@click.option(
+    "-j",
+    "--jobs",
+    type=click.IntRange(min=1),
+    default=4,
+    show_default=True,
+    help="The number of secrets to publish concurrently.",
+)
+@click.option(
+    "--stdin",
+    "use_stdin",
+    is_flag=True,
+    default=False,
+    help="Pipe the encoded secrets to podman kube play over stdin instead of writing them to disk. "
+    "Implies --publish-secrets.",
+)
+def publish_encode(
+    files: tuple[str, ...], patterns: tuple[str, ...], publish_secrets: bool, jobs: int, use_stdin: bool
+) -> None:
+    templates = expand((*files, *patterns), suffixes=(TEMPLATE_SUFFIX,))
+    if not templates:
+        raise click.UsageError("Give at least one secrets template, for example -f config/templates/secrets/*.yaml")
+    failed = False
+    secrets_files: list[Path] = []
+    manifests: dict[Path, str] = {}
+    for template in templates:
+        if not template.name.endswith(TEMPLATE_SUFFIX):
+            click.secho(f"{template} is not a valid template file", fg="red", err=True)
+            click.secho(f"{template} must be <somename>{TEMPLATE_SUFFIX}", fg="red", err=True)
+            failed = True
+            continue
         try:
-            for key, value in data["data"].items():
-                data["data"][key] = base64.b64encode(value.encode()).decode()
-        except AttributeError as e:
-            click.secho(f"{e}", fg="red", err=True)
-            raise SystemExit(1) from AttributeError
-
-        with open(file.name.replace("secrets-template.yaml", "secrets.yaml"), "w") as fp:
-            yaml.safe_dump(data, fp)
-            click.secho(f"{fp.name.replace('secrets-template.yaml','secrets.yaml')} created", fg="green")
-
-            if publish_secrets:
-                click.secho("\nPublishing secrets", fg="blue")
-                click.secho("------------------", fg="blue")
-                with (
-                    subprocess.Popen(
-                        [
-                            "podman",
-                            "kube",
-                            "play",
-                            "--replace",
-                            file.name.replace("secrets-template.yaml", "secrets.yaml"),
-                        ],
-                        stdout=subprocess.PIPE,
-                    ) as proc,
-                    contextlib.suppress(AttributeError),
-                ):
-                    for line in proc.stdout.readlines():  # type: ignore[reportOptionalMemberAccess]
-                        line = line.decode().strip("\n")
-                        click.secho(f"{line}", fg="green")
-                click.secho("------------------", fg="blue")
-    else:
-        click.secho(f"{file.name} is not a valid template file", fg="red", err=True)
-        click.secho(f"{file.name} must be <somename>-secrets-template.yaml", fg="red", err=True)
+            if use_stdin:
+                secrets_file = template.with_name(template.name.replace(TEMPLATE_SUFFIX, SECRETS_SUFFIX))
+                manifests[secrets_file] = encode_text(template.read_bytes())
+            else:
+                secrets_file = encode(template)
+        except ENCODE_ERRORS as e:
+            click.secho(f"{template}: {e}", fg="red", err=True)
+            failed = True
+            continue
+        secrets_files.append(secrets_file)
+        if not use_stdin:
+            click.secho(f"{secrets_file} created", fg="green")
+
+    if (publish_secrets or use_stdin) and secrets_files:
+        click.secho("\nPublishing secrets", fg="blue")
+        click.secho("------------------", fg="blue")
+        lock = threading.Lock()
+        returncodes = aio.run(aio.bounded(jobs, (publish(f, lock, manifests.get(f)) for f in secrets_files)))
+        click.secho("------------------", fg="blue")
+        for secrets_file, returncode in zip(secrets_files, returncodes):
+            if returncode != 0:
+                click.secho(f"{secrets_file}: podman kube play exited with {returncode}", fg="red", err=True)
+                failed = True
+    if failed:
+        raise SystemExit(1)
@@ -0,0 +1,93 @@
+"""A manifest of rendered templates, used to skip renders whose inputs have not changed."""
+
+from __future__ import annotations
+
+import contextlib
+import hashlib
+import json
+import threading
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, TypedDict
+
+from .output import write_text
+
+if TYPE_CHECKING:
+    from collections.abc import Mapping
+
+    from .compiled import CompiledTemplate
+
+CACHE_FILE = Path(".pymake/render-cache.json")
+VERSION = 1
+
+__all__ = ["CACHE_FILE", "CacheEntry", "RenderCache", "digest"]
+
+
+class CacheEntry(TypedDict):
+    template: str
+    variables: str
+    output: str
+    parsedfile: str
+
+
+def digest(data: str | bytes) -> str:
+    if isinstance(data, str):
+        data = data.encode()
+    return hashlib.sha256(data).hexdigest()
+
+
+class RenderCache:
+    """The render manifest, by default stored in .pymake/render-cache.json.
+
+    For every template it records a hash of the template text, a hash of only the variables
+    that template references, and a hash of the output it produced.
+    """
+
+    def __init__(self, path: Path = CACHE_FILE, entries: dict[str, CacheEntry] | None = None) -> None:
+        self.path = path
+        self.entries: dict[str, CacheEntry] = entries or {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path: Path = CACHE_FILE) -> RenderCache:
+        """Load the manifest. A missing, corrupt or outdated manifest gives an empty cache."""
+        entries: dict[str, CacheEntry] = {}
+        with contextlib.suppress(OSError, ValueError):
+            manifest = json.loads(path.read_text())
+            if manifest.get("version") == VERSION:
+                entries = manifest["templates"]
+        return cls(path, entries)
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            manifest = {"version": VERSION, "templates": self.entries}
+        _ = write_text(self.path, json.dumps(manifest, indent=2, sort_keys=True), fsync=False)
+
+    @staticmethod
+    def fingerprint(template: CompiledTemplate, variables: Mapping[str, Any]) -> tuple[str, str]:
+        """The hash of the template and of the values of the variables it references."""
+        used = {name: None if name not in variables else str(variables[name]) for name in template.placeholders}
+        return template.digest, digest(json.dumps(used, sort_keys=True))
+
+    def is_fresh(self, templatefile: Path, parsedfile: Path, fingerprint: tuple[str, str]) -> bool:
+        """True when the template, its variables and the output on disk all match the manifest."""
+        with self._lock:
+            entry = self.entries.get(str(templatefile))
+        if entry is None or (entry["template"], entry["variables"]) != fingerprint:
+            return False
+        if entry["parsedfile"] != str(parsedfile):
+            return False
+        try:
+            return digest(Path(parsedfile).read_bytes()) == entry["output"]
+        except OSError:
+            return False
+
+    def record(self, templatefile: Path, parsedfile: Path, fingerprint: tuple[str, str], output: str) -> None:
+        entry: CacheEntry = {
+            "template": fingerprint[0],
+            "variables": fingerprint[1],
+            "output": digest(output),
+            "parsedfile": str(parsedfile),
+        }
+        with self._lock:
+            self.entries[str(templatefile)] = entry
@@ -0,0 +1,70 @@
+"""Resolve ${VAR} references between substitution variables."""
+
+from __future__ import annotations
+
+import re
+from typing import TYPE_CHECKING, Any
+
+from .graph import CycleError, topological_order
+
+if TYPE_CHECKING:
+    from collections.abc import Mapping
+
+SIMPLE_REGEX = re.compile(r"\${(.*?)\}")
+
+__all__ = ["CircularReferenceError", "ResolveError", "UndefinedVariableError", "references", "resolve"]
+
+
+class ResolveError(ValueError):
+    """Base class for errors raised while resolving variables."""
+
+
+class UndefinedVariableError(ResolveError):
+    def __init__(self, missing: dict[str, list[str]]) -> None:
+        self.missing = missing
+        lines = [
+            f"{key} references undefined {', '.join(f'${{{n}}}' for n in names)}" for key, names in missing.items()
+        ]
+        super().__init__("Undefined variables:\n  " + "\n  ".join(lines))
+
+
+class CircularReferenceError(ResolveError):
+    def __init__(self, cycle: list[str]) -> None:
+        self.cycle = cycle
+        super().__init__(f"Circular reference: {' -> '.join(cycle)}")
+
+
+def references(value: Any) -> list[str]:
+    """Return the variable names referenced by value, in order of first appearance."""
+    if not isinstance(value, str):
+        return []
+    return list(dict.fromkeys(SIMPLE_REGEX.findall(value)))
+
+
+def _graph(variables: Mapping[str, Any]) -> dict[str, list[str]]:
+    graph = {key: references(value) for key, value in variables.items()}
+    missing = {key: undefined for key, refs in graph.items() if (undefined := [r for r in refs if r not in graph])}
+    if missing:
+        raise UndefinedVariableError(missing)
+    return graph
+
+
+def resolve(variables: Mapping[str, Any]) -> dict[str, Any]:
+    """Substitute every ${VAR} reference in variables.
+
+    The reference graph is built once and each value is substituted exactly once, after
+    everything it references. Raises UndefinedVariableError or CircularReferenceError.
+    """
+    graph = _graph(variables)
+    resolved: dict[str, Any] = {}
+
+    def lookup(match: re.Match[str]) -> str:
+        return str(resolved[match.group(1)])
+
+    try:
+        for key in topological_order(graph):
+            value = variables[key]
+            resolved[key] = SIMPLE_REGEX.sub(lookup, value) if graph[key] else value
+    except CycleError as e:
+        raise CircularReferenceError(e.cycle) from e
+    return {key: resolved[key] for key in variables}
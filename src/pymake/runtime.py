@@ -0,0 +1,272 @@
+"""The container runtime every command talks to, behind one interface."""
+
+from __future__ import annotations
+
+import asyncio
+import importlib
+import os
+import shlex
+import subprocess
+from abc import ABC, abstractmethod
+from typing import IO, TYPE_CHECKING, Any, Protocol
+
+import click
+
+from . import aio
+from .config import config
+from .pipeline import run_streaming
+from .timings import timings
+
+if TYPE_CHECKING:
+    import threading
+    from collections.abc import Mapping, Sequence
+    from pathlib import Path
+
+RUNTIME_ENV = "PYMAKE_RUNTIME"
+
+# Backend name to "module:class", imported only when selected.
+BACKENDS = {
+    "podman": "pymake.runtime:PodmanCLI",
+    "podman-api": "pymake.podman_api:PodmanAPI",
+}
+
+__all__ = [
+    "BACKENDS",
+    "PodmanCLI",
+    "Process",
+    "Runtime",
+    "create_runtime",
+    "get_runtime",
+    "set_runtime",
+]
+
+
+class Process(Protocol):
+    """A started process with its stdin and stdout connected to pipes."""
+
+    stdin: IO[str] | None
+    stdout: IO[str] | None
+
+    def wait(self, timeout: float | None = None) -> int: ...
+
+
+class Runtime(ABC):
+    """The container operations pymake needs. Each returns the exit code of the operation.
+
+    prefix and lock are used by backends that echo output line by line: every line is prefixed,
+    and echoed while holding lock, so concurrent operations do not interleave within a line.
+    """
+
+    @abstractmethod
+    def build(  # noqa: PLR0913
+        self,
+        tag: str,
+        containerfile: str,
+        context: str | None = None,
+        labels: Mapping[str, str] | None = None,
+        *,
+        prefix: str | None = None,
+        lock: threading.Lock | None = None,
+    ) -> int:
+        """Build an image from containerfile, tagged tag and labelled with labels."""
+
+    @abstractmethod
+    def image_exists(self, tag: str, labels: Mapping[str, str] | None = None) -> bool:
+        """True when an image tagged tag, with every one of labels, exists."""
+
+    @abstractmethod
+    def kube_play(self, manifest: str, prefix: str = "", lock: threading.Lock | None = None) -> int:
+        """Play a multi-document manifest, replacing the pods it describes."""
+
+    @abstractmethod
+    def kube_play_file(
+        self,
+        kube: Path | str,
+        configmaps: Sequence[Path | str] = (),
+        prefix: str | None = None,
+        lock: threading.Lock | None = None,
+    ) -> int:
+        """Play the manifest in the file kube, with configmaps from the given files."""
+
+    @abstractmethod
+    def exec(self, container: str, args: Sequence[str], interactive: bool = False) -> int:
+        """Run args in container, attached to the terminal when interactive."""
+
+    @abstractmethod
+    def spawn(self, container: str, args: Sequence[str]) -> Process:
+        """Start args in container with its stdin and stdout connected to pipes."""
+
+    @abstractmethod
+    def secret_create(self, name: str, data: bytes, replace: bool = True) -> int:
+        """Create the secret name holding data."""
+
+    # The async versions let commands overlap operations on one event loop. Backends without
+    # a native version run the blocking one in a thread.
+
+    async def build_async(  # noqa: PLR0913
+        self,
+        tag: str,
+        containerfile: str,
+        context: str | None = None,
+        labels: Mapping[str, str] | None = None,
+        *,
+        prefix: str | None = None,
+        lock: threading.Lock | None = None,
+    ) -> int:
+        return await asyncio.to_thread(self.build, tag, containerfile, context, labels, prefix=prefix, lock=lock)
+
+    async def kube_play_async(self, manifest: str, prefix: str = "", lock: threading.Lock | None = None) -> int:
+        return await asyncio.to_thread(self.kube_play, manifest, prefix, lock)
+
+    async def kube_play_file_async(
+        self,
+        kube: Path | str,
+        configmaps: Sequence[Path | str] = (),
+        prefix: str | None = None,
+        lock: threading.Lock | None = None,
+    ) -> int:
+        return await asyncio.to_thread(self.kube_play_file, kube, configmaps, prefix, lock)
+
+
+def _run(args: Sequence[str], **kwargs: Any) -> subprocess.CompletedProcess[Any]:
+    """subprocess.run, recorded as a subprocess phase for --timings."""
+    with timings.phase("subprocess", command=shlex.join(args)) as details:
+        result = subprocess.run(args, check=False, **kwargs)
+        details["exit_code"] = result.returncode
+    return result
+
+
+def _echoed(
+    args: Sequence[str], stdin: str | None = None, prefix: str | None = None, lock: threading.Lock | None = None
+) -> int:
+    """Run args attached to the terminal, or echo its output line by line when prefix or stdin is given."""
+    if prefix is None and stdin is None:
+        return _run(list(args)).returncode
+    return run_streaming(args, stdin, prefix or "", lock)
+
+
+class PodmanCLI(Runtime):
+    """Run every operation as a podman command."""
+
+    def __init__(self, podman: str = "podman") -> None:
+        self.podman = podman
+
+    def build(  # noqa: PLR0913
+        self,
+        tag: str,
+        containerfile: str,
+        context: str | None = None,
+        labels: Mapping[str, str] | None = None,
+        *,
+        prefix: str | None = None,
+        lock: threading.Lock | None = None,
+    ) -> int:
+        return _echoed(self._build_args(tag, containerfile, context, labels), prefix=prefix, lock=lock)
+
+    async def build_async(  # noqa: PLR0913
+        self,
+        tag: str,
+        containerfile: str,
+        context: str | None = None,
+        labels: Mapping[str, str] | None = None,
+        *,
+        prefix: str | None = None,
+        lock: threading.Lock | None = None,
+    ) -> int:
+        return await aio.stream(self._build_args(tag, containerfile, context, labels), None, prefix or "", lock)
+
+    def _build_args(
+        self, tag: str, containerfile: str, context: str | None, labels: Mapping[str, str] | None
+    ) -> list[str]:
+        args = [self.podman, "build", "--tag", f"{tag}", "-f", f"{containerfile}"]
+        for key, value in (labels or {}).items():
+            args += ["--label", f"{key}={value}"]
+        if context is not None:
+            args.append(context)
+        return args
+
+    def image_exists(self, tag: str, labels: Mapping[str, str] | None = None) -> bool:
+        args = [self.podman, "images", "--quiet", "--filter", f"reference={tag}"]
+        for key, value in (labels or {}).items():
+            args += ["--filter", f"label={key}={value}"]
+        result = _run(args, capture_output=True, text=True)
+        return result.returncode == 0 and result.stdout.strip() != ""
+
+    def kube_play(self, manifest: str, prefix: str = "", lock: threading.Lock | None = None) -> int:
+        return _echoed([self.podman, "kube", "play", "--replace", "-"], manifest, prefix, lock)
+
+    async def kube_play_async(self, manifest: str, prefix: str = "", lock: threading.Lock | None = None) -> int:
+        return await aio.stream([self.podman, "kube", "play", "--replace", "-"], manifest, prefix, lock)
+
+    def kube_play_file(
+        self,
+        kube: Path | str,
+        configmaps: Sequence[Path | str] = (),
+        prefix: str | None = None,
+        lock: threading.Lock | None = None,
+    ) -> int:
+        return _echoed(self._kube_play_file_args(kube, configmaps), prefix=prefix, lock=lock)
+
+    async def kube_play_file_async(
+        self,
+        kube: Path | str,
+        configmaps: Sequence[Path | str] = (),
+        prefix: str | None = None,
+        lock: threading.Lock | None = None,
+    ) -> int:
+        return await aio.stream(self._kube_play_file_args(kube, configmaps), None, prefix or "", lock)
+
+    def _kube_play_file_args(self, kube: Path | str, configmaps: Sequence[Path | str]) -> list[str]:
+        args = [self.podman, "kube", "play", "--replace", f"{kube}"]
+        return args + [item for configmap in configmaps for item in ("--configmap", str(configmap))]
+
+    def exec(self, container: str, args: Sequence[str], interactive: bool = False) -> int:
+        flags = ["-it"] if interactive else []
+        return _run([self.podman, "exec", *flags, f"{container}", *args]).returncode
+
+    def spawn(self, container: str, args: Sequence[str]) -> Process:
+        return subprocess.Popen(
+            [self.podman, "exec", "-i", container, *args],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            text=True,
+            bufsize=1,
+        )
+
+    def secret_create(self, name: str, data: bytes, replace: bool = True) -> int:
+        flags = ["--replace"] if replace else []
+        return _run([self.podman, "secret", "create", *flags, name, "-"], input=data).returncode
+
+
+_runtime: Runtime | None = None
+
+
+def create_runtime(name: str) -> Runtime:
+    """Create the runtime backend registered as name in BACKENDS."""
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown runtime {name!r}, choose one of {', '.join(BACKENDS)}")
+    module_name, attribute = BACKENDS[name].split(":")
+    backend: type[Runtime] = getattr(importlib.import_module(module_name), attribute)
+    return backend()
+
+
+def get_runtime() -> Runtime:
+    """The runtime set with set_runtime, else the one named by $PYMAKE_RUNTIME or runtime in PyMakeFile.yaml.
+
+    An unknown name is a usage error of the command that needs the runtime.
+    """
+    global _runtime
+    if _runtime is None:
+        source = f"${RUNTIME_ENV}" if os.environ.get(RUNTIME_ENV) else "runtime in PyMakeFile.yaml"
+        try:
+            _runtime = create_runtime(os.environ.get(RUNTIME_ENV) or config.get("runtime") or "podman")
+        except ValueError as e:
+            raise click.UsageError(f"{source}: {e}") from e
+    return _runtime
+
+
+def set_runtime(runtime: Runtime | None) -> Runtime | None:
+    """Use runtime for every following operation, and return the previous one. None selects again on next use."""
+    global _runtime
+    previous, _runtime = _runtime, runtime
+    return previous
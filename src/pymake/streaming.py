@@ -0,0 +1,89 @@
+"""Render templates chunk by chunk, so memory use does not grow with the size of the template."""
+
+from __future__ import annotations
+
+import re
+from pathlib import Path
+from string import Template
+from typing import IO, TYPE_CHECKING, Any
+
+from .output import atomic_open
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator, Mapping
+    from os import PathLike
+
+CHUNK_SIZE = 1024 * 1024
+# A $ at the end of a chunk, and what follows it, that the next chunk could still turn into a placeholder.
+INCOMPLETE_REGEX = re.compile(r"\$\{?[_a-z0-9]*", re.IGNORECASE)
+
+__all__ = ["CHUNK_SIZE", "render_chunks", "render_stream", "stream_template"]
+
+
+def _complete(text: str) -> int:
+    """The length of the start of text that more text after it cannot change the rendering of."""
+    start = text.rfind("$")
+    if start == -1:
+        return len(text)
+    first = start
+    while first > 0 and text[first - 1] == "$":
+        first -= 1
+    # A run of $ is read as $$ pairs, so the last $ of an even run ends an escaped $.
+    if (start - first) % 2 or not INCOMPLETE_REGEX.fullmatch(text, start):
+        return len(text)
+    return start
+
+
+def _render(text: str, mapping: Mapping[str, Any]) -> str:
+    """string.Template(text).safe_substitute(mapping)."""
+
+    def substitute(match: re.Match[str]) -> str:
+        name = match.group("named") or match.group("braced")
+        # $$ is an escaped $, and a lone $ is left as it is.
+        if name is None:
+            return "$"
+        return f"{mapping[name]}" if name in mapping else match.group()
+
+    return Template.pattern.sub(substitute, text)
+
+
+def render_chunks(chunks: Iterable[str], mapping: Mapping[str, Any]) -> Iterator[str]:
+    """Render a template given in chunks, yielding the output as it is produced.
+
+    The output is the same as string.Template(text).safe_substitute(mapping) of the whole text,
+    wherever the chunks are split, including inside a placeholder.
+    """
+    rest = ""
+    for chunk in chunks:
+        text = rest + chunk
+        end = _complete(text)
+        if output := _render(text[:end], mapping):
+            yield output
+        rest = text[end:]
+    if output := _render(rest, mapping):
+        yield output
+
+
+def render_stream(inn_fp: IO[str], out_fp: IO[str], mapping: Mapping[str, Any], chunk_size: int = CHUNK_SIZE) -> None:
+    """Render the template read from inn_fp to out_fp, holding about chunk_size characters at a time."""
+    for output in render_chunks(iter(lambda: inn_fp.read(chunk_size), ""), mapping):
+        _ = out_fp.write(output)
+
+
+def stream_template(
+    template_innfile: PathLike[str] | str,
+    template_outfile: PathLike[str] | str,
+    mapping: Mapping[str, Any],
+    remove: bool = False,
+    chunk_size: int = CHUNK_SIZE,
+) -> None:
+    """Render the file template_innfile to template_outfile without reading either into memory whole.
+
+    Example:
+    stream_template("manifests/bundle-template.yaml", "bundle.yaml", context.variables)
+
+    """
+    with open(template_innfile, encoding="utf-8") as inn_fp, atomic_open(template_outfile, encoding="utf-8") as out_fp:
+        render_stream(inn_fp, out_fp, mapping, chunk_size)
+    if remove:
+        (Path(template_outfile).parent / "remove").touch()
@@ -0,0 +1,89 @@
+"""Record how long each phase of a command takes, for pymake --timings."""
+
+from __future__ import annotations
+
+import contextlib
+import threading
+import time
+from typing import TYPE_CHECKING, Any
+
+import click
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+__all__ = ["Timings", "timings"]
+
+
+class Timings:
+    """Phases recorded while enabled, each with its name, start, duration and details.
+
+    Recording is a no-op until enable() is called, so instrumented code costs nothing by default.
+
+    Example:
+    with timings.phase("render", template="nginx.conf"):
+        ...
+
+    """
+
+    def __init__(self) -> None:
+        self.enabled = False
+        self.phases: list[dict[str, Any]] = []
+        self._start = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def enable(self) -> None:
+        self.enabled = True
+        self.phases = []
+        self._start = time.perf_counter()
+
+    def disable(self) -> None:
+        self.enabled = False
+
+    def record(self, name: str, start: float, **details: Any) -> None:
+        """Record phase name that began at start, a time.perf_counter() value, and ends now."""
+        if not self.enabled:
+            return
+        end = time.perf_counter()
+        phase = {"name": name, "start": start - self._start, "seconds": end - start, **details}
+        with self._lock:
+            self.phases.append(phase)
+
+    @contextlib.contextmanager
+    def phase(self, name: str, **details: Any) -> Iterator[dict[str, Any]]:
+        """Record the time spent in the with block. Details added to the yielded dict are recorded too."""
+        if not self.enabled:
+            yield details
+            return
+        start = time.perf_counter()
+        try:
+            yield details
+        finally:
+            self.record(name, start, **details)
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "total": time.perf_counter() - self._start,
+            "phases": sorted(self.phases, key=lambda phase: phase["start"]),
+        }
+
+    def report(self, style: str = "text") -> None:
+        """Print the phases to stderr, as a table or as JSON."""
+        data = self.as_dict()
+        if style == "json":
+            import json
+
+            click.echo(json.dumps(data, indent=2), err=True)
+            return
+        click.secho(f"\n{'Phase':<20} {'Start':>11} {'Time':>11}  Details", fg="blue", err=True)
+        for phase in data["phases"]:
+            details = " ".join(f"{k}={v}" for k, v in phase.items() if k not in ("name", "start", "seconds"))
+            click.secho(
+                f"{phase['name']:<20} {phase['start'] * 1000:>8.1f} ms {phase['seconds'] * 1000:>8.1f} ms  {details}",
+                fg="blue",
+                err=True,
+            )
+        click.secho(f"{'total':<20} {'':>11} {data['total'] * 1000:>8.1f} ms", fg="blue", err=True)
+
+
+timings = Timings()
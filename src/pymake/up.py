@@ -0,0 +1,146 @@
+"""Render, encode and play the whole pod in one process."""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import click
+
+from . import aio
+from .compiled import template_cache
+from .config import config
+from .interpolate_templates import is_manifest, load_context, load_templates, render_templates
+from .paths import expand
+from .pipeline import join_manifests
+from .publish_encode import ENCODE_ERRORS, TEMPLATE_SUFFIX, encode_text
+from .render_cache import RenderCache
+from .runtime import get_runtime
+from .timings import timings
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterator
+
+__all__ = ["Stages", "up"]
+
+
+class Stages:
+    """Wall clock time per stage, in the order the stages ran."""
+
+    def __init__(self) -> None:
+        self.times: dict[str, float] = {}
+
+    @contextlib.contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.times[name] = self.times.get(name, 0.0) + time.perf_counter() - start
+
+    def report(self) -> None:
+        click.secho("\nStage       Time", fg="blue")
+        for name, seconds in self.times.items():
+            click.secho(f"{name:<8} {seconds * 1000:>8.1f} ms", fg="blue")
+        click.secho(f"{'total':<8} {sum(self.times.values()) * 1000:>8.1f} ms", fg="blue")
+
+
+@click.command(help="Render the templates, encode the secrets and play the pod with all its configmaps, in one step.")
+@click.option(
+    "-j",
+    "--jobs",
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+    help="The number of templates to render concurrently.",
+)
+@click.option(
+    "--force",
+    is_flag=True,
+    default=False,
+    help="Render every template, even those the render cache reports as unchanged.",
+)
+def up(jobs: int, force: bool) -> None:
+    aio.run(_up(jobs, force))
+
+
+async def _up(jobs: int, force: bool) -> None:
+    stages = Stages()
+    failed = False
+    registry = load_templates()
+    templates = registry.templates
+    manifests = [template for template in templates if is_manifest(template)]
+
+    with stages.stage("resolve"):
+        context = load_context(registry.env["templatefile"])
+
+    def render_manifest(templatefile: str) -> str:
+        with timings.phase("render", template=templatefile):
+            return template_cache.load(templatefile).render(context.variables)
+
+    def read_configmap(path: str) -> str:
+        return Path(path).read_text()
+
+    with stages.stage("render"):
+        # Template files are written by a thread pool while the manifests render alongside it.
+        cache = RenderCache() if force else RenderCache.load()
+        files = [template for template in templates if template not in manifests]
+        sources: dict[str, Callable[[str], str]] = {str(t["templatefile"]): render_manifest for t in manifests}
+        produced = {Path(template["parsedfile"]) for template in manifests}
+        for configmap in expand(config.get("configmaps", [])):
+            if configmap not in produced:
+                sources[str(configmap)] = read_configmap
+        written, texts = await asyncio.gather(
+            asyncio.to_thread(render_templates, context, files, jobs, cache),
+            aio.bounded(jobs, (asyncio.to_thread(_attempt, OSError, read, path) for path, read in sources.items())),
+        )
+        for template, result in written:
+            if isinstance(result, BaseException):
+                failed = True
+                click.secho(f"{template['templatefile']}: {result}", fg="red", err=True)
+        cache.save()
+        rendered: dict[str, str] = {}
+        for path, text in zip(sources, texts):
+            if isinstance(text, BaseException):
+                failed = True
+                click.secho(f"{path}: {text}", fg="red", err=True)
+            else:
+                rendered[path] = text
+
+    with stages.stage("encode"):
+        secrets = [path for path in rendered if Path(path).name.endswith(TEMPLATE_SUFFIX)]
+        encoded = await aio.bounded(
+            jobs, (asyncio.to_thread(_attempt, ENCODE_ERRORS, encode_text, rendered[path]) for path in secrets)
+        )
+        for path, secret in zip(secrets, encoded):
+            if isinstance(secret, BaseException):
+                failed = True
+                click.secho(f"{path}: {secret}", fg="red", err=True)
+            else:
+                rendered[path] = secret
+
+    if failed:
+        stages.report()
+        raise SystemExit(1)
+
+    with stages.stage("play"):
+        click.secho(f"Playing {len(rendered)} manifests", fg="blue")
+        returncode = await get_runtime().kube_play_async(join_manifests(rendered.values()))
+
+    stages.report()
+    if returncode:
+        click.secho(f"podman kube play exited with {returncode}", fg="red", err=True)
+        raise SystemExit(1)
+
+
+def _attempt(
+    errors: type[BaseException] | tuple[type[BaseException], ...], function: Callable[[str], str], arg: str
+) -> str | BaseException:
+    """function(arg), or the error it raised when that is one of errors."""
+    try:
+        return function(arg)
+    except errors as e:
+        return e
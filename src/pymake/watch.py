@@ -0,0 +1,157 @@
+"""Watch the env file and templates, and re-render the templates affected by a change."""
+
+from __future__ import annotations
+
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import click
+
+from . import yaml_io
+from .compiled import compile_template
+from .context import EnvContext
+from .interpolate_templates import load_templates, render_template
+from .render_cache import RenderCache
+from .resolve import ResolveError
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Sequence
+    from typing import TypeAlias
+
+    from .compiled import CompiledTemplate
+    from .templates import TemplateType
+
+    Stat: TypeAlias = tuple[int, int] | None
+
+__all__ = ["Watcher", "watch"]
+
+
+def _stat(path: Path) -> Stat:
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+class Watcher:
+    """Keep the resolved env and the compiled templates in memory, and poll their files for changes.
+
+    A change to the env file re-renders only the templates that reference a variable whose
+    resolved value changed. A change to a template re-renders only that template.
+    """
+
+    def __init__(
+        self,
+        env_file: Path,
+        templates: Sequence[TemplateType],
+        cache: RenderCache | None = None,
+        echo: Callable[..., None] = click.secho,
+    ) -> None:
+        self.env_file = Path(env_file)
+        self.templates = list(templates)
+        self.cache = cache if cache is not None else RenderCache.load()
+        self.echo = echo
+        self.context: EnvContext | None = None
+        self.compiled: dict[Path, CompiledTemplate] = {}
+        self._stats: dict[Path, Stat] = {}
+
+    def start(self) -> list[TemplateType]:
+        """Load everything and render the templates that are out of date."""
+        self._stats = {path: _stat(path) for path in self._paths()}
+        self.context = self._load_context()
+        for template in self.templates:
+            self._compile(template)
+        return self._render(self.templates)
+
+    def poll(self) -> list[TemplateType]:
+        """Re-render the templates affected by files changed since the last poll."""
+        stats = {path: _stat(path) for path in self._paths()}
+        changed = {path for path, stat in stats.items() if self._stats.get(path) != stat}
+        self._stats = stats
+        if not changed:
+            return []
+        affected: list[TemplateType] = []
+        if self.env_file in changed and (context := self._load_context()) is not None:
+            old = self.context.variables if self.context is not None else {}
+            new = context.variables
+            names = {name for name in old.keys() | new.keys() if old.get(name) != new.get(name)}
+            self.context = context
+            affected = [template for template in self.templates if self._uses(template, names)]
+        for template in self.templates:
+            if Path(template["templatefile"]) in changed and self._compile(template) and template not in affected:
+                affected.append(template)
+        return self._render(sorted(affected, key=self.templates.index))
+
+    def run(self, interval: float = 0.5, iterations: int | None = None) -> None:
+        self.start()
+        count = 0
+        while iterations is None or count < iterations:
+            time.sleep(interval)
+            self.poll()
+            count += 1
+
+    def _paths(self) -> list[Path]:
+        return [self.env_file, *(Path(t["templatefile"]) for t in self.templates)]
+
+    def _load_context(self) -> EnvContext | None:
+        try:
+            return EnvContext.load(self.env_file)
+        # Keep watching through a half-saved env file: bad YAML, or a section that is not a mapping.
+        except (OSError, ResolveError, yaml_io.YAMLError, AttributeError, TypeError) as e:
+            self.echo(f"{self.env_file}: {e}", fg="red", err=True)
+            return None
+
+    def _compile(self, template: TemplateType) -> bool:
+        path = Path(template["templatefile"])
+        try:
+            self.compiled[path] = compile_template(path.read_text(encoding="utf-8"))
+        except (OSError, UnicodeDecodeError) as e:
+            self.echo(f"{path}: {e}", fg="red", err=True)
+            _ = self.compiled.pop(path, None)
+            return False
+        return True
+
+    def _uses(self, template: TemplateType, names: set[str]) -> bool:
+        compiled = self.compiled.get(Path(template["templatefile"]))
+        return compiled is not None and not compiled.placeholders.isdisjoint(names)
+
+    def _render(self, templates: Sequence[TemplateType]) -> list[TemplateType]:
+        rendered: list[TemplateType] = []
+        if self.context is None:
+            return rendered
+        for template in templates:
+            compiled = self.compiled.get(Path(template["templatefile"]))
+            if compiled is None:
+                continue
+            try:
+                if render_template(self.context, template, self.cache, compiled):
+                    rendered.append(template)
+                    self.echo(f"{template['parsedfile']} created", fg="green")
+            except OSError as e:
+                self.echo(f"{template['templatefile']}: {e}", fg="red", err=True)
+        if rendered:
+            self.cache.save()
+        return rendered
+
+
+@click.command(help="Watch the env file and templates, and re-render the affected templates on every change.")
+@click.option(
+    "-i",
+    "--interval",
+    type=click.FloatRange(min=0.05),
+    default=0.5,
+    show_default=True,
+    help="Seconds between checks for changed files.",
+)
+def watch(interval: float) -> None:
+    registry = load_templates()
+    watcher = Watcher(registry.env["templatefile"], registry.templates)
+    click.secho(
+        f"Watching {watcher.env_file} and {len(watcher.templates)} templates. Press Ctrl-C to stop.", fg="blue"
+    )
+    try:
+        watcher.run(interval)
+    except KeyboardInterrupt:
+        click.secho("Stopped watching.", fg="blue")
@@ -7,7 +7,9 @@ from typing import TYPE_CHECKING
 
 import click
 
-from .templates import PATHS, TEMPLATES, TemplateType
+from .interpolate_templates import load_templates
+from .output import write_text
+from .templates import TemplateType, project_paths, template_source
 
 if TYPE_CHECKING:
     from collections.abc import Iterable
@@ -24,15 +26,18 @@ def create_paths(paths: Iterable[PathLike[str]]) -> None:
 
 def write_templates(templates: list[TemplateType], overwrite: bool) -> None:
     for template in templates:
+        if template["source"] is None:  # The project's own templates are already in place.
+            continue
         if (
             not template["templatefile"].exists() or overwrite
         ):  # Always write the file if it doesn't exist, or overwrite is set.
-            template["templatefile"].write_text(template["data"], encoding="utf-8")
+            template["templatefile"].parent.mkdir(parents=True, exist_ok=True)
+            _ = write_text(template["templatefile"], template_source(template))
 
 
 @click.command(help="Scaffold the yaml files for a typical django project with dummy values.")
 @click.option("--overwrite", is_flag=True, default=False)
 def podman_scaffold(overwrite: bool):
     _curdir = Path.cwd()
-    create_paths(PATHS.values())
-    write_templates(TEMPLATES, overwrite)
+    create_paths(project_paths().values())
+    write_templates(load_templates().all, overwrite)
@@ -0,0 +1,55 @@
+"""YAML reading and writing, through libyaml when it is available."""
+
+from __future__ import annotations
+
+from typing import IO, TYPE_CHECKING, Any
+
+import yaml
+
+SafeLoader: type[yaml.SafeLoader | yaml.CSafeLoader]
+SafeDumper: type[yaml.SafeDumper | yaml.CSafeDumper]
+try:
+    from yaml import CSafeDumper, CSafeLoader
+
+    SafeLoader, SafeDumper = CSafeLoader, CSafeDumper
+    BACKEND = "libyaml"
+except ImportError:
+    SafeLoader, SafeDumper = yaml.SafeLoader, yaml.SafeDumper
+    BACKEND = "pure-python"
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+
+YAMLError = yaml.YAMLError
+
+__all__ = [
+    "BACKEND",
+    "SafeDumper",
+    "SafeLoader",
+    "YAMLError",
+    "backend_info",
+    "dump",
+    "dump_all",
+    "load",
+    "load_all",
+]
+
+
+def backend_info() -> str:
+    return f"yaml backend: {BACKEND} (PyYAML {yaml.__version__})"
+
+
+def load(stream: IO[str] | IO[bytes] | str | bytes) -> Any:
+    return yaml.load(stream, Loader=SafeLoader)
+
+
+def load_all(stream: IO[str] | IO[bytes] | str | bytes) -> Iterator[Any]:
+    return yaml.load_all(stream, Loader=SafeLoader)
+
+
+def dump(data: Any, stream: IO[str] | None = None, **kwargs: Any) -> Any:
+    return yaml.dump(data, stream, Dumper=SafeDumper, **kwargs)
+
+
+def dump_all(documents: Iterable[Any], stream: IO[str] | None = None, **kwargs: Any) -> Any:
+    return yaml.dump_all(documents, stream, Dumper=SafeDumper, **kwargs)
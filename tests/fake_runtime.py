@@ -0,0 +1,98 @@
+"""An in-memory container runtime for tests.
+
+Register it as a backend to select it by name, as with --runtime:
+
+with patch.dict(BACKENDS, FAKE_BACKEND):
+    ...
+
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any
+
+from pymake.runtime import Runtime
+
+if TYPE_CHECKING:
+    import threading
+    from collections.abc import Callable, Mapping, Sequence
+    from pathlib import Path
+
+    from pymake.runtime import Process
+
+FAKE_BACKEND = {"fake": "tests.fake_runtime:FakeRuntime"}
+
+
+@dataclass
+class FakeRuntime(Runtime):
+    """An in-memory runtime that records every operation, for tests.
+
+    Builds add their image to images, secrets are kept in secrets, and every call is appended
+    to calls as (operation, arguments). returncodes maps an operation to the exit code it returns.
+    """
+
+    calls: list[tuple[str, dict[str, Any]]] = field(default_factory=list)
+    images: list[tuple[str, dict[str, str]]] = field(default_factory=list)
+    secrets: dict[str, bytes] = field(default_factory=dict)
+    returncodes: dict[str, int] = field(default_factory=dict)
+    spawner: Callable[[str, Sequence[str]], Process] | None = None
+
+    def _record(self, operation: str, **arguments: Any) -> int:
+        self.calls.append((operation, arguments))
+        return self.returncodes.get(operation, 0)
+
+    def operations(self, operation: str) -> list[dict[str, Any]]:
+        """The arguments of every call of operation."""
+        return [arguments for name, arguments in self.calls if name == operation]
+
+    def build(  # noqa: PLR0913
+        self,
+        tag: str,
+        containerfile: str,
+        context: str | None = None,
+        labels: Mapping[str, str] | None = None,
+        *,
+        prefix: str | None = None,
+        lock: threading.Lock | None = None,
+    ) -> int:
+        returncode = self._record(
+            "build", tag=tag, containerfile=containerfile, context=context, labels=dict(labels or {})
+        )
+        if returncode == 0:
+            self.images.append((tag, dict(labels or {})))
+        return returncode
+
+    def image_exists(self, tag: str, labels: Mapping[str, str] | None = None) -> bool:
+        _ = self._record("image_exists", tag=tag, labels=dict(labels or {}))
+        wanted = (labels or {}).items()
+        return any(image == tag and wanted <= found.items() for image, found in self.images)
+
+    def kube_play(self, manifest: str, prefix: str = "", lock: threading.Lock | None = None) -> int:
+        return self._record("kube_play", manifest=manifest)
+
+    def kube_play_file(
+        self,
+        kube: Path | str,
+        configmaps: Sequence[Path | str] = (),
+        prefix: str | None = None,
+        lock: threading.Lock | None = None,
+    ) -> int:
+        return self._record("kube_play_file", kube=str(kube), configmaps=[str(configmap) for configmap in configmaps])
+
+    def exec(self, container: str, args: Sequence[str], interactive: bool = False) -> int:
+        return self._record("exec", container=container, args=list(args), interactive=interactive)
+
+    def spawn(self, container: str, args: Sequence[str]) -> Process:
+        _ = self._record("spawn", container=container, args=list(args))
+        if self.spawner is None:
+            raise NotImplementedError("FakeRuntime.spawn needs a spawner")
+        return self.spawner(container, args)
+
+    def secret_create(self, name: str, data: bytes, replace: bool = True) -> int:
+        if name in self.secrets and not replace:
+            return 125
+        returncode = self._record("secret_create", name=name, data=data)
+        if returncode == 0:
+            self.secrets[name] = data
+        return returncode
@@ -0,0 +1,158 @@
+"""A stand-in for the podman API socket, for tests and benchmarks.
+
+The server answers the libpod endpoints pymake uses over HTTP/1.1 with keep-alive, records every
+request as {"method", "path", "query", "body"} and counts the connections it accepted.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import socketserver
+import struct
+import tarfile
+import threading
+from http.server import BaseHTTPRequestHandler
+from io import BytesIO
+from pathlib import Path
+from typing import TYPE_CHECKING
+from urllib.parse import parse_qs, urlsplit
+
+if TYPE_CHECKING:
+    from typing import Self
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: PodmanAPIStub.Server
+
+    def setup(self) -> None:
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+
+    def log_message(self, format: str, *args: object) -> None:  # noqa: A002
+        pass
+
+    def _reply(self, status: int, payload: object) -> None:
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _chunked(self, lines: list[dict[str, str]]) -> None:
+        self.send_response(200)
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for line in lines:
+            chunk = json.dumps(line).encode() + b"\n"
+            self.wfile.write(f"{len(chunk):x}\r\n".encode() + chunk + b"\r\n")
+        self.wfile.write(b"0\r\n\r\n")
+
+    def _frames(self, frames: list[tuple[int, bytes]]) -> None:
+        self.send_response(200)
+        self.send_header("Content-Type", "application/vnd.docker.raw-stream")
+        self.end_headers()
+        for stream, payload in frames:
+            self.wfile.write(struct.pack(">BxxxL", stream, len(payload)) + payload)
+        self.close_connection = True
+
+    def _handle(self) -> None:
+        url = urlsplit(self.path)
+        path = url.path.split("/libpod", 1)[-1]
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        with self.server.lock:
+            self.server.requests.append({"method": self.command, "path": path, "query": query, "body": body})
+        stub = self.server.stub
+        if stub.drop:
+            # Close the connection after reading the request, as a server that went away would.
+            stub.drop -= 1
+            self.close_connection = True
+            return
+
+        if path == "/images/json":
+            filters = json.loads(query.get("filters", "{}"))
+            labels = set(filters.get("label", []))
+            found = [
+                {"Id": tag}
+                for tag, image in stub.images.items()
+                if [tag] == filters.get("reference") and labels <= image
+            ]
+            self._reply(200, found)
+        elif path == "/build":
+            with tarfile.open(fileobj=BytesIO(body)) as tar:
+                names = tar.getnames()
+            labels = json.loads(query.get("labels", "{}"))
+            stub.images[query["t"]] = {f"{key}={value}" for key, value in labels.items()}
+            self._chunked(
+                [{"stream": f"STEP 1/1: {len(names)} files\n"}, {"stream": f"Successfully tagged {query['t']}\n"}]
+            )
+        elif path == "/play/kube":
+            if b"kind: Invalid" in body:
+                self._reply(500, {"cause": "invalid manifest", "message": "playing kube failed", "response": 500})
+            else:
+                self._reply(200, {"Pods": [{"ID": "pod-id", "Containers": ["container-id"]}]})
+        elif path == "/secrets/create":
+            stub.secrets[query["name"]] = body
+            self._reply(200, {"ID": "secret-id"})
+        elif path.endswith("/exec") and path.startswith("/containers/"):
+            stub.exec_commands.append(json.loads(body)["Cmd"])
+            self._reply(201, {"Id": "session"})
+        elif path == "/exec/session/start":
+            self._frames([(1, b"hello "), (2, b"oops\n"), (1, b"world\n")])
+        elif path == "/exec/session/json":
+            self._reply(200, {"ExitCode": stub.exec_exit_code})
+        else:
+            self._reply(404, {"cause": "no such endpoint", "message": path})
+
+    do_GET = do_POST = _handle
+
+
+class PodmanAPIStub:
+    """Serve the stand-in API on a unix socket in directory for the duration of a with block."""
+
+    class Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+        """Answer every connection in a thread of its own."""
+
+        daemon_threads = True
+
+    def __init__(self, directory: str) -> None:
+        self.socket = Path(directory) / "podman.sock"
+        self.images: dict[str, set[str]] = {}
+        self.secrets: dict[str, bytes] = {}
+        self.exec_commands: list[list[str]] = []
+        self.exec_exit_code = 0
+        # The number of requests to drop without an answer.
+        self.drop = 0
+        self._server: PodmanAPIStub.Server | None = None
+
+    def __enter__(self) -> Self:
+        """Start serving, on a fresh socket."""
+        if self.socket.exists():
+            os.unlink(self.socket)
+        self._server = self.Server(str(self.socket), Handler)
+        self._server.stub = self
+        self._server.lock = threading.Lock()
+        self._server.connections = 0
+        self._server.requests = []
+        threading.Thread(target=self._server.serve_forever, args=(0.01,), daemon=True).start()
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        """Stop serving, and close the socket."""
+        assert self._server is not None
+        self._server.shutdown()
+        self._server.server_close()
+
+    @property
+    def connections(self) -> int:
+        assert self._server is not None
+        return self._server.connections
+
+    @property
+    def requests(self) -> list[dict]:
+        assert self._server is not None
+        return self._server.requests
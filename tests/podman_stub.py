@@ -0,0 +1,71 @@
+"""A stub podman executable for tests.
+
+The stub records every invocation as a JSON line of {"args": [...], "stdin": "...", "configmaps": [...]},
+where configmaps holds the contents of every --configmap file, and prints a line of output
+(nothing for podman images, so no image exists). PODMAN_STUB_EXIT sets its exit code, and
+PODMAN_STUB_STDOUT what it prints. PODMAN_STUB_SLEEP makes it sleep before it exits.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import stat
+import sys
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from typing import Self
+
+SCRIPT = f"""#!{sys.executable}
+import json, os, sys, time
+args = sys.argv[1:]
+stdin = sys.stdin.read() if "-" in args else None
+configmaps = [open(a).read() for f, a in zip(args, args[1:]) if f == "--configmap" and os.path.isfile(a)]
+with open(os.environ["PODMAN_STUB_LOG"], "a") as fp:
+    fp.write(json.dumps({{"args": args, "stdin": stdin, "configmaps": configmaps}}) + "\\n")
+default = "" if args[:1] == ["images"] else "podman " + " ".join(args) + "\\n"
+sys.stdout.write(os.environ.get("PODMAN_STUB_STDOUT", default))
+sys.stdout.flush()
+time.sleep(float(os.environ.get("PODMAN_STUB_SLEEP", "0")))
+sys.exit(int(os.environ.get("PODMAN_STUB_EXIT", "0")))
+"""
+
+
+class PodmanStub:
+    """Put a recording podman stub first on PATH for the duration of a with block."""
+
+    def __init__(self, directory: str, exit_code: int = 0, stdout: str | None = None, sleep: float = 0) -> None:
+        self.bin = Path(directory) / "stub-bin"
+        self.log = Path(directory) / "podman-calls.jsonl"
+        self.exit_code = exit_code
+        self.stdout = stdout
+        self.sleep = sleep
+        self._environ: dict[str, str] = {}
+
+    def __enter__(self) -> Self:
+        """Write the stub, and put it first on PATH."""
+        self.bin.mkdir(exist_ok=True)
+        podman = self.bin / "podman"
+        podman.write_text(SCRIPT)
+        podman.chmod(podman.stat().st_mode | stat.S_IEXEC)
+        self._environ = dict(os.environ)
+        os.environ["PATH"] = f"{self.bin}{os.pathsep}{os.environ['PATH']}"
+        os.environ["PODMAN_STUB_LOG"] = str(self.log)
+        os.environ["PODMAN_STUB_EXIT"] = str(self.exit_code)
+        os.environ["PODMAN_STUB_SLEEP"] = str(self.sleep)
+        if self.stdout is not None:
+            os.environ["PODMAN_STUB_STDOUT"] = self.stdout
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        """Restore the environment, and with it PATH."""
+        os.environ.clear()
+        os.environ.update(self._environ)
+
+    @property
+    def calls(self) -> list[dict]:
+        if not self.log.exists():
+            return []
+        return [json.loads(line) for line in self.log.read_text().splitlines()]
@@ -0,0 +1,115 @@
+"""Test cases for the asyncio execution core."""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from pymake import aio
+
+# Print name, wait, print name again, then exit with code.
+SCRIPT = "import sys, time; print(sys.argv[1], flush=True); time.sleep(float(sys.argv[2])); print(sys.argv[1]); sys.exit(int(sys.argv[3]))"
+
+
+def python(name: str, sleep: float, code: int = 0) -> list[str]:
+    return [sys.executable, "-c", SCRIPT, name, str(sleep), str(code)]
+
+
+class TestAio(unittest.TestCase):
+    def setUp(self):
+        self._tmpdir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self._tmpdir.cleanup()
+
+    def test_stream_interleaves_output(self):
+        async def both():
+            return await asyncio.gather(
+                aio.stream(python("slow", 0.6, 3), prefix="[a] "), aio.stream(python("fast", 0.1), prefix="[b] ")
+            )
+
+        with patch("click.secho") as secho:
+            self.assertEqual(asyncio.run(both()), [3, 0])
+
+        lines = [call.args[0] for call in secho.call_args_list]
+        self.assertEqual(lines[-1], "[a] slow")
+        self.assertEqual(sorted(lines[:3]), ["[a] slow", "[b] fast", "[b] fast"])
+
+    def test_stream_stdin(self):
+        with patch("click.secho") as secho:
+            code = asyncio.run(
+                aio.stream([sys.executable, "-c", "import sys; print(sys.stdin.read().upper())"], "manifest")
+            )
+
+        self.assertEqual(code, 0)
+        self.assertEqual(secho.call_args.args[0], "MANIFEST")
+
+    def test_stream_long_lines(self):
+        script = "import sys; sys.stdout.write('x' * 200_000 + '\\nlast')"
+        with patch("click.secho") as secho:
+            code = asyncio.run(aio.stream([sys.executable, "-c", script], prefix="[a] "))
+
+        self.assertEqual(code, 0)
+        self.assertEqual([call.args[0] for call in secho.call_args_list], ["[a] " + "x" * 200_000, "[a] last"])
+
+    def test_timeout(self):
+        start = time.perf_counter()
+        with patch("click.secho") as secho:
+            code = asyncio.run(aio.stream(python("sleeper", 30), timeout=0.3))
+
+        self.assertEqual(code, aio.TIMEOUT_EXIT)
+        self.assertLess(time.perf_counter() - start, 5)
+        self.assertIn("timed out after 0.3 s", secho.call_args.args[0])
+
+    def test_cancel_stops_process(self):
+        pidfile = Path(self._tmpdir.name) / "pid"
+        args = [
+            sys.executable,
+            "-c",
+            f"import os, time; open({str(pidfile)!r}, 'w').write(str(os.getpid())); time.sleep(30)",
+        ]
+
+        async def cancelled():
+            task = asyncio.create_task(aio.stream(args))
+            while not pidfile.exists() or not pidfile.read_text():
+                await asyncio.sleep(0.01)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+
+        asyncio.run(cancelled())
+        with self.assertRaises(ProcessLookupError):
+            os.kill(int(pidfile.read_text()), 0)
+
+    def test_bounded(self):
+        running = 0
+        peak = 0
+
+        async def job(i):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01 * (5 - i))
+            running -= 1
+            return i
+
+        self.assertEqual(asyncio.run(aio.bounded(2, (job(i) for i in range(5)))), [0, 1, 2, 3, 4])
+        self.assertEqual(peak, 2)
+
+    def test_run_interrupted(self):
+        async def interrupted():
+            raise KeyboardInterrupt
+
+        with patch("click.secho"), self.assertRaises(SystemExit) as raised:
+            aio.run(interrupted())
+        self.assertEqual(raised.exception.code, aio.INTERRUPT_EXIT)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,101 @@
+"""Test cases for the content-addressed build cache."""
+
+import os
+import unittest
+from pathlib import Path
+
+from click.testing import CliRunner
+
+from pymake.build_cache import LABEL, build_digest, copy_sources, hash_file
+from pymake.cmds import build
+from tests.podman_stub import PodmanStub
+from tests.tmpdir import TmpDirTestCase
+
+CONTAINERFILE = """FROM python:3.11
+COPY --from=builder /wheels /wheels
+COPY requirements.txt \\
+     pyproject.toml /app/
+ADD ["src", "/app/src"]
+ADD https://example.com/file.tar.gz /tmp/
+RUN pip install /app
+"""
+
+
+class TestBuildCache(TmpDirTestCase):
+    def setUp(self):
+        super().setUp()
+        Path("Containerfile").write_text(CONTAINERFILE)
+        Path("requirements.txt").write_text("click\n")
+        Path("pyproject.toml").write_text("[project]\n")
+        Path("src/app").mkdir(parents=True)
+        Path("src/app/__init__.py").write_text("")
+        Path("untracked.txt").write_text("not copied")
+
+    def test_copy_sources(self):
+        self.assertEqual(copy_sources(CONTAINERFILE), ["requirements.txt", "pyproject.toml", "src"])
+
+    def test_hash_file_in_chunks(self):
+        import hashlib
+
+        data = os.urandom(3 * 1024 * 1024 + 7)
+        Path("big.bin").write_bytes(data)
+        self.assertEqual(hash_file("big.bin").hexdigest(), hashlib.sha256(data).hexdigest())
+
+    def test_digest_follows_copied_files(self):
+        digest = build_digest("Containerfile")
+
+        Path("untracked.txt").write_text("changed")
+        self.assertEqual(build_digest("Containerfile"), digest)
+
+        Path("src/app/__init__.py").write_text("VERSION = 2\n")
+        self.assertNotEqual(build_digest("Containerfile"), digest)
+
+    def test_absolute_sources_are_in_the_context(self):
+        Path("Containerfile").write_text("FROM x\nCOPY /requirements.txt /app/\n")
+        digest = build_digest("Containerfile")
+
+        Path("requirements.txt").write_text("click\nPyYAML\n")
+        self.assertNotEqual(build_digest("Containerfile"), digest)
+
+    def test_build_needs_tag_and_file(self):
+        result = CliRunner().invoke(build, ["--tag", "my-app"])
+
+        self.assertEqual(result.exit_code, 2)
+        self.assertIn("Give --tag and --file", result.output)
+
+    def test_failed_build_exit_code(self):
+        for args in ([], ["--timeout", "10"]):
+            with self.subTest(args=args), PodmanStub(self._tmpdir.name, exit_code=3):
+                result = CliRunner().invoke(build, ["--tag", "my-app", "--file", "Containerfile", *args])
+
+            self.assertEqual(result.exit_code, 3, result.output)
+
+    def test_build_and_skip(self):
+        digest = build_digest("Containerfile")
+        with PodmanStub(self._tmpdir.name, stdout="") as podman:
+            result = CliRunner().invoke(build, ["--tag", "my-app", "--file", "Containerfile"])
+
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertEqual(podman.calls[0]["args"][:2], ["images", "--quiet"])
+        self.assertIn(f"label={LABEL}={digest}", podman.calls[0]["args"])
+        self.assertEqual(podman.calls[1]["args"][0], "build")
+        self.assertIn(f"{LABEL}={digest}", podman.calls[1]["args"])
+
+        with PodmanStub(self._tmpdir.name, stdout="0123456789ab\n") as podman:
+            podman.log.unlink()
+            result = CliRunner().invoke(build, ["--tag", "my-app", "--file", "Containerfile"])
+
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertIn("up to date", result.output)
+        self.assertEqual([call["args"][0] for call in podman.calls], ["images"])
+
+    def test_force(self):
+        with PodmanStub(self._tmpdir.name, stdout="0123456789ab\n") as podman:
+            result = CliRunner().invoke(build, ["--tag", "my-app", "--file", "Containerfile", "--force"])
+
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertEqual([call["args"][0] for call in podman.calls], ["build"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,126 @@
+"""Test cases for building several images from PyMakeFile.yaml."""
+
+import time
+import unittest
+from pathlib import Path
+
+from click.testing import CliRunner
+
+from pymake.builds import BuildError, BuildResult, BuildTarget, critical_path, load_targets, select
+from pymake.cmds import build
+from tests.podman_stub import PodmanStub
+from tests.tmpdir import TmpDirTestCase
+
+PYMAKEFILE = """tag: app
+containerfile: Containerfile
+builds:
+  - tag: app
+    containerfile: Containerfile
+    depends_on: [base]
+  - tag: base
+    containerfile: Containerfile.base
+  - tag: sidecar
+    containerfile: Containerfile.sidecar
+    context: sidecar
+"""
+
+
+class TestBuilds(TmpDirTestCase):
+    def setUp(self):
+        super().setUp()
+        Path("PyMakeFile.yaml").write_text(PYMAKEFILE)
+        Path("sidecar").mkdir()
+        for name in ("Containerfile", "Containerfile.base", "Containerfile.sidecar"):
+            Path(name).write_text("FROM scratch\n")
+
+    def test_load_targets(self):
+        builds = [
+            {"tag": "app", "containerfile": "Containerfile", "depends_on": "base"},
+            {"tag": "base", "containerfile": "Containerfile.base"},
+        ]
+        self.assertEqual(list(load_targets(builds)), ["base", "app"])
+        self.assertEqual(list(select(load_targets(builds), ["base"])), ["base"])
+
+        with self.assertRaisesRegex(BuildError, "undefined"):
+            load_targets([{"tag": "app", "containerfile": "Containerfile", "depends_on": ["db"]}])
+        with self.assertRaisesRegex(BuildError, "Duplicate"):
+            load_targets([{"tag": "app", "containerfile": "a"}, {"tag": "app", "containerfile": "b"}])
+        with self.assertRaisesRegex(BuildError, "Circular build dependency: a -> b -> a"):
+            load_targets(
+                [
+                    {"tag": "a", "containerfile": "a", "depends_on": "b"},
+                    {"tag": "b", "containerfile": "b", "depends_on": "a"},
+                ]
+            )
+
+    def test_circular_builds_are_reported(self):
+        Path("PyMakeFile.yaml").write_text(
+            PYMAKEFILE.replace(
+                "containerfile: Containerfile.base", "containerfile: Containerfile.base\n    depends_on: app"
+            )
+        )
+        with PodmanStub(self._tmpdir.name) as podman:
+            result = CliRunner().invoke(build, [])
+
+        self.assertEqual(result.exit_code, 1)
+        self.assertIn("Circular build dependency: app -> base -> app", result.output)
+        self.assertEqual(podman.calls, [])
+
+    def test_critical_path(self):
+        results = {
+            "base": BuildResult(BuildTarget("base", "a"), "built", 2.0),
+            "sidecar": BuildResult(BuildTarget("sidecar", "b"), "built", 3.0),
+            "app": BuildResult(BuildTarget("app", "c"), "built", 1.5, ["base"]),
+        }
+        self.assertEqual(critical_path(results), (["base", "app"], 3.5))
+
+    def test_build_in_dependency_order(self):
+        with PodmanStub(self._tmpdir.name) as podman:
+            result = CliRunner().invoke(build, ["--jobs", "2"])
+
+        self.assertEqual(result.exit_code, 0, result.output)
+        builds = [call["args"][2] for call in podman.calls if call["args"][0] == "build"]
+        self.assertEqual(sorted(builds), ["app", "base", "sidecar"])
+        self.assertLess(builds.index("base"), builds.index("app"))
+        self.assertIn("[sidecar] podman build --tag sidecar -f Containerfile.sidecar", result.output)
+        self.assertIn("critical path", result.output)
+
+    def test_select_targets(self):
+        with PodmanStub(self._tmpdir.name) as podman:
+            result = CliRunner().invoke(build, ["app"])
+
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertEqual([call["args"][2] for call in podman.calls if call["args"][0] == "build"], ["base", "app"])
+
+    def test_failed_dependency_skips_dependents(self):
+        with PodmanStub(self._tmpdir.name, exit_code=1) as podman:
+            result = CliRunner().invoke(build, [])
+
+        self.assertEqual(result.exit_code, 1)
+        self.assertEqual(
+            sorted(call["args"][2] for call in podman.calls if call["args"][0] == "build"), ["base", "sidecar"]
+        )
+        self.assertRegex(result.output, r"app\s+skipped")
+
+    def test_timeout(self):
+        with PodmanStub(self._tmpdir.name, sleep=10):
+            start = time.perf_counter()
+            result = CliRunner().invoke(build, ["--force", "--jobs", "3", "--timeout", "0.5"])
+
+        self.assertLess(time.perf_counter() - start, 5)
+        self.assertEqual(result.exit_code, 1)
+        self.assertIn("[base] podman build timed out after 0.5 s", result.output)
+        self.assertRegex(result.output, r"app\s+skipped")
+
+    def test_explicit_tag_builds_one_image(self):
+        with PodmanStub(self._tmpdir.name) as podman:
+            result = CliRunner().invoke(build, ["--tag", "other"])
+
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertEqual(
+            [call["args"][:3] for call in podman.calls if call["args"][0] == "build"], [["build", "--tag", "other"]]
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
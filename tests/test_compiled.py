@@ -0,0 +1,57 @@
+"""Test cases for compiled templates."""
+
+import tempfile
+import unittest
+from pathlib import Path
+from string import Template
+
+from pymake.compiled import TemplateCache, compile_template, unused
+from pymake.templates import builtin_registry, template_source
+
+REGISTRY = builtin_registry()
+
+MAPPING = {"APP_NAME": "shop", "PORT": 8000, "host": "example.org"}
+
+
+class TestCompiledTemplate(unittest.TestCase):
+    def test_render_matches_safe_substitute(self):
+        texts = [
+            "",
+            "plain text",
+            "${APP_NAME}-app on $host:${PORT}",
+            "$$APP_NAME costs $$5 and ${MISSING} $missing",
+            "a lone $ and ${ unterminated, ${APP_NAME",
+            "$APP_NAMEx $APP_NAME.x ${app_name} $1",
+            "$",
+            "trailing $$",
+            *(template_source(template) for template in REGISTRY.all),
+        ]
+        for text in texts:
+            with self.subTest(text=text[:40]):
+                self.assertEqual(compile_template(text).render(MAPPING), Template(text).safe_substitute(MAPPING))
+
+    def test_placeholder_index(self):
+        compiled = compile_template("${APP_NAME} $host ${MISSING} $$escaped ${APP_NAME}")
+
+        self.assertEqual(compiled.placeholders, {"APP_NAME", "host", "MISSING"})
+        self.assertEqual(compiled.missing(MAPPING), {"MISSING"})
+        self.assertEqual(unused([compiled], MAPPING), {"PORT"})
+
+    def test_cache(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            template = Path(tmpdir) / "template"
+            template.write_text("${APP_NAME}:${PORT}")
+            directory = Path(tmpdir) / "compiled"
+            compiled = TemplateCache(directory).load(template)
+
+            self.assertEqual(len(list(directory.iterdir())), 1)
+            self.assertEqual(TemplateCache(directory).load(template), compiled)
+            self.assertEqual(compiled.render(MAPPING), "shop:8000")
+
+            template.write_text("${host}")
+            self.assertEqual(TemplateCache(directory).load(template).render(MAPPING), "example.org")
+            self.assertEqual(len(list(directory.iterdir())), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,103 @@
+"""Test cases for the lazily loaded PyMakeFile.yaml configuration."""
+
+from __future__ import annotations
+
+import marshal
+import subprocess
+import sys
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from click.testing import CliRunner
+
+from pymake.build_cache import LABEL, build_digest
+from pymake.cmds import build
+from pymake.config import Config
+from tests.tmpdir import TmpDirTestCase
+
+
+def imported_modules(statement: str, cwd: str) -> dict[str, int]:
+    """Run statement in a fresh interpreter and return the cumulative -X importtime of every module."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement], cwd=cwd, capture_output=True, text=True, check=True
+    )
+    modules = {}
+    for line in result.stderr.splitlines():
+        if line.startswith("import time:") and "|" in line and "cumulative" not in line:
+            _, cumulative, name = line.split("|")
+            modules[name.strip()] = int(cumulative)
+    return modules
+
+
+class TestConfig(TmpDirTestCase):
+    def setUp(self):
+        super().setUp()
+        Path("PyMakeFile.yaml").write_text("tag: my-app\ncontainerfile: Containerfile\nconfigmaps: [a.yaml, b.yaml]\n")
+
+    def test_lazy_load(self):
+        config = Config(cache_file=None)
+        with patch.object(Config, "_load", wraps=config._load) as mock_load:
+            default = config.default("configmaps")
+            mock_load.assert_not_called()
+            self.assertEqual(default(), ("a.yaml", "b.yaml"))
+            self.assertEqual(config.get("tag"), "my-app")
+            mock_load.assert_called_once()
+
+    def test_missing_file(self):
+        config = Config(Path("missing.yaml"), cache_file=None)
+
+        self.assertEqual(config.data, {})
+        self.assertIsNone(config.default("tag")())
+
+    def test_cache(self):
+        cache_file = Path(".pymake/config.cache")
+        self.assertEqual(Config(cache_file=cache_file).get("tag"), "my-app")
+        self.assertTrue(cache_file.exists())
+
+        with patch("pymake.yaml_io.load") as mock_load:
+            self.assertEqual(Config(cache_file=cache_file).get("tag"), "my-app")
+            mock_load.assert_not_called()
+
+        Path("PyMakeFile.yaml").write_text("tag: renamed-app\n")
+        self.assertEqual(Config(cache_file=cache_file).get("tag"), "renamed-app")
+
+    def test_cache_holding_no_mapping_is_ignored(self):
+        cache_file = Path("config.cache")
+        st = Path("PyMakeFile.yaml").stat()
+        key = (str(Path("PyMakeFile.yaml").resolve()), st.st_mtime_ns, st.st_size)
+        cache_file.write_bytes(marshal.dumps((key, ["not", "a", "mapping"])))
+
+        self.assertEqual(Config(cache_file=cache_file).get("tag"), "my-app")
+
+    @patch("pymake.runtime.subprocess.run")
+    def test_option_defaults(self, mock_run):
+        mock_run.return_value.returncode = 0
+        Path("Containerfile").write_text("FROM scratch\n")
+        result = CliRunner().invoke(build, ["--force"])
+
+        self.assertEqual(result.exit_code, 0)
+        mock_run.assert_called_once_with(
+            [
+                "podman",
+                "build",
+                "--tag",
+                "my-app",
+                "-f",
+                "Containerfile",
+                "--label",
+                f"{LABEL}={build_digest('Containerfile')}",
+            ],
+            check=False,
+        )
+
+    def test_import_does_not_parse_config(self):
+        Path("PyMakeFile.yaml").write_text("tag: [unterminated\n")
+        modules = imported_modules("import pymake.cmds", self._tmpdir.name)
+
+        self.assertIn("pymake.cmds", modules)
+        self.assertNotIn("yaml", modules)
+
+
+if __name__ == "__main__":
+    unittest.main()
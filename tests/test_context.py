@@ -0,0 +1,62 @@
+"""Test cases for the resolved substitution context."""
+
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from click.testing import CliRunner
+
+from pymake.context import EnvContext
+from pymake.interpolate_templates import interpolate_templates, yamlparser
+from tests.tmpdir import TmpDirTestCase
+
+ENV_FILE = """
+GENERAL:
+  APP_NAME: "shop"
+SERVICE_NAMES:
+  APPSERVICE_NAME: "${APP_NAME}-app"
+"""
+
+
+class TestEnvContext(TmpDirTestCase):
+    def test_load(self):
+        Path("envs.yaml").write_text(ENV_FILE)
+        context = EnvContext.load("envs.yaml")
+
+        self.assertEqual(context.source, Path("envs.yaml"))
+        self.assertEqual(dict(context.variables), {"APP_NAME": "shop", "APPSERVICE_NAME": "shop-app"})
+
+    def test_yamlparser(self):
+        runner = CliRunner()
+        Path("envs.yaml").write_text(ENV_FILE)
+        Path("inn.txt").write_text("name: ${APPSERVICE_NAME}, $UNKNOWN")
+        result = runner.invoke(yamlparser, ["-f", "envs.yaml", "-i", "inn.txt", "-o", "out.txt"])
+
+        self.assertEqual(result.exit_code, 0)
+        self.assertEqual(Path("out.txt").read_text(), "name: shop-app, $UNKNOWN")
+
+    def test_yamlparser_undefined_variable(self):
+        runner = CliRunner()
+        Path("envs.yaml").write_text('GENERAL:\n  APP_NAME: "${MISSING}"\n')
+        Path("inn.txt").write_text("${APP_NAME}")
+        result = runner.invoke(yamlparser, ["-f", "envs.yaml", "-i", "inn.txt", "-o", "out.txt"])
+
+        self.assertEqual(result.exit_code, 1)
+        self.assertIn("${MISSING}", result.output)
+        self.assertFalse(Path("out.txt").exists())
+
+    @patch("pymake.interpolate_templates.render_template")
+    @patch("pymake.interpolate_templates.EnvContext.load")
+    def test_interpolate_templates_loads_once(self, mock_load, mock_render_template):
+        runner = CliRunner()
+        result = runner.invoke(interpolate_templates, [])
+
+        self.assertEqual(result.exit_code, 0)
+        mock_load.assert_called_once()
+        self.assertGreater(mock_render_template.call_count, 1)
+        for call in mock_render_template.call_args_list:
+            self.assertIs(call.args[0], mock_load.return_value)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,27 @@
+"""Test cases for ordering a dependency graph."""
+
+import unittest
+
+from pymake.graph import CycleError, topological_order
+
+
+class TestTopologicalOrder(unittest.TestCase):
+    def test_dependencies_come_first(self):
+        graph = {"app": ["base", "lib"], "lib": ["base"], "base": [], "sidecar": []}
+
+        self.assertEqual(list(topological_order(graph)), ["base", "lib", "app", "sidecar"])
+
+    def test_long_chain_does_not_recurse(self):
+        graph = {**{f"n{i}": [f"n{i + 1}"] for i in range(10_000)}, "n10000": []}
+
+        self.assertEqual(next(topological_order(graph)), "n10000")
+
+    def test_cycle(self):
+        with self.assertRaises(CycleError) as cm:
+            list(topological_order({"a": ["b"], "b": ["c"], "c": ["b"]}))
+
+        self.assertEqual(cm.exception.cycle, ["b", "c", "b"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,102 @@
+"""Test cases for the interpolate_templates command."""
+
+import unittest
+from pathlib import Path
+
+from click.testing import CliRunner
+
+from pymake.interpolate_templates import check_templates, interpolate_templates
+from pymake.render_cache import CACHE_FILE
+from pymake.templates import PATHS, builtin_registry
+from pymake.write_templates import create_paths, write_templates
+from tests.tmpdir import TmpDirTestCase
+
+REGISTRY = builtin_registry()
+
+
+class TestInterpolateTemplates(TmpDirTestCase):
+    def setUp(self):
+        super().setUp()
+        create_paths(PATHS.values())
+        write_templates(REGISTRY.all, False)
+
+    def _outputs(self):
+        return {str(t["parsedfile"]): t["parsedfile"].read_text() for t in REGISTRY.templates}
+
+    def test_jobs_matches_serial(self):
+        runner = CliRunner()
+        serial = runner.invoke(interpolate_templates, [])
+        serial_outputs = self._outputs()
+        parallel = runner.invoke(interpolate_templates, ["--jobs", "4", "--force"])
+
+        self.assertEqual(serial.exit_code, 0)
+        self.assertEqual(parallel.exit_code, 0)
+        self.assertEqual(serial.output, parallel.output)
+        self.assertEqual(serial_outputs, self._outputs())
+        self.assertNotIn("${APP_NAME}", Path("play-kube.yaml").read_text())
+
+    def test_errors_are_reported_per_template(self):
+        REGISTRY.templates[1]["templatefile"].unlink()
+        REGISTRY.templates[4]["templatefile"].unlink()
+        runner = CliRunner()
+        result = runner.invoke(interpolate_templates, ["--jobs", "3"])
+
+        self.assertEqual(result.exit_code, 1)
+        lines = result.output.splitlines()
+        self.assertEqual(len(lines), len(REGISTRY.templates))
+        self.assertIn(str(REGISTRY.templates[1]["templatefile"]), lines[1])
+        self.assertIn(str(REGISTRY.templates[4]["templatefile"]), lines[4])
+        self.assertTrue(REGISTRY.templates[-1]["parsedfile"].exists())
+
+    def test_unchanged_templates_are_skipped(self):
+        runner = CliRunner()
+        runner.invoke(interpolate_templates, [])
+        mtimes = {t["parsedfile"]: t["parsedfile"].stat().st_mtime_ns for t in REGISTRY.templates}
+        result = runner.invoke(interpolate_templates, [])
+
+        self.assertEqual(result.exit_code, 0)
+        self.assertTrue(CACHE_FILE.exists())
+        self.assertNotIn("created", result.output)
+        for parsedfile, mtime in mtimes.items():
+            self.assertEqual(parsedfile.stat().st_mtime_ns, mtime)
+
+    def test_changed_variable_renders_only_its_templates(self):
+        runner = CliRunner()
+        runner.invoke(interpolate_templates, [])
+        envs = REGISTRY.env["templatefile"]
+        envs.write_text(envs.read_text().replace('WORKER_PROCESSES: "5"', 'WORKER_PROCESSES: "7"'))
+        result = runner.invoke(interpolate_templates, [])
+
+        created = [line for line in result.output.splitlines() if line.endswith("created")]
+        self.assertEqual(created, [f"{PATHS['nginx-out'] / 'nginx.conf'} created"])
+        self.assertIn("worker_processes  7;", (PATHS["nginx-out"] / "nginx.conf").read_text())
+
+    def test_edited_output_is_rendered_again(self):
+        runner = CliRunner()
+        runner.invoke(interpolate_templates, [])
+        Path("play-kube.yaml").write_text("edited")
+        result = runner.invoke(interpolate_templates, [])
+
+        self.assertIn("play-kube.yaml created", result.output)
+        self.assertNotEqual(Path("play-kube.yaml").read_text(), "edited")
+
+    def test_force(self):
+        runner = CliRunner()
+        runner.invoke(interpolate_templates, [])
+        result = runner.invoke(interpolate_templates, ["--force"])
+
+        self.assertNotIn("unchanged", result.output)
+
+    def test_check_templates(self):
+        envs = REGISTRY.env["templatefile"]
+        envs.write_text(envs.read_text() + 'EXTRA:\n  NOT_USED_ANYWHERE: "x"\n')
+        runner = CliRunner()
+        result = runner.invoke(check_templates, [])
+
+        self.assertEqual(result.exit_code, 0)
+        self.assertIn("nginx-template.conf: no variable for", result.output)
+        self.assertIn("NOT_USED_ANYWHERE", result.output)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,124 @@
+"""Test cases for running many manage.py commands in one Django process."""
+
+import os
+import subprocess
+import sys
+import unittest
+from pathlib import Path
+
+from click.testing import CliRunner
+
+from pymake.cmds import manage
+from pymake.manage_session import ManageSession, SessionError
+from pymake.runtime import set_runtime
+from tests.fake_runtime import FakeRuntime
+from tests.tmpdir import TmpDirTestCase
+
+# Just enough of django for manage.py: setup() counts its calls, and every command prints
+# its arguments and the number of setups, exits with the code given to the exit command, and
+# flush prompts for an answer.
+DJANGO = {
+    "django/__init__.py": "setups = 0\n\ndef setup():\n    global setups\n    setups += 1\n",
+    "django/core/__init__.py": "",
+    "django/core/management/__init__.py": """import os, sys
+
+import django
+
+
+def execute_from_command_line(argv=None):
+    if argv[1] == "exit":
+        sys.exit(int(argv[2]))
+    if argv[1] == "crash":
+        raise RuntimeError("crashed")
+    if argv[1] == "flush":
+        print("answered", input("Are you sure? "))
+    print(os.environ["DJANGO_SETTINGS_MODULE"], *argv[1:], "setups", django.setups)
+""",
+}
+
+MANAGE = """import os
+import sys
+
+
+def main():
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "app.settings")
+    from django.core.management import execute_from_command_line
+
+    execute_from_command_line(sys.argv)
+
+
+if __name__ == "__main__":
+    main()
+"""
+
+
+def local_runner(container, args):
+    """Run the container command here, with the fake django importable."""
+    assert args[0] == "python"
+    return subprocess.Popen(
+        [sys.executable, *args[1:]],
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        text=True,
+        env={**os.environ, "PYTHONPATH": os.getcwd()},
+    )
+
+
+class TestManageSession(TmpDirTestCase):
+    def setUp(self):
+        super().setUp()
+        for name, text in DJANGO.items():
+            Path(name).parent.mkdir(parents=True, exist_ok=True)
+            Path(name).write_text(text)
+        Path("app").mkdir()
+        Path("app/manage.py").write_text(MANAGE)
+
+    def test_commands_share_one_process(self):
+        with ManageSession("my-pod-app", "app/manage.py", local_runner) as session:
+            first = session.run(["migrate", "--noinput"])
+            second = session.run(["check"])
+            failed = session.run(["exit", "3"])
+            crashed = session.run(["crash"])
+            after = session.run(["showmigrations"])
+
+        self.assertEqual((first.exit_code, first.output), (0, "app.settings migrate --noinput setups 1\n"))
+        self.assertEqual(second.output, "app.settings check setups 1\n")
+        self.assertEqual(failed.exit_code, 3)
+        self.assertEqual(crashed.exit_code, 1)
+        self.assertIn("RuntimeError: crashed", crashed.output)
+        self.assertEqual((after.exit_code, after.output), (0, "app.settings showmigrations setups 1\n"))
+
+    def test_prompt_does_not_read_the_next_command(self):
+        with ManageSession("my-pod-app", "app/manage.py", local_runner) as session:
+            flushed = session.run(["flush"])
+            after = session.run(["check"])
+
+        self.assertEqual(flushed.exit_code, 1)
+        self.assertIn("EOFError", flushed.output)
+        self.assertEqual((after.exit_code, after.output), (0, "app.settings check setups 1\n"))
+
+    def test_startup_failure(self):
+        Path("app/manage.py").write_text("raise ImportError('no settings')\n")
+
+        with self.assertRaisesRegex(SessionError, "no settings"):
+            ManageSession("my-pod-app", "app/manage.py", local_runner).start()
+
+    def test_batch(self):
+        Path("commands.txt").write_text("# setup\nmigrate --noinput\n\ncollectstatic --noinput\nexit 2\n")
+
+        runtime = FakeRuntime(spawner=local_runner)
+        previous = set_runtime(runtime)
+        try:
+            result = CliRunner().invoke(manage, ["-c", "my-pod-app", "-m", "app/manage.py", "--batch", "commands.txt"])
+        finally:
+            set_runtime(previous)
+
+        self.assertEqual(result.exit_code, 1)
+        self.assertIn("$ manage.py migrate --noinput\napp.settings migrate --noinput setups 1\n", result.output)
+        self.assertIn("app.settings collectstatic --noinput setups 1\n", result.output)
+        self.assertIn("exited with 2", result.output)
+        self.assertEqual(len(runtime.operations("spawn")), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
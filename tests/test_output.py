@@ -0,0 +1,84 @@
+"""Test cases for the atomic output writer."""
+
+import os
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from pymake.output import FSYNC_ENV, atomic_open, is_identical, write_bytes, write_text
+from tests.tmpdir import TmpDirTestCase
+
+
+class TestOutput(TmpDirTestCase):
+    def test_write_text(self):
+        self.assertTrue(write_text("out.yaml", "name: å\n"))
+
+        self.assertEqual(Path("out.yaml").read_text(encoding="utf-8"), "name: å\n")
+        self.assertEqual(os.listdir("."), ["out.yaml"])
+
+    def test_identical_content_is_not_written(self):
+        Path("out.yaml").write_text("same")
+        inode = Path("out.yaml").stat().st_ino
+
+        self.assertFalse(write_text("out.yaml", "same"))
+        self.assertEqual(Path("out.yaml").stat().st_ino, inode)
+
+    def test_changed_content_replaces_the_file(self):
+        Path("out.yaml").write_text("old!")
+        Path("out.yaml").chmod(0o600)
+        inode = Path("out.yaml").stat().st_ino
+
+        self.assertTrue(write_text("out.yaml", "new!"))
+        self.assertEqual(Path("out.yaml").read_text(), "new!")
+        self.assertNotEqual(Path("out.yaml").stat().st_ino, inode)
+        self.assertEqual(Path("out.yaml").stat().st_mode & 0o777, 0o600)
+
+    def test_is_identical(self):
+        Path("out.yaml").write_bytes(b"abc")
+
+        self.assertTrue(is_identical("out.yaml", b"abc"))
+        self.assertFalse(is_identical("out.yaml", b"abd"))
+        self.assertFalse(is_identical("out.yaml", b"abcd"))
+        self.assertFalse(is_identical("missing.yaml", b""))
+
+    def test_atomic_open_failure_keeps_the_original(self):
+        Path("out.yaml").write_text("original")
+        with self.assertRaises(ValueError), atomic_open("out.yaml") as fp:
+            fp.write("partial")
+            raise ValueError
+
+        self.assertEqual(Path("out.yaml").read_text(), "original")
+        self.assertEqual(os.listdir("."), ["out.yaml"])
+
+    def test_atomic_open_skips_identical_content(self):
+        Path("out.yaml").write_text("same")
+        inode = Path("out.yaml").stat().st_ino
+        with atomic_open("out.yaml") as fp:
+            fp.write("same")
+
+        self.assertEqual(Path("out.yaml").stat().st_ino, inode)
+        self.assertEqual(os.listdir("."), ["out.yaml"])
+
+    def test_new_file_mode_leaves_the_umask_alone(self):
+        umask = os.umask(0)
+        os.umask(umask)
+        with patch("pymake.output.os.umask") as set_umask:
+            write_text("out.yaml", "new")
+
+        self.assertFalse(set_umask.called)
+        self.assertEqual(Path("out.yaml").stat().st_mode & 0o777, 0o666 & ~umask)
+
+    def test_fsync_is_opt_in(self):
+        with patch("pymake.output.os.fsync") as fsync:
+            write_bytes("a.bin", b"a")
+            self.assertFalse(fsync.called)
+            with patch.dict(os.environ, {FSYNC_ENV: "1"}):
+                write_bytes("b.bin", b"b")
+            self.assertTrue(fsync.called)
+            fsync.reset_mock()
+            write_bytes("c.bin", b"c", fsync=True)
+            self.assertTrue(fsync.called)
+
+
+if __name__ == "__main__":
+    unittest.main()
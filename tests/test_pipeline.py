@@ -0,0 +1,90 @@
+"""Test cases for piping manifests to podman kube play over stdin."""
+
+import base64
+import unittest
+from pathlib import Path
+
+import yaml
+from click.testing import CliRunner
+
+from pymake.cmds import play_kube
+from pymake.interpolate_templates import interpolate_templates
+from pymake.pipeline import join_manifests
+from pymake.publish_encode import publish_encode
+from pymake.templates import PATHS, builtin_registry
+from pymake.write_templates import create_paths, write_templates
+from tests.podman_stub import PodmanStub
+from tests.tmpdir import TmpDirTestCase
+
+REGISTRY = builtin_registry()
+
+CONFIGMAP = "apiVersion: v1\nkind: ConfigMap\nmetadata:\n  name: env\ndata:\n  KEY: value\n"
+SECRET = "apiVersion: v1\nkind: Secret\nmetadata:\n  name: credentials\ndata:\n  PASSWORD: hunter2\n"
+POD = "apiVersion: v1\nkind: Pod\nmetadata:\n  name: app\n"
+
+
+class TestPipeline(TmpDirTestCase):
+    def _documents(self, stdin):
+        return {d["kind"]: d for d in yaml.safe_load_all(stdin) if d}
+
+    def test_join_manifests(self):
+        stream = join_manifests([POD, CONFIGMAP, "\n" + SECRET])
+
+        self.assertEqual([d["kind"] for d in yaml.safe_load_all(stream)], ["Secret", "ConfigMap", "Pod"])
+
+    def test_publish_encode_stdin(self):
+        Path("django-secrets-template.yaml").write_text(SECRET)
+        with PodmanStub(self._tmpdir.name) as podman:
+            result = CliRunner().invoke(publish_encode, ["--stdin", "django-secrets-template.yaml"])
+
+        self.assertEqual(result.exit_code, 0)
+        self.assertFalse(Path("django-secrets.yaml").exists())
+        self.assertEqual(podman.calls[0]["args"], ["kube", "play", "--replace", "-"])
+        secret = self._documents(podman.calls[0]["stdin"])["Secret"]
+        self.assertEqual(base64.b64decode(secret["data"]["PASSWORD"]), b"hunter2")
+
+    def test_play_stdin(self):
+        Path("play-kube.yaml").write_text(POD)
+        Path("env-map.yaml").write_text(CONFIGMAP)
+        with PodmanStub(self._tmpdir.name) as podman:
+            result = CliRunner().invoke(play_kube, ["--stdin", "-k", "play-kube.yaml", "--configmap", "env-map.yaml"])
+
+        self.assertEqual(result.exit_code, 0)
+        self.assertEqual(podman.calls[0]["args"], ["kube", "play", "--replace", "-"])
+        self.assertEqual(set(self._documents(podman.calls[0]["stdin"])), {"Pod", "ConfigMap"})
+
+    def test_play_stdin_from_pymake_stdin(self):
+        Path("env-map.yaml").write_text(CONFIGMAP)
+        with PodmanStub(self._tmpdir.name) as podman:
+            result = CliRunner().invoke(play_kube, ["--stdin", "-k", "-", "--configmap", "env-map.yaml"], input=POD)
+
+        self.assertEqual(result.exit_code, 0)
+        self.assertEqual(set(self._documents(podman.calls[0]["stdin"])), {"Pod", "ConfigMap"})
+
+    def test_interpolate_templates_stdin(self):
+        create_paths(PATHS.values())
+        write_templates(REGISTRY.all, False)
+        envs = REGISTRY.env["templatefile"]
+        envs.write_text(envs.read_text().replace(': ""', ': "x"'))
+        with PodmanStub(self._tmpdir.name) as podman:
+            result = CliRunner().invoke(interpolate_templates, ["--stdin"])
+
+        self.assertEqual(result.exit_code, 0)
+        self.assertEqual(len(podman.calls), 1)
+        for template in REGISTRY.templates:
+            self.assertEqual(template["parsedfile"].exists(), template["parsedfile"].suffix != ".yaml")
+        documents = list(yaml.safe_load_all(podman.calls[0]["stdin"]))
+        kinds = [d["kind"] for d in documents if d]
+        self.assertEqual(kinds[:4], ["Secret", "Secret", "ConfigMap", "ConfigMap"])
+        self.assertEqual(documents[0]["data"]["DJANGO_SECRET"], base64.b64encode(b"x").decode())
+
+    def test_podman_failure(self):
+        Path("django-secrets-template.yaml").write_text(SECRET)
+        with PodmanStub(self._tmpdir.name, exit_code=125):
+            result = CliRunner().invoke(publish_encode, ["--stdin", "django-secrets-template.yaml"])
+
+        self.assertEqual(result.exit_code, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
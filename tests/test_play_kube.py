@@ -0,0 +1,63 @@
+"""Test cases for the play command."""
+
+import unittest
+from pathlib import Path
+
+import yaml
+from click.testing import CliRunner
+
+from pymake.cmds import play_kube
+from pymake.paths import expand
+from tests.podman_stub import PodmanStub
+from tests.tmpdir import TmpDirTestCase
+
+CONFIGMAP = "apiVersion: v1\nkind: ConfigMap\nmetadata:\n  name: {name}\n"
+
+
+class TestPlayKube(TmpDirTestCase):
+    def setUp(self):
+        super().setUp()
+        Path("configmaps").mkdir()
+        for name in ("a", "b", "c", "d"):
+            Path(f"configmaps/{name}-map.yaml").write_text(CONFIGMAP.format(name=name))
+        Path("configmaps/README.md").write_text("not a configmap")
+        Path("play-kube.yaml").write_text("kind: Pod\n")
+
+    def test_expand(self):
+        paths = expand(["configmaps/b-map.yaml", "configmaps", "configmaps/*-map.yaml", "./configmaps/a-map.yaml"])
+
+        self.assertEqual([p.name for p in paths], ["b-map.yaml", "a-map.yaml", "c-map.yaml", "d-map.yaml"])
+
+    def test_more_than_two_configmaps(self):
+        with PodmanStub(self._tmpdir.name) as podman:
+            result = CliRunner().invoke(play_kube, ["-k", "play-kube.yaml", "--configmap", "configmaps"])
+
+        self.assertEqual(result.exit_code, 0)
+        args = podman.calls[0]["args"]
+        self.assertEqual(args[:4], ["kube", "play", "--replace", "play-kube.yaml"])
+        self.assertEqual(args[4::2], ["--configmap"] * 4)
+        self.assertEqual(args[5::2], [f"configmaps/{name}-map.yaml" for name in "abcd"])
+
+    def test_merge(self):
+        with PodmanStub(self._tmpdir.name) as podman:
+            result = CliRunner().invoke(
+                play_kube, ["-k", "play-kube.yaml", "--configmap", "configmaps/*.yaml", "--merge"]
+            )
+
+        self.assertEqual(result.exit_code, 0)
+        call = podman.calls[0]
+        self.assertEqual(call["args"].count("--configmap"), 1)
+        self.assertFalse(Path(call["args"][-1]).exists())
+        names = [d["metadata"]["name"] for d in yaml.safe_load_all(call["configmaps"][0])]
+        self.assertEqual(names, ["a", "b", "c", "d"])
+
+    def test_no_configmaps(self):
+        with PodmanStub(self._tmpdir.name) as podman:
+            result = CliRunner().invoke(play_kube, ["-k", "play-kube.yaml", "--configmap", "missing/*.yaml"])
+
+        self.assertIn("Missing one or more configmaps", result.output)
+        self.assertEqual(podman.calls, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,136 @@
+"""Test cases for the podman REST API runtime, against a stand-in socket server."""
+
+import os
+import socket
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from click.testing import CliRunner
+
+from pymake.build_cache import LABEL, build_digest
+from pymake.cmds import build, play_kube
+from pymake.podman_api import SOCKET_ENV, PodmanAPI, PodmanAPIError, discover_socket
+from pymake.runtime import set_runtime
+from tests.podman_api_stub import PodmanAPIStub
+from tests.tmpdir import TmpDirTestCase
+
+
+class TestPodmanAPI(TmpDirTestCase):
+    def setUp(self):
+        super().setUp()
+        Path("Containerfile").write_text("FROM scratch\nCOPY app.py /app.py\n")
+        Path("app.py").write_text("print('app')\n")
+        Path("play-kube.yaml").write_text("kind: Pod\n")
+        Path("map.yaml").write_text("kind: ConfigMap\n")
+        self.stub = PodmanAPIStub(self._tmpdir.name).__enter__()
+        self.runtime = PodmanAPI(self.stub.socket)
+        self._previous = set_runtime(self.runtime)
+
+    def tearDown(self):
+        set_runtime(self._previous)
+        self.runtime.pool.close()
+        self.stub.__exit__()
+
+    def test_connection_reuse(self):
+        for _ in range(10):
+            self.assertFalse(self.runtime.image_exists("app"))
+        self.assertEqual(self.runtime.secret_create("db", b"pw"), 0)
+
+        self.assertEqual(self.stub.connections, 1)
+        self.assertEqual(self.runtime.pool.opened, 1)
+        self.assertEqual(self.stub.secrets, {"db": b"pw"})
+        self.assertEqual(self.stub.requests[-1]["query"], {"name": "db", "replace": "true"})
+
+    def test_reconnect_after_server_closed_connection(self):
+        self.assertFalse(self.runtime.image_exists("app"))
+        for connection in self.runtime.pool._idle:
+            connection.sock.shutdown(socket.SHUT_RDWR)
+
+        self.assertFalse(self.runtime.image_exists("app"))
+        self.assertEqual(self.runtime.pool.opened, 2)
+
+    def test_idempotent_request_is_resent_after_disconnect(self):
+        self.assertFalse(self.runtime.image_exists("app"))
+        self.stub.drop = 1
+
+        self.assertFalse(self.runtime.image_exists("app"))
+        self.assertEqual([request["path"] for request in self.stub.requests], ["/images/json"] * 3)
+
+    def test_post_is_not_resent_after_disconnect(self):
+        self.assertFalse(self.runtime.image_exists("app"))
+        self.stub.drop = 1
+
+        with patch("click.secho") as secho:
+            self.assertEqual(self.runtime.kube_play("kind: Pod\n"), 125)
+        self.assertIn("podman API unreachable", secho.call_args.args[0])
+        self.assertEqual([request["path"] for request in self.stub.requests], ["/images/json", "/play/kube"])
+
+    def test_missing_socket_is_reported(self):
+        with patch.dict(os.environ, {SOCKET_ENV: str(Path("missing.sock").absolute())}):
+            set_runtime(PodmanAPI())
+            result = CliRunner().invoke(
+                play_kube, ["-k", "-", "--configmap", "map.yaml", "--stdin"], input="kind: Pod\n"
+            )
+        self.assertEqual(result.exit_code, 125)
+        self.assertIn("podman API unreachable: No podman socket found", result.output)
+
+        set_runtime(PodmanAPI("missing.sock"))
+        result = CliRunner().invoke(build, ["--tag", "app", "--file", "Containerfile"])
+        self.assertEqual(result.exit_code, 125)
+        self.assertIn("podman API unreachable: [Errno 2]", result.output)
+
+    def test_build_and_skip(self):
+        result = CliRunner().invoke(build, ["--tag", "app", "--file", "Containerfile"])
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertIn("Successfully tagged app", result.output)
+        query = self.stub.requests[-1]["query"]
+        self.assertEqual((query["t"], query["dockerfile"]), ("app", "Containerfile"))
+
+        result = CliRunner().invoke(build, ["--tag", "app", "--file", "Containerfile"])
+        self.assertIn(f"up to date ({LABEL}={build_digest('Containerfile')[:12]})", result.output)
+        self.assertEqual(self.stub.connections, 1)
+
+    def test_kube_play_sends_configmaps_in_the_manifest(self):
+        result = CliRunner().invoke(play_kube, ["-k", "play-kube.yaml", "--configmap", "map.yaml"])
+
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertIn("pod-id", result.output)
+        self.assertEqual(self.stub.requests[-1]["body"], b"---\nkind: ConfigMap\n---\nkind: Pod\n")
+        self.assertEqual(self.stub.requests[-1]["query"], {"replace": "true"})
+
+    def test_kube_play_error(self):
+        result = CliRunner().invoke(
+            play_kube, ["-k", "-", "--configmap", "map.yaml", "--stdin"], input="kind: Invalid\n"
+        )
+
+        self.assertEqual(result.exit_code, 125)
+        self.assertIn("podman API error 500: invalid manifest", result.output)
+
+    def test_exec(self):
+        self.stub.exec_exit_code = 3
+        with patch("click.echo") as echo:
+            self.assertEqual(self.runtime.exec("app", ["python", "manage.py", "check"]), 3)
+
+        self.assertEqual(self.stub.exec_commands, [["python", "manage.py", "check"]])
+        self.assertEqual("".join(call.args[0] for call in echo.call_args_list), "hello oops\nworld\n")
+
+    def test_discover_socket(self):
+        with patch.dict(os.environ, {SOCKET_ENV: str(self.stub.socket)}):
+            self.assertEqual(discover_socket(), self.stub.socket)
+        with patch.dict(os.environ, {"CONTAINER_HOST": f"unix://{self.stub.socket}"}):
+            os.environ.pop(SOCKET_ENV, None)
+            self.assertEqual(discover_socket(), self.stub.socket)
+        with patch.dict(os.environ, {"XDG_RUNTIME_DIR": self._tmpdir.name}), patch("os.getuid", return_value=1000):
+            os.environ.pop(SOCKET_ENV, None)
+            os.environ.pop("CONTAINER_HOST", None)
+            Path("podman").mkdir()
+            Path("podman/podman.sock").touch()
+            self.assertEqual(discover_socket(), Path(self._tmpdir.name) / "podman" / "podman.sock")
+            Path("podman/podman.sock").unlink()
+            with patch("pymake.podman_api.ROOTFUL_SOCKET", Path("missing.sock")):
+                self.assertRaisesRegex(PodmanAPIError, "No podman socket", discover_socket)
+
+
+if __name__ == "__main__":
+    unittest.main()
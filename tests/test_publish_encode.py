@@ -0,0 +1,105 @@
+"""Test cases for the publish_encode command."""
+
+import base64
+import io
+import unittest
+from pathlib import Path
+
+import yaml
+from click.testing import CliRunner
+
+from pymake import yaml_io
+from pymake.publish_encode import encode_documents, publish_encode
+from tests.podman_stub import PodmanStub
+from tests.tmpdir import TmpDirTestCase
+
+SECRET = """
+apiVersion: v1
+data:
+  {key}: {value}
+kind: Secret
+metadata:
+  name: {name}
+"""
+
+
+class TestPublishEncode(TmpDirTestCase):
+    def setUp(self):
+        super().setUp()
+        Path("secrets").mkdir()
+        for name in ("django", "postgres", "memcached"):
+            Path(f"secrets/{name}-secrets-template.yaml").write_text(
+                SECRET.format(key=f"{name.upper()}_PASSWORD", value=f"{name}-pw", name=f"{name}-credentials")
+            )
+
+    def test_encode_single_file(self):
+        result = CliRunner().invoke(publish_encode, ["-f", "secrets/django-secrets-template.yaml"])
+
+        self.assertEqual(result.exit_code, 0)
+        data = yaml.safe_load(Path("secrets/django-secrets.yaml").read_text())
+        self.assertEqual(base64.b64decode(data["data"]["DJANGO_PASSWORD"]), b"django-pw")
+
+    def test_encode_globs_and_files(self):
+        result = CliRunner().invoke(
+            publish_encode, ["-f", "secrets/*-template.yaml", "secrets/django-secrets-template.yaml"]
+        )
+
+        self.assertEqual(result.exit_code, 0)
+        self.assertEqual(result.output.count("created"), 3)
+        self.assertEqual(len(list(Path("secrets").glob("*-secrets.yaml"))), 3)
+
+    def test_encode_multi_document_bundle(self):
+        bundle = "---".join(SECRET.format(key="KEY", value=f"value-{i}", name=f"secret-{i}") for i in range(5))
+        Path("secrets/bundle-secrets-template.yaml").write_text(bundle + "---\n")
+        result = CliRunner().invoke(publish_encode, ["secrets/bundle-secrets-template.yaml"])
+
+        self.assertEqual(result.exit_code, 0)
+        documents = list(yaml.safe_load_all(Path("secrets/bundle-secrets.yaml").read_text()))
+        self.assertEqual([d["metadata"]["name"] for d in documents], [f"secret-{i}" for i in range(5)])
+        self.assertEqual([base64.b64decode(d["data"]["KEY"]) for d in documents], [b"value-%d" % i for i in range(5)])
+
+    def test_documents_are_written_as_they_are_encoded(self):
+        stream = io.StringIO()
+        written = []
+
+        def documents():
+            for i in range(3):
+                yield {"data": {"KEY": str(i)}}
+                written.append(stream.getvalue().count("KEY"))
+
+        yaml_io.dump_all(encode_documents(documents()), stream)
+
+        self.assertEqual(written, [1, 2, 3])
+
+    def test_invalid_name_fails_but_encodes_the_rest(self):
+        Path("secrets/other.yaml").write_text("data: {}\n")
+        result = CliRunner().invoke(publish_encode, ["secrets/*.yaml"])
+
+        self.assertEqual(result.exit_code, 1)
+        self.assertIn("must be <somename>-secrets-template.yaml", result.output)
+        self.assertEqual(len(list(Path("secrets").glob("*-secrets.yaml"))), 3)
+
+    def test_no_files(self):
+        result = CliRunner().invoke(publish_encode, [])
+
+        self.assertEqual(result.exit_code, 2)
+
+    def test_publish_concurrently(self):
+        with PodmanStub(self._tmpdir.name) as podman:
+            result = CliRunner().invoke(publish_encode, ["secrets/*-template.yaml", "--publish-secrets", "-j", "2"])
+
+        self.assertEqual(result.exit_code, 0)
+        published = sorted(call["args"][-1] for call in podman.calls)
+        self.assertEqual(published, sorted(str(p) for p in Path("secrets").glob("*-secrets.yaml")))
+        self.assertIn("[django-secrets.yaml] podman kube play --replace secrets/django-secrets.yaml", result.output)
+
+    def test_publish_failure_sets_exit_status(self):
+        with PodmanStub(self._tmpdir.name, exit_code=125):
+            result = CliRunner().invoke(publish_encode, ["secrets/*-template.yaml", "--publish-secrets"])
+
+        self.assertEqual(result.exit_code, 1)
+        self.assertEqual(result.output.count("exited with 125"), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,59 @@
+"""Test cases for the variable resolver."""
+
+import unittest
+
+from pymake.resolve import CircularReferenceError, UndefinedVariableError, resolve
+
+
+class TestResolve(unittest.TestCase):
+    def test_resolve_chain(self):
+        variables = {
+            "APPSERVICE_CONTAINER_NAME": "container_name: ${COMPOSE_PROJECT_NAME}_${APPSERVICE_NAME}",
+            "APPSERVICE_NAME": "${APP_NAME}-app",
+            "COMPOSE_PROJECT_NAME": "proj",
+            "APP_NAME": "shop",
+        }
+        result = resolve(variables)
+
+        self.assertEqual(result["APPSERVICE_NAME"], "shop-app")
+        self.assertEqual(result["APPSERVICE_CONTAINER_NAME"], "container_name: proj_shop-app")
+        self.assertListEqual(list(result), list(variables))
+
+    def test_resolve_does_not_mutate_input(self):
+        variables = {"A": "${B}", "B": "b"}
+        resolve(variables)
+
+        self.assertEqual(variables["A"], "${B}")
+
+    def test_resolve_non_string_values(self):
+        result = resolve({"PORT": 8000, "URL": "http://host:${PORT}"})
+
+        self.assertEqual(result, {"PORT": 8000, "URL": "http://host:8000"})
+
+    def test_resolve_deep_chain(self):
+        depth = 20_000
+        variables = {f"K{i}": f"${{K{i + 1}}}" for i in range(depth)}
+        variables[f"K{depth}"] = "end"
+
+        self.assertEqual(resolve(variables)["K0"], "end")
+
+    def test_resolve_undefined(self):
+        with self.assertRaises(UndefinedVariableError) as cm:
+            resolve({"A": "${B}-${C}", "C": "c"})
+
+        self.assertEqual(cm.exception.missing, {"A": ["B"]})
+        self.assertIn("${B}", str(cm.exception))
+
+    def test_resolve_cycle(self):
+        with self.assertRaises(CircularReferenceError) as cm:
+            resolve({"A": "${B}", "B": "${C}", "C": "${A}"})
+
+        self.assertEqual(cm.exception.cycle, ["A", "B", "C", "A"])
+
+    def test_resolve_self_reference(self):
+        with self.assertRaises(CircularReferenceError):
+            resolve({"A": "x${A}"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -4,7 +4,7 @@ import unittest
 
 if __name__ == "__main__":
     loader = unittest.TestLoader()
-    suite = loader.discover(start_dir="tests", pattern="test_*.py")
+    suite = loader.discover(start_dir="tests", pattern="test_*.py", top_level_dir=".")
 
     runner = unittest.TextTestRunner()
     runner.run(suite)
@@ -0,0 +1,133 @@
+"""Test cases for the container runtime backends."""
+
+import os
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from click.testing import CliRunner
+
+from pymake.build_cache import LABEL, build_digest
+from pymake.cmds import bash, build, manage, play_kube
+from pymake.config import Config
+from pymake.main import cli
+from pymake.publish_encode import publish_encode
+from pymake.runtime import BACKENDS, RUNTIME_ENV, PodmanCLI, create_runtime, get_runtime, set_runtime
+from tests.fake_runtime import FAKE_BACKEND, FakeRuntime
+from tests.podman_stub import PodmanStub
+from tests.tmpdir import TmpDirTestCase
+
+SECRET = "apiVersion: v1\nkind: Secret\nmetadata:\n  name: db\ndata:\n  PASSWORD: pw\n"
+
+
+class TestRuntime(TmpDirTestCase):
+    def setUp(self):
+        super().setUp()
+        Path("Containerfile").write_text("FROM scratch\n")
+        Path("play-kube.yaml").write_text("kind: Pod\n")
+        Path("map.yaml").write_text("kind: ConfigMap\n")
+        Path("db-secrets-template.yaml").write_text(SECRET)
+        self.runtime = FakeRuntime()
+        self._previous = set_runtime(self.runtime)
+
+    def tearDown(self):
+        set_runtime(self._previous)
+
+    def test_build_records_image(self):
+        result = CliRunner().invoke(build, ["--tag", "app", "--file", "Containerfile"])
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertEqual(self.runtime.images, [("app", {LABEL: build_digest("Containerfile")})])
+
+        result = CliRunner().invoke(build, ["--tag", "app", "--file", "Containerfile"])
+        self.assertIn("up to date", result.output)
+        self.assertEqual(len(self.runtime.operations("build")), 1)
+
+    def test_play(self):
+        _ = CliRunner().invoke(play_kube, ["-k", "play-kube.yaml", "--configmap", "map.yaml"])
+        _ = CliRunner().invoke(play_kube, ["-k", "play-kube.yaml", "--configmap", "map.yaml", "--stdin"])
+
+        self.assertEqual(
+            self.runtime.operations("kube_play_file"), [{"kube": "play-kube.yaml", "configmaps": ["map.yaml"]}]
+        )
+        self.assertEqual(
+            self.runtime.operations("kube_play"), [{"manifest": "---\nkind: ConfigMap\n---\nkind: Pod\n"}]
+        )
+
+    def test_exec(self):
+        _ = CliRunner().invoke(manage, ["-c", "app", "-m", "manage.py", "migrate"])
+        _ = CliRunner().invoke(bash, ["-c", "app"])
+
+        self.assertEqual(
+            self.runtime.operations("exec"),
+            [
+                {"container": "app", "args": ["python", "manage.py", "migrate"], "interactive": True},
+                {"container": "app", "args": ["/bin/bash"], "interactive": True},
+            ],
+        )
+
+    def test_publish(self):
+        result = CliRunner().invoke(publish_encode, ["--stdin", "db-secrets-template.yaml"])
+
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertIn("PASSWORD: cHc=", self.runtime.operations("kube_play")[0]["manifest"])
+
+    def test_failure_exit_code(self):
+        self.runtime.returncodes["kube_play"] = 125
+        result = CliRunner().invoke(play_kube, ["-k", "play-kube.yaml", "--configmap", "map.yaml", "--stdin"])
+
+        self.assertEqual(result.exit_code, 125)
+
+    def test_secret_create(self):
+        self.assertEqual(self.runtime.secret_create("db", b"pw"), 0)
+        self.assertEqual(self.runtime.secret_create("db", b"other", replace=False), 125)
+        self.assertEqual(self.runtime.secrets, {"db": b"pw"})
+
+    def test_select_backend(self):
+        self.assertIsInstance(create_runtime("podman"), PodmanCLI)
+        with self.assertRaisesRegex(ValueError, "Unknown runtime"):
+            create_runtime("docker")
+
+        result = CliRunner().invoke(cli, ["podman", "--runtime", "fake", "bash", "-c", "app"])
+        self.assertEqual(result.exit_code, 2)
+        self.assertIn("Unknown runtime 'fake'", result.output)
+
+        with patch.dict(BACKENDS, FAKE_BACKEND):
+            result = CliRunner().invoke(cli, ["podman", "--runtime", "fake", "bash", "-c", "app"])
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertIsInstance(get_runtime(), FakeRuntime)
+        self.assertIsNot(get_runtime(), self.runtime)
+
+    def test_unknown_backend_from_env_or_config(self):
+        set_runtime(None)
+        with patch.dict(os.environ, {RUNTIME_ENV: "bogus"}):
+            result = CliRunner().invoke(cli, ["podman", "bash", "-c", "app"])
+        self.assertEqual(result.exit_code, 2)
+        self.assertIn("$PYMAKE_RUNTIME: Unknown runtime 'bogus'", result.output)
+
+        Path("PyMakeFile.yaml").write_text("runtime: bogus\n")
+        with patch.dict(os.environ), patch("pymake.runtime.config", Config()):
+            os.environ.pop(RUNTIME_ENV, None)
+            result = CliRunner().invoke(cli, ["podman", "bash", "-c", "app"])
+        self.assertEqual(result.exit_code, 2)
+        self.assertIn("runtime in PyMakeFile.yaml: Unknown runtime 'bogus'", result.output)
+
+    def test_podman_cli(self):
+        with PodmanStub(self._tmpdir.name) as podman:
+            runtime = PodmanCLI()
+            self.assertEqual(runtime.secret_create("db", b"pw"), 0)
+            self.assertEqual(runtime.exec("app", ["true"]), 0)
+            self.assertFalse(runtime.image_exists("app", {LABEL: "0"}))
+
+        self.assertEqual(
+            [call["args"] for call in podman.calls],
+            [
+                ["secret", "create", "--replace", "db", "-"],
+                ["exec", "app", "true"],
+                ["images", "--quiet", "--filter", "reference=app", "--filter", f"label={LABEL}=0"],
+            ],
+        )
+        self.assertEqual(podman.calls[0]["stdin"], "pw")
+
+
+if __name__ == "__main__":
+    unittest.main()
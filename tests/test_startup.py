@@ -0,0 +1,108 @@
+"""Startup benchmarks for the pymake command line."""
+
+from __future__ import annotations
+
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+
+import click
+
+from pymake.lazy_group import LazyGroup
+from pymake.main import cli
+
+# A cold `pymake --help` takes about 0.05 s and `podman list-templates` about 0.1 s on a developer machine.
+BUDGETS = {
+    ("--help",): 0.2,
+    ("podman", "list-templates"): 0.25,
+}
+REPEAT = 3
+ENTRY_POINT = "from pymake.main import cli; cli()"
+
+
+def startup_time(args: tuple[str, ...], cwd: str) -> float:
+    """The best wall clock time of REPEAT cold starts of pymake with args."""
+    best = float("inf")
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", ENTRY_POINT, *args], cwd=cwd, capture_output=True, check=True)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def loaded_modules(args: tuple[str, ...], cwd: str) -> set[str]:
+    """The modules loaded by a cold start of pymake with args.
+
+    Lazily loaded commands are imported through importlib, which -X importtime does not report,
+    so sys.modules is dumped at exit instead.
+    """
+    statement = f"import atexit, sys; atexit.register(lambda: print(*sys.modules, file=sys.stderr)); {ENTRY_POINT}"
+    result = subprocess.run(
+        [sys.executable, "-c", statement, *args], cwd=cwd, capture_output=True, text=True, check=False
+    )
+    return set(result.stderr.split())
+
+
+def lazy_groups() -> list[tuple[click.Context, LazyGroup]]:
+    """The lazy groups of the pymake command line, with a context to look their commands up in."""
+    ctx = click.Context(cli)
+    podman = cli.get_command(ctx, "podman")
+    assert isinstance(podman, LazyGroup)
+    return [(ctx, cli), (click.Context(podman, parent=ctx), podman)]
+
+
+def command_modules() -> set[str]:
+    """The modules the lazily loaded commands are imported from."""
+    return {
+        import_path.split(":")[0] for _, group in lazy_groups() for import_path, _ in group.lazy_subcommands.values()
+    }
+
+
+class TestStartup(unittest.TestCase):
+    def setUp(self):
+        self._tmpdir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self._tmpdir.cleanup()
+
+    def test_time_budget(self):
+        for args, budget in BUDGETS.items():
+            with self.subTest(args=args):
+                self.assertLess(startup_time(args, self._tmpdir.name), budget)
+
+    def test_help_imports_no_command_modules(self):
+        for args in (("--help",), ("podman", "--help")):
+            modules = loaded_modules(args, self._tmpdir.name)
+
+            with self.subTest(args=args):
+                self.assertIn("pymake.main", modules)
+                self.assertEqual(modules & {"yaml", *command_modules()}, set())
+                self.assertLessEqual(
+                    {module for module in modules if module.startswith("pymake.")},
+                    {"pymake.__about__", "pymake.lazy_group", "pymake.main", "pymake.timings"},
+                )
+
+    def test_lazy_help_matches_the_commands(self):
+        for ctx, group in lazy_groups():
+            for name, (_, short_help) in group.lazy_subcommands.items():
+                command = group.get_command(ctx, name)
+                assert command is not None
+                for limit in (45, 200):
+                    with self.subTest(command=name, limit=limit):
+                        self.assertEqual(
+                            click.Command(name, help=short_help).get_short_help_str(limit),
+                            command.get_short_help_str(limit),
+                        )
+
+    def test_command_imports_only_its_module(self):
+        modules = loaded_modules(("podman", "list-templates"), self._tmpdir.name)
+
+        self.assertIn("pymake.interpolate_templates", modules)
+        for module in ("yaml", "pymake.cmds", "pymake.publish_encode", "pymake.write_templates", "pymake.watch"):
+            self.assertNotIn(module, modules)
+
+
+if __name__ == "__main__":
+    unittest.main()
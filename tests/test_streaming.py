@@ -0,0 +1,97 @@
+"""Test cases for the streaming template renderer."""
+
+import io
+import unittest
+from pathlib import Path
+from string import Template
+
+from click.testing import CliRunner
+
+from pymake.interpolate_templates import interpolate_templates, yamlparser
+from pymake.streaming import render_chunks, render_stream, stream_template
+from pymake.templates import PATHS, builtin_registry, template_source
+from pymake.write_templates import create_paths, write_templates
+from tests.tmpdir import TmpDirTestCase
+
+REGISTRY = builtin_registry()
+
+MAPPING = {"APP_NAME": "shop", "PORT": 8000, "host": "example.org", "a": "A"}
+TEXTS = [
+    "",
+    "plain text",
+    "${APP_NAME}-app on $host:${PORT}",
+    "$$APP_NAME costs $$5 and ${MISSING} $missing",
+    "a lone $ and ${ unterminated, ${APP_NAME",
+    "$APP_NAMEx $APP_NAME.x ${app_name} $1 ${1a} $a$a${a}",
+    "$",
+    "$$$",
+    "trailing $$",
+    "ends in $host",
+    "ends in ${APP_NAME",
+]
+
+
+def chunked(text, size):
+    return [text[i : i + size] for i in range(0, len(text), size)]
+
+
+class TestRenderChunks(unittest.TestCase):
+    def test_every_split_matches_safe_substitute(self):
+        for text in TEXTS:
+            expected = Template(text).safe_substitute(MAPPING)
+            for size in range(1, len(text) + 2):
+                with self.subTest(text=text, size=size):
+                    self.assertEqual("".join(render_chunks(chunked(text, size), MAPPING)), expected)
+
+    def test_placeholder_split_across_chunks(self):
+        chunks = ["name: ${APP", "_NA", "ME}, port: $", "PO", "RT"]
+
+        self.assertEqual("".join(render_chunks(chunks, {"APP_NAME": "shop", "PORT": 8000})), "name: shop, port: 8000")
+
+    def test_output_is_produced_incrementally(self):
+        outputs = list(render_chunks(["${APP_NAME}\n"] * 3, MAPPING))
+
+        self.assertEqual(outputs, ["shop\n"] * 3)
+
+    def test_render_stream_builtin_templates(self):
+        for template in REGISTRY.all:
+            text = template_source(template)
+            out_fp = io.StringIO()
+            render_stream(io.StringIO(text), out_fp, MAPPING, chunk_size=7)
+            with self.subTest(template=str(template["templatefile"])):
+                self.assertEqual(out_fp.getvalue(), Template(text).safe_substitute(MAPPING))
+
+
+class TestStreamTemplate(TmpDirTestCase):
+    def test_stream_template(self):
+        Path("inn.txt").write_text("å ${APP_NAME} " * 1000, encoding="utf-8")
+        stream_template("inn.txt", "out.txt", MAPPING, remove=True, chunk_size=10)
+
+        self.assertEqual(Path("out.txt").read_text(encoding="utf-8"), "å shop " * 1000)
+        self.assertTrue(Path("remove").exists())
+
+    def test_yamlparser_stream(self):
+        Path("envs.yaml").write_text('GENERAL:\n  APP_NAME: "shop"\n')
+        Path("inn.txt").write_text("name: ${APP_NAME}, $UNKNOWN")
+        result = CliRunner().invoke(yamlparser, ["-f", "envs.yaml", "-i", "inn.txt", "-o", "out.txt", "--stream"])
+
+        self.assertEqual(result.exit_code, 0)
+        self.assertEqual(Path("out.txt").read_text(), "name: shop, $UNKNOWN")
+
+    def test_interpolate_templates_stream_matches(self):
+        create_paths(PATHS.values())
+        write_templates(REGISTRY.all, False)
+        runner = CliRunner()
+        _ = runner.invoke(interpolate_templates, [])
+        outputs = {t["parsedfile"]: t["parsedfile"].read_text() for t in REGISTRY.templates}
+        for parsedfile in outputs:
+            parsedfile.unlink()
+        result = runner.invoke(interpolate_templates, ["--stream"])
+
+        self.assertEqual(result.exit_code, 0)
+        self.assertNotIn("unchanged", result.output)
+        self.assertEqual(outputs, {t["parsedfile"]: t["parsedfile"].read_text() for t in REGISTRY.templates})
+
+
+if __name__ == "__main__":
+    unittest.main()
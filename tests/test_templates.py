@@ -0,0 +1,117 @@
+"""Test cases for the template registry."""
+
+import unittest
+from pathlib import Path
+
+from click.testing import CliRunner
+
+from pymake.interpolate_templates import interpolate_templates, list_templates
+from pymake.templates import PATHS, RegistryError, builtin_registry, from_specs, load_registry, template_source
+from pymake.write_templates import podman_scaffold
+from tests.tmpdir import TmpDirTestCase
+
+SPECS = """
+templates:
+  env: ${config}/envs.yaml
+  files:
+    - templatefile: ${config}/app-template.conf
+      parsedfile: ${out}/app.conf
+    - templatefile: ${config}/secrets-template.yaml
+      parsedfile: secrets-template.yaml
+      remove: true
+paths:
+  config: ./project
+  out: ./rendered
+"""
+
+INDEX = """
+env: envs.yaml
+files:
+  - templatefile: app-template.conf
+    parsedfile: app.conf
+"""
+
+
+class TestRegistry(TmpDirTestCase):
+    def _project(self, directory):
+        Path(directory).mkdir()
+        Path(directory, "envs.yaml").write_text('GENERAL:\n  APP_NAME: "shop"\n')
+        Path(directory, "app-template.conf").write_text("name = ${APP_NAME}\n")
+
+    def test_builtin_registry(self):
+        registry = builtin_registry()
+
+        self.assertEqual(registry.env["templatefile"], PATHS["templates"] / "template-envs.yaml")
+        self.assertNotIn(registry.env, registry.templates)
+        self.assertEqual(len(registry.templates), 10)
+        self.assertEqual(registry.templates[0]["parsedfile"], Path("Containerfile"))
+        for template in registry.all:
+            with self.subTest(template=str(template["templatefile"])):
+                self.assertTrue(template_source(template))
+
+    def test_builtin_registry_is_the_default(self):
+        self.assertEqual(load_registry(), builtin_registry())
+
+    def test_paths_move_the_builtin_templates(self):
+        Path("PyMakeFile.yaml").write_text("paths:\n  templates: ./tpl\n")
+        registry = load_registry()
+
+        self.assertEqual(registry.env["templatefile"], Path("tpl/template-envs.yaml"))
+        self.assertEqual(registry.templates[0]["templatefile"], Path("tpl/Containerfile-template"))
+
+    def test_specs_in_pymakefile(self):
+        Path("PyMakeFile.yaml").write_text(SPECS)
+        registry = load_registry()
+
+        self.assertEqual(registry.env["templatefile"], Path("project/envs.yaml"))
+        self.assertEqual(
+            [(t["templatefile"], t["parsedfile"], t["remove"], t["source"]) for t in registry.templates],
+            [
+                (Path("project/app-template.conf"), Path("rendered/app.conf"), False, None),
+                (Path("project/secrets-template.yaml"), Path("secrets-template.yaml"), True, None),
+            ],
+        )
+
+    def test_directory_with_index(self):
+        self._project("project")
+        Path("project/index.yaml").write_text(INDEX)
+        Path("PyMakeFile.yaml").write_text("templates: project\n")
+        result = CliRunner().invoke(interpolate_templates, [])
+
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertEqual(Path("app.conf").read_text(), "name = shop\n")
+        listed = CliRunner().invoke(list_templates, [])
+        self.assertEqual(listed.output.split()[2:], ["project/envs.yaml", "project/app-template.conf"])
+
+    def test_errors(self):
+        for specs, message in (
+            ({"files": []}, "needs an env file"),
+            ({"env": "envs.yaml", "files": [{"templatefile": "a"}]}, "needs a parsedfile"),
+            ({"env": "${nowhere}/envs.yaml"}, r"Unknown path \$\{nowhere\}"),
+            ({"env": "envs.yaml", "files": "a"}, "must be a list"),
+        ):
+            with self.subTest(message=message), self.assertRaisesRegex(RegistryError, message):
+                from_specs(specs)
+
+    def test_missing_index_is_reported(self):
+        Path("project").mkdir()
+        Path("PyMakeFile.yaml").write_text("templates: project\n")
+        result = CliRunner().invoke(interpolate_templates, [])
+
+        self.assertEqual(result.exit_code, 1)
+        self.assertIn("No index.yaml", result.output)
+
+    def test_scaffold_writes_only_builtin_templates(self):
+        Path("PyMakeFile.yaml").write_text(
+            "templates:\n  env:\n    templatefile: envs.yaml\n    source: template-envs.yaml\n"
+            "  files:\n    - templatefile: app-template.conf\n      parsedfile: app.conf\n"
+        )
+        result = CliRunner().invoke(podman_scaffold, [])
+
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertEqual(Path("envs.yaml").read_text(), template_source(builtin_registry().env))
+        self.assertFalse(Path("app-template.conf").exists())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+"""Test cases for the --timings and --profile options."""
+
+import json
+import pstats
+import unittest
+from pathlib import Path
+
+from click.testing import CliRunner
+
+from pymake.main import cli
+from pymake.templates import PATHS, builtin_registry
+from pymake.timings import Timings
+from pymake.write_templates import create_paths, write_templates
+from tests.podman_stub import PodmanStub
+from tests.tmpdir import TmpDirTestCase
+
+REGISTRY = builtin_registry()
+
+
+class TestTimings(TmpDirTestCase):
+    def setUp(self):
+        super().setUp()
+        create_paths(PATHS.values())
+        write_templates(REGISTRY.all, False)
+        envs = REGISTRY.env["templatefile"]
+        envs.write_text(envs.read_text().replace(': ""', ': "x"'))
+
+    def phases(self, *args):
+        result = CliRunner().invoke(cli, ["--timings=json", *args])
+        self.assertEqual(result.exit_code, 0, result.output)
+        return json.loads(result.stderr)["phases"]
+
+    def test_phases(self):
+        phases = self.phases("podman", "interpolate-templates")
+        names = [phase["name"] for phase in phases]
+
+        self.assertIn("resolve", names)
+        self.assertEqual(names.count("render"), len(REGISTRY.templates))
+        self.assertIn(
+            {"name": "import", "module": "pymake.interpolate_templates"},
+            [{key: phase[key] for key in ("name", "module")} for phase in phases if phase["name"] == "import"],
+        )
+        self.assertTrue(all(phase["seconds"] >= 0 for phase in phases))
+
+    def test_subprocess_phase(self):
+        Path("play-kube.yaml").write_text("kind: Pod\n")
+        Path("map.yaml").write_text("kind: ConfigMap\n")
+        with PodmanStub(self._tmpdir.name, exit_code=0):
+            phases = self.phases("podman", "play", "-k", "play-kube.yaml", "--configmap", "map.yaml", "--stdin")
+
+        [subprocess] = [phase for phase in phases if phase["name"] == "subprocess"]
+        self.assertEqual(subprocess["command"], "podman kube play --replace -")
+        self.assertEqual(subprocess["exit_code"], 0)
+
+    def test_text_report(self):
+        result = CliRunner().invoke(cli, ["--timings", "podman", "list-templates"])
+
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertRegex(result.stderr, r"import\s+[0-9.]+ ms\s+[0-9.]+ ms  module=pymake.interpolate_templates")
+        self.assertIn("total", result.stderr)
+
+    def test_timings_value_as_separate_argument(self):
+        for value in ("json", "text"):
+            with self.subTest(value=value):
+                result = CliRunner().invoke(cli, ["--timings", value, "podman", "list-templates"])
+
+                self.assertEqual(result.exit_code, 0, result.output)
+                self.assertIn('"phases"' if value == "json" else "total", result.stderr)
+
+    def test_profile(self):
+        result = CliRunner().invoke(cli, ["--profile", "out.prof", "podman", "list-templates"])
+
+        self.assertEqual(result.exit_code, 0, result.output)
+        functions = {function for _, _, function in pstats.Stats("out.prof").stats}
+        self.assertIn("list_templates", functions)
+
+    def test_disabled_by_default(self):
+        timings = Timings()
+        with timings.phase("render") as details:
+            details["fresh"] = True
+
+        self.assertEqual(timings.phases, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
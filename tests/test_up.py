@@ -0,0 +1,86 @@
+"""Test cases for the up command."""
+
+import base64
+import unittest
+from pathlib import Path
+
+import yaml
+from click.testing import CliRunner
+
+from pymake.cmds import scaffold
+from pymake.templates import PATHS, builtin_registry
+from pymake.up import up
+from pymake.write_templates import create_paths, write_templates
+from tests.podman_stub import PodmanStub
+from tests.tmpdir import TmpDirTestCase
+
+REGISTRY = builtin_registry()
+
+
+class TestUp(TmpDirTestCase):
+    def setUp(self):
+        super().setUp()
+        create_paths(PATHS.values())
+        write_templates(REGISTRY.all, False)
+        envs = REGISTRY.env["templatefile"]
+        envs.write_text(envs.read_text().replace(': ""', ': "x"'))
+
+    def test_up(self):
+        with PodmanStub(self._tmpdir.name) as podman:
+            result = CliRunner().invoke(up, [])
+
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertEqual(len(podman.calls), 1)
+        self.assertEqual(podman.calls[0]["args"], ["kube", "play", "--replace", "-"])
+        documents = [d for d in yaml.safe_load_all(podman.calls[0]["stdin"]) if d]
+        self.assertEqual([d["kind"] for d in documents], ["Secret", "Secret", "ConfigMap", "ConfigMap", "Pod"])
+        self.assertEqual(base64.b64decode(documents[1]["data"]["POSTGRES_PASSWORD"]), b"x")
+        self.assertTrue(Path("Containerfile").exists())
+        self.assertFalse(Path("play-kube.yaml").exists())
+        for stage in ("resolve", "render", "encode", "play", "total"):
+            self.assertRegex(result.output, rf"{stage}\s+[0-9.]+ ms")
+
+    def test_up_includes_extra_configmaps(self):
+        Path("PyMakeFile.yaml").write_text("configmaps: [extra-map.yaml]\n")
+        Path("extra-map.yaml").write_text("apiVersion: v1\nkind: ConfigMap\nmetadata:\n  name: extra\n")
+        with PodmanStub(self._tmpdir.name) as podman:
+            result = CliRunner().invoke(up, [])
+
+        self.assertEqual(result.exit_code, 0, result.output)
+        names = [d["metadata"]["name"] for d in yaml.safe_load_all(podman.calls[0]["stdin"]) if d]
+        self.assertIn("extra", names)
+
+    def test_up_expands_configmap_directories_and_globs(self):
+        Path("extra").mkdir()
+        for name in ("a", "b"):
+            Path(f"extra/{name}-map.yaml").write_text(f"apiVersion: v1\nkind: ConfigMap\nmetadata:\n  name: {name}\n")
+        for entry in ("extra", "extra/*.yaml"):
+            Path("PyMakeFile.yaml").write_text(f"configmaps: ['{entry}']\n")
+            with self.subTest(entry=entry), PodmanStub(self._tmpdir.name) as podman:
+                result = CliRunner().invoke(up, [])
+
+                self.assertEqual(result.exit_code, 0, result.output)
+                names = [d["metadata"]["name"] for d in yaml.safe_load_all(podman.calls[0]["stdin"]) if d]
+                self.assertIn("a", names)
+                self.assertIn("b", names)
+
+    def test_up_after_scaffold(self):
+        _ = CliRunner().invoke(scaffold, [])
+        with PodmanStub(self._tmpdir.name) as podman:
+            result = CliRunner().invoke(up, [])
+
+        self.assertEqual(result.exit_code, 0, result.output)
+        documents = [d for d in yaml.safe_load_all(podman.calls[0]["stdin"]) if d]
+        self.assertEqual([d["kind"] for d in documents], ["Secret", "Secret", "ConfigMap", "ConfigMap", "Pod"])
+
+    def test_up_stops_before_play_on_errors(self):
+        REGISTRY.templates[-1]["templatefile"].unlink()
+        with PodmanStub(self._tmpdir.name) as podman:
+            result = CliRunner().invoke(up, [])
+
+        self.assertEqual(result.exit_code, 1)
+        self.assertEqual(podman.calls, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+"""Test cases for the template watcher."""
+
+import unittest
+
+from pymake.templates import PATHS, builtin_registry
+from pymake.watch import Watcher
+from pymake.write_templates import create_paths, write_templates
+from tests.tmpdir import TmpDirTestCase
+
+REGISTRY = builtin_registry()
+
+
+class TestWatcher(TmpDirTestCase):
+    def setUp(self):
+        super().setUp()
+        create_paths(PATHS.values())
+        write_templates(REGISTRY.all, False)
+        self.messages = []
+        self.watcher = Watcher(REGISTRY.env["templatefile"], REGISTRY.templates, echo=self._echo)
+        self.watcher.start()
+
+    def _echo(self, message, **kwargs):
+        self.messages.append(message)
+
+    def _edit(self, path, old, new):
+        path.write_text(path.read_text().replace(old, new))
+
+    def test_start_renders_everything(self):
+        self.assertEqual(len(self.messages), len(REGISTRY.templates))
+        self.assertEqual(self.watcher.poll(), [])
+
+    def test_env_change_renders_only_templates_using_the_variable(self):
+        self._edit(REGISTRY.env["templatefile"], 'WORKER_PROCESSES: "5"', 'WORKER_PROCESSES: "17"')
+        rendered = self.watcher.poll()
+
+        self.assertEqual([t["parsedfile"] for t in rendered], [PATHS["nginx-out"] / "nginx.conf"])
+        self.assertIn("worker_processes  17;", (PATHS["nginx-out"] / "nginx.conf").read_text())
+
+    def test_env_change_follows_references(self):
+        self._edit(REGISTRY.env["templatefile"], 'DJANGO_DB_USER: ""', 'DJANGO_DB_USER: "admin"')
+        rendered = {str(t["parsedfile"]) for t in self.watcher.poll()}
+
+        self.assertIn(str(PATHS["configmaps-out"] / "django-env-map.yaml"), rendered)
+        self.assertIn(str(PATHS["configmaps-out"] / "postgres-env-map.yaml"), rendered)
+        self.assertNotIn(str(PATHS["nginx-out"] / "nginx.conf"), rendered)
+
+    def test_template_change(self):
+        self._edit(REGISTRY.templates[3]["templatefile"], "workers", "workers  ")
+        rendered = self.watcher.poll()
+
+        self.assertEqual(rendered, [REGISTRY.templates[3]])
+
+    def test_broken_env_keeps_previous_variables(self):
+        self._edit(REGISTRY.env["templatefile"], 'APP_NAME: ""', 'APP_NAME: "${APP_NAME}"')
+
+        self.assertEqual(self.watcher.poll(), [])
+        self.assertIn("Circular reference", self.messages[-1])
+        self.assertIsNotNone(self.watcher.context)
+
+    def test_broken_yaml_keeps_previous_variables(self):
+        env_file = REGISTRY.env["templatefile"]
+        text = env_file.read_text()
+        for broken in ("NGINX: [unclosed\n", "NOT_A_SECTION: 1\n", "- a list\n"):
+            env_file.write_text(text + broken)
+            with self.subTest(broken=broken):
+                self.assertEqual(self.watcher.poll(), [])
+                self.assertTrue(self.messages[-1].startswith(str(env_file)))
+                self.assertIsNotNone(self.watcher.context)
+
+        env_file.write_text(text.replace('WORKER_PROCESSES: "5"', 'WORKER_PROCESSES: "17"'))
+        self.assertEqual([t["parsedfile"] for t in self.watcher.poll()], [PATHS["nginx-out"] / "nginx.conf"])
+
+    def test_undecodable_template_is_skipped(self):
+        REGISTRY.templates[3]["templatefile"].write_bytes(b"\xff\xfe workers")
+
+        self.assertEqual(self.watcher.poll(), [])
+        self.assertIn("codec can't decode", self.messages[-1])
+
+
+if __name__ == "__main__":
+    unittest.main()
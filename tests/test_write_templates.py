@@ -6,7 +6,10 @@ from unittest.mock import patch
 
 from click.testing import CliRunner
 
-from pymake.write_templates import PATHS, TEMPLATES, podman_scaffold
+from pymake.templates import PATHS, builtin_registry
+from pymake.write_templates import podman_scaffold
+
+TEMPLATES = builtin_registry().all
 
 
 class TestPodmanScaffold(unittest.TestCase):
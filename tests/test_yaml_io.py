@@ -0,0 +1,40 @@
+"""Test cases for the shared YAML reader and writer."""
+
+import io
+import unittest
+
+import yaml
+from click.testing import CliRunner
+
+from pymake import yaml_io
+from pymake.main import cli
+
+
+class TestYamlIO(unittest.TestCase):
+    def test_backend(self):
+        expected = "libyaml" if yaml.__with_libyaml__ else "pure-python"
+
+        self.assertEqual(yaml_io.BACKEND, expected)
+
+    def test_round_trip(self):
+        data = {"apiVersion": "v1", "data": {"KEY": "value", "PORT": "8000"}, "kind": "Secret"}
+        stream = io.StringIO()
+        yaml_io.dump(data, stream)
+
+        self.assertEqual(stream.getvalue(), yaml.safe_dump(data))
+        self.assertEqual(yaml_io.load(stream.getvalue()), data)
+        self.assertEqual(list(yaml_io.load_all("a: 1\n---\nb: 2\n")), [{"a": 1}, {"b": 2}])
+
+    def test_load_is_safe(self):
+        with self.assertRaises(yaml.YAMLError):
+            yaml_io.load("!!python/object/apply:os.system ['true']")
+
+    def test_version_verbose(self):
+        result = CliRunner().invoke(cli, ["--version", "-v"])
+
+        self.assertEqual(result.exit_code, 0)
+        self.assertIn(f"yaml backend: {yaml_io.BACKEND}", result.output)
+
+
+if __name__ == "__main__":
+    unittest.main()
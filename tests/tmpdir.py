@@ -0,0 +1,21 @@
+"""A test case that runs every test in a fresh temporary working directory."""
+
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+
+class TmpDirTestCase(unittest.TestCase):
+    """Change into a new temporary directory, self._tmpdir, for every test.
+
+    The working directory is restored and the directory removed after tearDown, so subclasses
+    only call super().setUp() first in their own setUp.
+    """
+
+    def setUp(self):
+        self._cwd = Path.cwd()
+        self._tmpdir = tempfile.TemporaryDirectory()
+        os.chdir(self._tmpdir.name)
+        self.addCleanup(self._tmpdir.cleanup)
+        self.addCleanup(os.chdir, self._cwd)